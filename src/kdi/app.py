@@ -0,0 +1,63 @@
+from typing import Optional
+
+from lightbulb.ext import tasks
+import ongaku
+
+from .bot import combine_capabilities, KDI
+from .relay import RelayPlugin
+from .store import (
+	MemberPrefetch,
+	MemorySessionStore,
+	SessionStore,
+	SQLiteSessionStore,
+	UserStore,
+)
+from .teams import TeamsPlugin
+from .util import get_cache_dir, get_config
+
+AUDIO_SESSION_NAME = "hikari-session"
+
+SESSION_DB_NAME = "sessions.sqlite3"
+
+
+def get_session_db_path():
+	return get_cache_dir() / SESSION_DB_NAME
+
+
+def create_audio_client(bot: KDI):
+	audio_client = ongaku.Client(bot)
+	audio_client.create_session(AUDIO_SESSION_NAME, password=bot.audio_password)
+	return audio_client
+
+
+def create_session_store() -> SessionStore:
+	if get_config().shards.session_store == "sqlite":
+		return SQLiteSessionStore(get_session_db_path())
+	return MemorySessionStore()
+
+
+def create_user_store():
+	config = get_config().user
+	return UserStore(config.store_max_users, config.store_ttl_secs)
+
+
+def create_app(rest_url: Optional[str] = None, worker: int = 0):
+	bot = KDI(
+		rest_url,
+		combine_capabilities(
+			MemberPrefetch.CAPABILITIES,
+			RelayPlugin.CAPABILITIES,
+			TeamsPlugin.CAPABILITIES,
+		),
+		worker,
+	)
+	tasks.load(bot)
+
+	users = create_user_store()
+	MemberPrefetch(bot, users)
+
+	bot.add_plugin(
+		RelayPlugin(create_audio_client(bot), create_session_store(), worker)
+	)
+	bot.add_plugin(TeamsPlugin(users, bot.components))
+	return bot
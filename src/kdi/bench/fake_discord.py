@@ -0,0 +1,522 @@
+from collections import Counter
+from itertools import count
+from typing import Any, Callable, Iterator, Optional
+import asyncio
+import json
+import zlib
+
+from aiohttp import web, WSMsgType
+
+JSON = dict[str, Any]
+
+MessagePredicate = Callable[[JSON], bool]
+
+API_VERSION = 10
+
+APPLICATION_ID = 1000
+
+BOT_USER_ID = 1001
+
+HEARTBEAT_INTERVAL_MS = 41250
+
+DISPATCH_OP = 0
+
+HEARTBEAT_OP = 1
+
+IDENTIFY_OP = 2
+
+HELLO_OP = 10
+
+HEARTBEAT_ACK_OP = 11
+
+TIMESTAMP = "2024-01-01T00:00:00.000000+00:00"
+
+COMMAND_INTERACTION_TYPE = 2
+
+COMPONENT_INTERACTION_TYPE = 3
+
+BUTTON_COMPONENT_TYPE = 2
+
+CALLBACK_MESSAGE_TYPES = (4, 7)
+
+
+def build_user(user_id: int, username: str, bot: bool = False) -> JSON:
+	return {
+		"id": str(user_id),
+		"username": username,
+		"global_name": None,
+		"discriminator": "0",
+		"avatar": None,
+		"bot": bot,
+		"public_flags": 0,
+	}
+
+
+def build_my_user() -> JSON:
+	return {
+		**build_user(BOT_USER_ID, "kdi", bot=True),
+		"flags": 0,
+		"locale": "en-US",
+		"mfa_enabled": False,
+		"premium_type": 0,
+	}
+
+
+def build_application() -> JSON:
+	return {
+		"id": str(APPLICATION_ID),
+		"name": "kdi",
+		"icon": None,
+		"description": "",
+		"bot_public": False,
+		"bot_require_code_grant": False,
+		"flags": 0,
+		"owner": build_user(BOT_USER_ID + 1, "owner"),
+		"verify_key": "0" * 64,
+		"approximate_guild_count": 0,
+		"team": None,
+	}
+
+
+def build_member(user: JSON) -> JSON:
+	return {
+		"user": user,
+		"nick": None,
+		"avatar": None,
+		"roles": [],
+		"joined_at": TIMESTAMP,
+		"deaf": False,
+		"mute": False,
+		"flags": 0,
+		"pending": False,
+		"permissions": "0",
+	}
+
+
+def build_message(
+	message_id: int,
+	channel_id: int,
+	author: JSON,
+	payload: JSON,
+	guild_id: Optional[int] = None,
+) -> JSON:
+	message = {
+		"id": str(message_id),
+		"channel_id": str(channel_id),
+		"author": author,
+		"content": payload.get("content") or "",
+		"timestamp": TIMESTAMP,
+		"edited_timestamp": None,
+		"tts": False,
+		"mention_everyone": False,
+		"mentions": [],
+		"mention_roles": [],
+		"attachments": [],
+		"embeds": payload.get("embeds") or [],
+		"components": payload.get("components") or [],
+		"pinned": False,
+		"type": 0,
+		"flags": payload.get("flags") or 0,
+	}
+	if guild_id is not None:
+		message["guild_id"] = str(guild_id)
+	return message
+
+
+def build_interaction(
+	interaction_id: int,
+	interaction_type: int,
+	data: JSON,
+	user: JSON,
+	guild_id: int,
+	channel_id: int,
+	message: Optional[JSON] = None,
+) -> JSON:
+	interaction = {
+		"id": str(interaction_id),
+		"application_id": str(APPLICATION_ID),
+		"type": interaction_type,
+		"token": f"token-{interaction_id}",
+		"version": 1,
+		"guild_id": str(guild_id),
+		"channel_id": str(channel_id),
+		"member": build_member(user),
+		"data": data,
+		"locale": "en-US",
+		"guild_locale": "en-US",
+		"app_permissions": "0",
+		"entitlements": [],
+	}
+	if message is not None:
+		interaction["message"] = message
+	return interaction
+
+
+async def read_payload(request: web.Request) -> JSON:
+	if not request.can_read_body:
+		return {}
+	if request.content_type.startswith("multipart/"):
+		form = await request.post()
+		return json.loads(str(form["payload_json"]))
+	return await request.json()
+
+
+class GatewaySocket:
+	_compressor: Optional["zlib._Compress"]
+	_seq: int
+	_ws: web.WebSocketResponse
+
+	def __init__(self, ws: web.WebSocketResponse, compress: bool):
+		self._compressor = zlib.compressobj() if compress else None
+		self._seq = 0
+		self._ws = ws
+
+	async def send(self, payload: JSON):
+		data = json.dumps(payload)
+		if self._compressor is None:
+			await self._ws.send_str(data)
+			return
+		compressed = self._compressor.compress(data.encode())
+		await self._ws.send_bytes(
+			compressed + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+		)
+
+	async def dispatch(self, name: str, data: JSON):
+		self._seq += 1
+		await self.send({"op": DISPATCH_OP, "d": data, "s": self._seq, "t": name})
+
+
+class FakeDiscord:
+	_app: web.Application
+	_commands: dict[str, JSON]
+	_host: str
+	_interactions: dict[str, JSON]
+	_message_waiters: list[tuple[MessagePredicate, "asyncio.Future[JSON]"]]
+	_messages: dict[int, JSON]
+	_original_messages: dict[str, int]
+	_response_waiters: dict[int, "asyncio.Future[JSON]"]
+	_runner: Optional[web.AppRunner]
+	_snowflakes: Iterator[int]
+	_sockets: list[GatewaySocket]
+	requests: Counter[str]
+
+	def __init__(self, host: str = "127.0.0.1"):
+		self._app = web.Application(middlewares=[self._count_request])
+		self._commands = {}
+		self._host = host
+		self._interactions = {}
+		self._message_waiters = []
+		self._messages = {}
+		self._original_messages = {}
+		self._response_waiters = {}
+		self._runner = None
+		self._snowflakes = count(BOT_USER_ID + 1000)
+		self._sockets = []
+		self.requests = Counter()
+
+		self._app.add_routes(
+			[
+				web.get("/gateway", self.gateway),
+				web.get(self._api("/gateway/bot"), self.get_gateway_bot),
+				web.get(self._api("/oauth2/applications/@me"), self.get_application),
+				web.get(self._api("/users/@me"), self.get_my_user),
+				web.get(
+					self._api("/applications/{application}/commands"), self.get_commands
+				),
+				web.post(
+					self._api("/applications/{application}/commands"),
+					self.create_command,
+				),
+				web.put(
+					self._api("/applications/{application}/commands"),
+					self.set_commands,
+				),
+				web.put(
+					self._api("/applications/{application}/guilds/{guild}/commands"),
+					self.set_commands,
+				),
+				web.post(
+					self._api("/interactions/{interaction}/{token}/callback"),
+					self.create_interaction_response,
+				),
+				web.get(
+					self._api("/webhooks/{application}/{token}/messages/@original"),
+					self.get_original_message,
+				),
+				web.patch(
+					self._api("/webhooks/{application}/{token}/messages/@original"),
+					self.edit_original_message,
+				),
+				web.delete(
+					self._api("/webhooks/{application}/{token}/messages/@original"),
+					self.delete_original_message,
+				),
+				web.post(
+					self._api("/webhooks/{application}/{token}"),
+					self.create_followup_message,
+				),
+				web.patch(
+					self._api("/webhooks/{application}/{token}/messages/{message}"),
+					self.edit_message,
+				),
+				web.delete(
+					self._api("/webhooks/{application}/{token}/messages/{message}"),
+					self.delete_message,
+				),
+				web.post(
+					self._api("/channels/{channel}/messages"), self.create_message
+				),
+				web.patch(
+					self._api("/channels/{channel}/messages/{message}"),
+					self.edit_message,
+				),
+				web.delete(
+					self._api("/channels/{channel}/messages/{message}"),
+					self.delete_message,
+				),
+			]
+		)
+
+	@staticmethod
+	def _api(path: str):
+		return f"/api/v{API_VERSION}{path}"
+
+	@property
+	def port(self) -> Optional[int]:
+		if self._runner is None or not self._runner.addresses:
+			return None
+		return self._runner.addresses[0][1]
+
+	@property
+	def rest_url(self):
+		return f"http://{self._host}:{self.port}/api/v{API_VERSION}"
+
+	@property
+	def gateway_url(self):
+		return f"ws://{self._host}:{self.port}/gateway"
+
+	@property
+	def commands(self):
+		return list(self._commands.values())
+
+	@property
+	def messages(self):
+		return list(self._messages.values())
+
+	def next_snowflake(self):
+		return next(self._snowflakes)
+
+	def get_command_id(self, name: str):
+		return int(self._commands[name]["id"])
+
+	def expect_response(self, interaction_id: int) -> "asyncio.Future[JSON]":
+		future = asyncio.get_running_loop().create_future()
+		self._response_waiters[interaction_id] = future
+		return future
+
+	def expect_message(self, predicate: MessagePredicate) -> "asyncio.Future[JSON]":
+		future = asyncio.get_running_loop().create_future()
+		self._message_waiters.append((predicate, future))
+		return future
+
+	def _resolve_message(self, message: JSON):
+		waiting: list[tuple[MessagePredicate, "asyncio.Future[JSON]"]] = []
+		for predicate, future in self._message_waiters:
+			if future.done():
+				continue
+			if predicate(message):
+				future.set_result(message)
+			else:
+				waiting.append((predicate, future))
+		self._message_waiters = waiting
+
+	@web.middleware
+	async def _count_request(self, request: web.Request, handler: Any):
+		resource = request.match_info.route.resource
+		path = resource.canonical if resource is not None else request.path
+		self.requests[f"{request.method} {path}"] += 1
+		return await handler(request)
+
+	async def get_gateway_bot(self, _: web.Request):
+		return web.json_response(
+			{
+				"url": self.gateway_url,
+				"shards": 1,
+				"session_start_limit": {
+					"total": 1000,
+					"remaining": 1000,
+					"reset_after": 0,
+					"max_concurrency": 1,
+				},
+			}
+		)
+
+	async def get_application(self, _: web.Request):
+		return web.json_response(build_application())
+
+	async def get_my_user(self, _: web.Request):
+		return web.json_response(build_my_user())
+
+	def _store_command(self, payload: JSON, guild_id: Optional[str] = None):
+		command = {
+			"id": str(self.next_snowflake()),
+			"application_id": str(APPLICATION_ID),
+			"guild_id": guild_id,
+			"type": 1,
+			"description": "",
+			"default_member_permissions": None,
+			"dm_permission": True,
+			"nsfw": False,
+			"version": "1",
+			**payload,
+		}
+		self._commands[command["name"]] = command
+		return command
+
+	async def get_commands(self, _: web.Request):
+		return web.json_response(self.commands)
+
+	async def create_command(self, request: web.Request):
+		return web.json_response(self._store_command(await request.json()))
+
+	async def set_commands(self, request: web.Request):
+		guild_id = request.match_info.get("guild")
+		payloads: list[JSON] = await request.json()
+		return web.json_response([self._store_command(p, guild_id) for p in payloads])
+
+	def _store_message(
+		self, channel_id: int, payload: JSON, guild_id: Optional[int] = None
+	):
+		message = build_message(
+			self.next_snowflake(), channel_id, build_my_user(), payload, guild_id
+		)
+		self._messages[int(message["id"])] = message
+		self._resolve_message(message)
+		return message
+
+	def _store_interaction_message(self, token: str, payload: JSON):
+		interaction = self._interactions.get(token, {})
+		return self._store_message(
+			int(interaction.get("channel_id", 0)),
+			payload,
+			int(interaction["guild_id"]) if "guild_id" in interaction else None,
+		)
+
+	def _update_message(self, message_id: int, payload: JSON):
+		if (message := self._messages.get(message_id)) is None:
+			raise web.HTTPNotFound()
+		for key in ("content", "embeds", "components"):
+			if key in payload:
+				message[key] = payload[key]
+		message["edited_timestamp"] = TIMESTAMP
+		return message
+
+	async def create_interaction_response(self, request: web.Request):
+		interaction_id = int(request.match_info["interaction"])
+		token = request.match_info["token"]
+		payload = await read_payload(request)
+		if payload.get("type") in CALLBACK_MESSAGE_TYPES:
+			message = self._store_interaction_message(token, payload.get("data", {}))
+			self._original_messages[token] = int(message["id"])
+		future = self._response_waiters.pop(interaction_id, None)
+		if future is not None and not future.done():
+			future.set_result(payload)
+		return web.Response(status=204)
+
+	def _get_original_message_id(self, request: web.Request):
+		token = request.match_info["token"]
+		if (message_id := self._original_messages.get(token)) is None:
+			raise web.HTTPNotFound()
+		return message_id
+
+	async def get_original_message(self, request: web.Request):
+		return web.json_response(self._messages[self._get_original_message_id(request)])
+
+	async def edit_original_message(self, request: web.Request):
+		message_id = self._get_original_message_id(request)
+		payload = await read_payload(request)
+		return web.json_response(self._update_message(message_id, payload))
+
+	async def delete_original_message(self, request: web.Request):
+		self._messages.pop(self._get_original_message_id(request), None)
+		return web.Response(status=204)
+
+	async def create_followup_message(self, request: web.Request):
+		payload = await read_payload(request)
+		return web.json_response(
+			self._store_interaction_message(request.match_info["token"], payload)
+		)
+
+	async def create_message(self, request: web.Request):
+		payload = await read_payload(request)
+		channel_id = int(request.match_info["channel"])
+		return web.json_response(self._store_message(channel_id, payload))
+
+	async def edit_message(self, request: web.Request):
+		payload = await read_payload(request)
+		message_id = int(request.match_info["message"])
+		return web.json_response(self._update_message(message_id, payload))
+
+	async def delete_message(self, request: web.Request):
+		self._messages.pop(int(request.match_info["message"]), None)
+		return web.Response(status=204)
+
+	async def _identify(self, socket: GatewaySocket, payload: JSON):
+		await socket.dispatch(
+			"READY",
+			{
+				"v": API_VERSION,
+				"user": build_my_user(),
+				"guilds": [],
+				"session_id": f"session-{self.next_snowflake()}",
+				"resume_gateway_url": self.gateway_url,
+				"shard": payload.get("shard", [0, 1]),
+				"application": {"id": str(APPLICATION_ID), "flags": 0},
+			},
+		)
+
+	async def gateway(self, request: web.Request):
+		ws = web.WebSocketResponse()
+		await ws.prepare(request)
+		socket = GatewaySocket(ws, request.query.get("compress") == "zlib-stream")
+		self._sockets.append(socket)
+		try:
+			await socket.send(
+				{"op": HELLO_OP, "d": {"heartbeat_interval": HEARTBEAT_INTERVAL_MS}}
+			)
+			async for message in ws:
+				if message.type not in (WSMsgType.TEXT, WSMsgType.BINARY):
+					continue
+				payload = json.loads(message.data)
+				if payload["op"] == HEARTBEAT_OP:
+					await socket.send({"op": HEARTBEAT_ACK_OP})
+				elif payload["op"] == IDENTIFY_OP:
+					await self._identify(socket, payload["d"])
+		finally:
+			self._sockets.remove(socket)
+		return ws
+
+	async def dispatch(self, name: str, data: JSON):
+		for socket in self._sockets:
+			await socket.dispatch(name, data)
+
+	async def dispatch_interaction(self, interaction: JSON):
+		self._interactions[interaction["token"]] = interaction
+		await self.dispatch("INTERACTION_CREATE", interaction)
+
+	async def start(self):
+		self._runner = web.AppRunner(self._app, access_log=None)
+		await self._runner.setup()
+		await web.TCPSite(self._runner, self._host, 0).start()
+
+	async def stop(self):
+		if self._runner is not None:
+			await self._runner.cleanup()
+			self._runner = None
+
+	async def __aenter__(self):
+		await self.start()
+		return self
+
+	async def __aexit__(self, *_: object):
+		await self.stop()
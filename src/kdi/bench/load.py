@@ -0,0 +1,399 @@
+from argparse import ArgumentParser
+from collections import Counter
+from dataclasses import asdict, dataclass
+from math import ceil
+from pathlib import Path
+from time import perf_counter
+from typing import Awaitable, Callable, Optional, Sequence
+import asyncio
+import json
+
+import hikari
+import lightbulb
+
+from ..app import create_app
+from ..bot import KDI
+from ..teams.players_message import PLAYER_AVAILABLE_ID, PLAYER_UNAVAILABLE_ID
+from ..util import get_config
+from .fake_discord import (
+	BUTTON_COMPONENT_TYPE,
+	build_interaction,
+	build_message,
+	build_user,
+	COMMAND_INTERACTION_TYPE,
+	COMPONENT_INTERACTION_TYPE,
+	FakeDiscord,
+	JSON,
+)
+
+GUILD_ID = 5000
+
+TEAMS_CHANNEL_ID = 5001
+
+RELAY_CHANNEL_ID = 5002
+
+DM_CHANNEL_ID_BASE = 1 << 40
+
+PLAYER_USER_ID_BASE = 1 << 41
+
+SUBCOMMAND_OPTION_TYPE = 1
+
+INTEGER_OPTION_TYPE = 4
+
+BOOLEAN_OPTION_TYPE = 5
+
+CHANNEL_OPTION_TYPE = 7
+
+CLICK_SCENARIO = "button_click"
+
+COMMAND_SCENARIO = "slash_command"
+
+DM_SCENARIO = "dm"
+
+COMPLETED = "completed"
+
+FAILED = "failed"
+
+DROPPED = "dropped"
+
+LATENCY_PERCENTILES = (50, 95, 99)
+
+DEFAULT_TIMEOUT_SECS = 10.0
+
+DEFAULT_PLAYERS = 20
+
+DEFAULT_MAX_TEAM_SIZE = 4
+
+Outcome = tuple[str, Optional[float]]
+
+PayloadCheck = Callable[[JSON], bool]
+
+
+@dataclass(frozen=True)
+class Scenario:
+	name: str
+	count: int
+	rate: float
+
+
+@dataclass
+class ScenarioReport:
+	name: str
+	sent: int
+	completed: int
+	failed: int
+	dropped: int
+	latency_ms: dict[str, float]
+
+
+@dataclass
+class LoadReport:
+	setup_secs: float
+	duration_secs: float
+	scenarios: list[ScenarioReport]
+	rest_calls: dict[str, int]
+
+
+def summarize_latencies(latencies: Sequence[float]):
+	if not latencies:
+		return {}
+	ordered = sorted(latencies)
+	summary = {
+		f"p{p}": ordered[max(ceil(p / 100 * len(ordered)) - 1, 0)] * 1000
+		for p in LATENCY_PERCENTILES
+	}
+	summary["max"] = ordered[-1] * 1000
+	return summary
+
+
+def build_option(name: str, option_type: int, value: object) -> JSON:
+	return {"name": name, "type": option_type, "value": value}
+
+
+def build_channel(channel_id: int, name: str) -> JSON:
+	return {
+		"id": str(channel_id),
+		"name": name,
+		"type": hikari.ChannelType.GUILD_TEXT.value,
+		"permissions": "0",
+	}
+
+
+def is_message_response(payload: JSON):
+	return payload.get("type") == hikari.ResponseType.MESSAGE_CREATE.value
+
+
+async def start_app(discord: FakeDiscord, timeout: float):
+	ready = asyncio.Event()
+
+	async def on_ready(_: lightbulb.LightbulbStartedEvent):
+		ready.set()
+
+	bot = create_app(discord.rest_url)
+	bot.subscribe(lightbulb.LightbulbStartedEvent, on_ready)
+	await bot.start(check_for_updates=False)
+	await asyncio.wait_for(ready.wait(), timeout)
+	return bot
+
+
+class LoadTest:
+	_discord: FakeDiscord
+	_n_players: int
+	_players_message: Optional[JSON]
+	_timeout: float
+	_trusted_user: JSON
+
+	def __init__(
+		self,
+		discord: FakeDiscord,
+		timeout: float = DEFAULT_TIMEOUT_SECS,
+		n_players: int = DEFAULT_PLAYERS,
+	):
+		config = get_config()
+		trusted_ids = config.user.trusted_ids
+		if not trusted_ids:
+			raise ValueError("Load test requires a trusted user in 'user.trusted_ids'")
+		n_teams = ceil(n_players / DEFAULT_MAX_TEAM_SIZE)
+		n_team_names = min(map(len, config.teams.team_name_components))
+		if n_teams > n_team_names:
+			raise ValueError(
+				f"Load test with {n_players} players needs {n_teams} team names, "
+				f"but 'teams.team_name_components' only has {n_team_names}"
+			)
+		self._discord = discord
+		self._n_players = n_players
+		self._players_message = None
+		self._timeout = timeout
+		self._trusted_user = build_user(min(trusted_ids), "load-test")
+
+	async def _measure(
+		self,
+		response: "asyncio.Future[JSON]",
+		send: Awaitable[None],
+		check: PayloadCheck,
+	) -> Outcome:
+		start = perf_counter()
+		await send
+		try:
+			payload = await asyncio.wait_for(response, self._timeout)
+		except asyncio.TimeoutError:
+			return DROPPED, None
+		if not check(payload):
+			return FAILED, None
+		return COMPLETED, perf_counter() - start
+
+	def _build_command(
+		self,
+		name: str,
+		subcommand: str,
+		options: list[JSON],
+		resolved: Optional[JSON] = None,
+	):
+		data = {
+			"id": str(self._discord.get_command_id(name)),
+			"name": name,
+			"type": hikari.CommandType.SLASH.value,
+			"options": [
+				{"name": subcommand, "type": SUBCOMMAND_OPTION_TYPE, "options": options}
+			],
+		}
+		if resolved is not None:
+			data["resolved"] = resolved
+		return build_interaction(
+			self._discord.next_snowflake(),
+			COMMAND_INTERACTION_TYPE,
+			data,
+			self._trusted_user,
+			GUILD_ID,
+			TEAMS_CHANNEL_ID,
+		)
+
+	async def _send_interaction(self, interaction: JSON, check: PayloadCheck):
+		response = self._discord.expect_response(int(interaction["id"]))
+		return await self._measure(
+			response, self._discord.dispatch_interaction(interaction), check
+		)
+
+	async def setup(self):
+		players_message = self._discord.expect_message(lambda m: bool(m["components"]))
+		start = self._build_command(
+			"teams", "start", [build_option("auto-core", BOOLEAN_OPTION_TYPE, False)]
+		)
+		set_channel = self._build_command(
+			"relay",
+			"set-channel",
+			[build_option("channel", CHANNEL_OPTION_TYPE, str(RELAY_CHANNEL_ID))],
+			{
+				"channels": {
+					str(RELAY_CHANNEL_ID): build_channel(RELAY_CHANNEL_ID, "relay")
+				}
+			},
+		)
+		for interaction in (start, set_channel):
+			outcome, _ = await self._send_interaction(interaction, is_message_response)
+			if outcome != COMPLETED:
+				raise RuntimeError(f"Load test setup {outcome}: {interaction['data']}")
+		self._players_message = await asyncio.wait_for(players_message, self._timeout)
+
+	async def click(self, i: int):
+		if self._players_message is None:
+			raise RuntimeError("Load test has not been set up")
+		player = i % self._n_players
+		available = (i // self._n_players) % 2 == 0
+		interaction = build_interaction(
+			self._discord.next_snowflake(),
+			COMPONENT_INTERACTION_TYPE,
+			{
+				"custom_id": PLAYER_AVAILABLE_ID
+				if available
+				else PLAYER_UNAVAILABLE_ID,
+				"component_type": BUTTON_COMPONENT_TYPE,
+			},
+			build_user(PLAYER_USER_ID_BASE + player, f"player-{player}"),
+			GUILD_ID,
+			TEAMS_CHANNEL_ID,
+			self._players_message,
+		)
+		return await self._send_interaction(
+			interaction,
+			lambda p: p.get("type")
+			== hikari.ResponseType.DEFERRED_MESSAGE_UPDATE.value,
+		)
+
+	async def command(self, _: int):
+		interaction = self._build_command(
+			"teams",
+			"generate",
+			[build_option("max-size", INTEGER_OPTION_TYPE, DEFAULT_MAX_TEAM_SIZE)],
+		)
+		return await self._send_interaction(
+			interaction,
+			lambda p: is_message_response(p) and bool(p["data"].get("embeds")),
+		)
+
+	async def dm(self, i: int):
+		content = f"load test message {i}"
+		dm_channel = str(DM_CHANNEL_ID_BASE + i)
+		response = self._discord.expect_message(
+			lambda m: content in m["content"].split("\n")
+			or m["channel_id"] == dm_channel
+		)
+		message = build_message(
+			self._discord.next_snowflake(),
+			int(dm_channel),
+			self._trusted_user,
+			{"content": content},
+		)
+		return await self._measure(
+			response,
+			self._discord.dispatch("MESSAGE_CREATE", message),
+			lambda m: m["channel_id"] == str(RELAY_CHANNEL_ID),
+		)
+
+	async def run_scenario(self, scenario: Scenario):
+		fire: Callable[[int], Awaitable[Outcome]] = {
+			CLICK_SCENARIO: self.click,
+			COMMAND_SCENARIO: self.command,
+			DM_SCENARIO: self.dm,
+		}[scenario.name]
+		loop = asyncio.get_running_loop()
+		start = loop.time()
+
+		async def fire_at(i: int):
+			await asyncio.sleep(max(start + i / scenario.rate - loop.time(), 0))
+			return await fire(i)
+
+		outcomes = await asyncio.gather(*[fire_at(i) for i in range(scenario.count)])
+		counts = Counter(outcome for outcome, _ in outcomes)
+		return ScenarioReport(
+			name=scenario.name,
+			sent=scenario.count,
+			completed=counts[COMPLETED],
+			failed=counts[FAILED],
+			dropped=counts[DROPPED],
+			latency_ms=summarize_latencies(
+				[latency for _, latency in outcomes if latency is not None]
+			),
+		)
+
+
+async def run_load_test(
+	scenarios: Sequence[Scenario],
+	timeout: float = DEFAULT_TIMEOUT_SECS,
+	n_players: int = DEFAULT_PLAYERS,
+):
+	async with FakeDiscord() as discord:
+		setup_start = perf_counter()
+		bot: Optional[KDI] = None
+		load_test = LoadTest(discord, timeout, n_players)
+		try:
+			bot = await start_app(discord, timeout)
+			await load_test.setup()
+			setup_secs = perf_counter() - setup_start
+			requests_before = Counter(discord.requests)
+			start = perf_counter()
+			reports = await asyncio.gather(
+				*[load_test.run_scenario(s) for s in scenarios if s.count > 0]
+			)
+			duration_secs = perf_counter() - start
+			rest_calls = discord.requests - requests_before
+		finally:
+			if bot is not None:
+				await bot.close()
+	return LoadReport(
+		setup_secs=setup_secs,
+		duration_secs=duration_secs,
+		scenarios=list(reports),
+		rest_calls=dict(rest_calls.most_common()),
+	)
+
+
+def format_report(report: LoadReport):
+	lines = [
+		f"setup: {report.setup_secs * 1000:.1f}ms",
+		f"duration: {report.duration_secs:.2f}s",
+	]
+	for s in report.scenarios:
+		latencies = "  ".join(f"{k} {v:.1f}ms" for k, v in s.latency_ms.items())
+		lines.append(
+			f"{s.name}: {s.completed}/{s.sent} completed, {s.failed} failed, "
+			f"{s.dropped} dropped  {latencies}"
+		)
+	lines.append("rest calls:")
+	lines.extend(f"  {n:8d}  {route}" for route, n in report.rest_calls.items())
+	return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None):
+	parser = ArgumentParser(description="Load test kdi against a fake Discord.")
+	parser.add_argument("--clicks", type=int, default=1000)
+	parser.add_argument("--click-rate", type=float, default=100.0)
+	parser.add_argument("--commands", type=int, default=100)
+	parser.add_argument("--command-rate", type=float, default=10.0)
+	parser.add_argument("--dms", type=int, default=200)
+	parser.add_argument("--dm-rate", type=float, default=20.0)
+	parser.add_argument("--players", type=int, default=DEFAULT_PLAYERS)
+	parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT_SECS)
+	parser.add_argument("--output", type=Path)
+	args = parser.parse_args(argv)
+	for option in ("clicks", "commands", "dms"):
+		if getattr(args, option) < 0:
+			parser.error(f"--{option} must not be negative")
+	for option in ("click_rate", "command_rate", "dm_rate", "players", "timeout"):
+		if getattr(args, option) <= 0:
+			parser.error(f"--{option.replace('_', '-')} must be positive")
+
+	scenarios = [
+		Scenario(CLICK_SCENARIO, args.clicks, args.click_rate),
+		Scenario(COMMAND_SCENARIO, args.commands, args.command_rate),
+		Scenario(DM_SCENARIO, args.dms, args.dm_rate),
+	]
+	report = asyncio.run(run_load_test(scenarios, args.timeout, args.players))
+	print(format_report(report))
+	if args.output is not None:
+		args.output.parent.mkdir(parents=True, exist_ok=True)
+		args.output.write_text(json.dumps(asdict(report), indent="\t") + "\n")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,166 @@
+from argparse import ArgumentParser
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Optional, Sequence, TypeVar
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+
+import lightbulb
+
+from ..app import (
+	create_app,
+	create_audio_client,
+	create_session_store,
+	create_user_store,
+)
+from ..bot import KDI
+from ..relay import RelayPlugin
+from ..teams import TeamsPlugin
+from .fake_discord import FakeDiscord
+
+T = TypeVar("T")
+
+IMPORT_TIME_PREFIX = "import time:"
+
+DEFAULT_MODULE = "kdi.app"
+
+DEFAULT_READY_TIMEOUT_SECS = 30.0
+
+DEFAULT_TOP_MODULES = 25
+
+
+@dataclass(frozen=True)
+class ImportTiming:
+	module: str
+	self_us: int
+	cumulative_us: int
+
+
+@dataclass
+class StartupReport:
+	python: str
+	module: str
+	import_total_us: int
+	imports: list[ImportTiming]
+	construction_secs: dict[str, float]
+	ready_secs: Optional[float]
+
+
+def parse_import_times(stderr: str):
+	timings: list[ImportTiming] = []
+	for line in stderr.splitlines():
+		if not line.startswith(IMPORT_TIME_PREFIX):
+			continue
+		self_us, cumulative_us, module = line[len(IMPORT_TIME_PREFIX) :].split("|")
+		if not self_us.strip().isdigit():
+			continue
+		timings.append(ImportTiming(module.strip(), int(self_us), int(cumulative_us)))
+	return timings
+
+
+def measure_imports(module: str = DEFAULT_MODULE):
+	result = subprocess.run(
+		[sys.executable, "-X", "importtime", "-c", f"import {module}"],
+		capture_output=True,
+		check=True,
+		text=True,
+	)
+	return parse_import_times(result.stderr)
+
+
+def timed(timings: dict[str, float], name: str, create: Callable[[], T]) -> T:
+	start = perf_counter()
+	result = create()
+	timings[name] = perf_counter() - start
+	return result
+
+
+def measure_construction():
+	timings: dict[str, float] = {}
+	bot = timed(timings, "bot", KDI)
+	users = timed(timings, "user_store", create_user_store)
+	audio_client = timed(timings, "audio_client", lambda: create_audio_client(bot))
+	timed(
+		timings,
+		"relay_plugin",
+		lambda: RelayPlugin(audio_client, create_session_store()),
+	)
+	teams = timed(timings, "teams_plugin", lambda: TeamsPlugin(users, bot.components))
+	teams.detach_config()
+	bot.detach_config()
+	return timings
+
+
+async def measure_ready(timeout: float = DEFAULT_READY_TIMEOUT_SECS):
+	async with FakeDiscord() as discord:
+		ready = asyncio.Event()
+
+		async def on_ready(_: lightbulb.LightbulbStartedEvent):
+			ready.set()
+
+		start = perf_counter()
+		bot = create_app(discord.rest_url)
+		bot.subscribe(lightbulb.LightbulbStartedEvent, on_ready)
+		try:
+			await bot.start(check_for_updates=False)
+			await asyncio.wait_for(ready.wait(), timeout)
+			return perf_counter() - start
+		finally:
+			await bot.close()
+
+
+def run(
+	module: str = DEFAULT_MODULE,
+	top: int = DEFAULT_TOP_MODULES,
+	measure_ready_time: bool = True,
+):
+	imports = measure_imports(module)
+	import_total_us = max((t.cumulative_us for t in imports), default=0)
+	construction_secs = measure_construction()
+	ready_secs = asyncio.run(measure_ready()) if measure_ready_time else None
+	return StartupReport(
+		python=platform.python_version(),
+		module=module,
+		import_total_us=import_total_us,
+		imports=sorted(imports, key=lambda t: t.cumulative_us, reverse=True)[:top],
+		construction_secs=construction_secs,
+		ready_secs=ready_secs,
+	)
+
+
+def format_report(report: StartupReport):
+	lines = [f"import {report.module}: {report.import_total_us / 1000:.1f}ms"]
+	lines.extend(
+		f"  {t.cumulative_us / 1000:8.1f}ms  {t.module}" for t in report.imports
+	)
+	lines.append("construction:")
+	lines.extend(
+		f"  {secs * 1000:8.1f}ms  {name}"
+		for name, secs in report.construction_secs.items()
+	)
+	if report.ready_secs is not None:
+		lines.append(f"ready: {report.ready_secs * 1000:.1f}ms")
+	return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None):
+	parser = ArgumentParser(description="Measure kdi startup time.")
+	parser.add_argument("--module", default=DEFAULT_MODULE)
+	parser.add_argument("--top", type=int, default=DEFAULT_TOP_MODULES)
+	parser.add_argument("--no-ready", action="store_true")
+	parser.add_argument("--output", type=Path)
+	args = parser.parse_args(argv)
+
+	report = run(args.module, args.top, not args.no_ready)
+	print(format_report(report))
+	if args.output is not None:
+		args.output.parent.mkdir(parents=True, exist_ok=True)
+		args.output.write_text(json.dumps(asdict(report), indent="\t") + "\n")
+
+
+if __name__ == "__main__":
+	main()
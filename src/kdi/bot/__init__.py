@@ -1,3 +1,13 @@
-from .bot import audio_client, kdi, KDI
+from .bot import BASE_CAPABILITIES, get_plugin, KDI
+from .capabilities import Capabilities, combine_capabilities
+from .component_router import ComponentHandler, ComponentRouter
 
-__all__ = ["audio_client", "kdi", "KDI"]
+__all__ = [
+	"BASE_CAPABILITIES",
+	"Capabilities",
+	"combine_capabilities",
+	"ComponentHandler",
+	"ComponentRouter",
+	"get_plugin",
+	"KDI",
+]
@@ -1,35 +1,130 @@
-from lightbulb.ext import tasks
+from typing import Callable, Optional, TypeVar
+
 import hikari
 import lightbulb
-import ongaku
-
-from ..util import get_config_value
 
-INTENTS = (
-	hikari.Intents.ALL_UNPRIVILEGED
-	| hikari.Intents.GUILD_MEMBERS
-	| hikari.Intents.GUILD_MESSAGES
-	| hikari.Intents.MESSAGE_CONTENT
+from ..util import (
+	Config,
+	configure_logging,
+	ConfigWatcher,
+	get_config,
+	LoopMonitor,
+	metrics,
+	MetricsServer,
+	subscribe_config,
 )
+from .capabilities import Capabilities, combine_capabilities
+from .component_router import ComponentRouter
+from .instrumentation import CommandTimer, instrument_rest
+
+BASE_CAPABILITIES = Capabilities(hikari.Intents.GUILDS, hikari.api.CacheComponents.ME)
+
+P = TypeVar("P", bound=lightbulb.Plugin)
+
+
+def get_plugin(app: hikari.RESTAware, plugin_type: type[P]) -> P:
+	if isinstance(app, lightbulb.BotApp):
+		for plugin in app.plugins.values():
+			if isinstance(plugin, plugin_type):
+				return plugin
+	raise LookupError(f"Plugin not loaded: {plugin_type.__name__}")
 
 
 class KDI(lightbulb.BotApp):
 	_audio_password: str
+	_capabilities: Capabilities
+	_command_timer: CommandTimer
+	_components: ComponentRouter
+	_config_watcher: ConfigWatcher
+	_loop_monitor: Optional[LoopMonitor]
+	_metrics_server: Optional[MetricsServer]
+	_unsubscribe_config: Callable[[], None]
+	_worker: int
 
-	def __init__(self):
+	def __init__(
+		self,
+		rest_url: Optional[str] = None,
+		capabilities: Capabilities = Capabilities(),
+		worker: int = 0,
+	):
+		config = get_config()
+		self._worker = worker
+		self.on_config_changed(config)
+		self._capabilities = combine_capabilities(
+			BASE_CAPABILITIES, ComponentRouter.CAPABILITIES, capabilities
+		)
 		super().__init__(
-			token=get_config_value("bot", "token"),
-			intents=INTENTS,
+			token=config.bot.token,
+			intents=self._capabilities.intents,
+			cache_settings=self._capabilities.cache_settings(),
+			rest_url=rest_url,
 		)
-		self._audio_password = get_config_value("relay", "audio_password")
+		self._audio_password = config.relay.audio_password
+		self._command_timer = CommandTimer(self)
+		self._components = ComponentRouter(self)
+		self._config_watcher = ConfigWatcher(config.bot.config_poll_secs)
+		self._loop_monitor = None
+		if config.loop_monitor.enabled:
+			self._loop_monitor = LoopMonitor(
+				config.loop_monitor.interval_secs,
+				config.loop_monitor.lag_threshold_secs,
+				config.loop_monitor.watchdog,
+			)
+		self._metrics_server = None
+		if config.metrics.enabled:
+			self._metrics_server = MetricsServer(
+				metrics, config.metrics.host, config.metrics.port + worker
+			)
+		instrument_rest()
+
+		self.subscribe(hikari.StartedEvent, self.on_started)
+		self.subscribe(hikari.StoppingEvent, self.on_stopping)
+		self._unsubscribe_config = subscribe_config(self.on_config_changed)
 
 	@property
 	def audio_password(self):
 		return self._audio_password
 
+	@property
+	def capabilities(self):
+		return self._capabilities
+
+	@property
+	def components(self):
+		return self._components
+
+	@property
+	def worker(self):
+		return self._worker
+
+	def on_config_changed(self, config: Config):
+		configure_logging(
+			config.logging.level,
+			config.logging.max_bytes,
+			config.logging.backup_count,
+			self._worker,
+		)
+
+	def detach_config(self):
+		self._unsubscribe_config()
+
+	async def _manage_application_commands(self, event: hikari.StartingEvent):
+		if self._worker == 0:
+			await super()._manage_application_commands(event)
+			return
+		await self.dispatch(lightbulb.LightbulbStartedEvent(app=self))
 
-kdi = KDI()
-tasks.load(kdi)
+	async def on_started(self, _: hikari.StartedEvent):
+		self._config_watcher.start()
+		if self._loop_monitor is not None:
+			self._loop_monitor.start()
+		if self._metrics_server is not None:
+			await self._metrics_server.start()
 
-audio_client = ongaku.Client(kdi)
-audio_client.create_session("hikari-session", password=kdi.audio_password)
+	async def on_stopping(self, _: hikari.StoppingEvent):
+		self.detach_config()
+		self._config_watcher.stop()
+		if self._loop_monitor is not None:
+			self._loop_monitor.stop()
+		if self._metrics_server is not None:
+			await self._metrics_server.stop()
@@ -0,0 +1,21 @@
+from dataclasses import dataclass
+from functools import reduce
+from operator import or_
+
+import hikari
+
+
+@dataclass(frozen=True)
+class Capabilities:
+	intents: hikari.Intents = hikari.Intents.NONE
+	cache: hikari.api.CacheComponents = hikari.api.CacheComponents.NONE
+
+	def __or__(self, other: "Capabilities"):
+		return Capabilities(self.intents | other.intents, self.cache | other.cache)
+
+	def cache_settings(self):
+		return hikari.impl.CacheSettings(components=self.cache)
+
+
+def combine_capabilities(*capabilities: Capabilities) -> Capabilities:
+	return reduce(or_, capabilities, Capabilities())
@@ -0,0 +1,73 @@
+from typing import Awaitable, Callable, Optional
+
+import hikari
+
+from ..util import metrics
+from .capabilities import Capabilities
+
+CUSTOM_ID_SEPARATOR = ":"
+
+ComponentHandler = Callable[[hikari.ComponentInteraction], Awaitable[object]]
+
+COMPONENT_INTERACTIONS = metrics.counter(
+	"kdi_component_interactions_total",
+	"Component interactions received, by whether a handler was found.",
+	["result"],
+)
+
+
+def get_custom_id_prefix(custom_id: str):
+	return custom_id.partition(CUSTOM_ID_SEPARATOR)[0]
+
+
+class ComponentRouter:
+	CAPABILITIES = Capabilities(hikari.Intents.GUILD_MESSAGES)
+
+	_message_handlers: dict[hikari.Snowflake, ComponentHandler]
+	_prefix_handlers: dict[str, ComponentHandler]
+
+	def __init__(self, bot: hikari.GatewayBot):
+		self._message_handlers = {}
+		self._prefix_handlers = {}
+
+		bot.subscribe(hikari.InteractionCreateEvent, self.on_interaction)
+		bot.subscribe(hikari.GuildMessageDeleteEvent, self.on_message_delete)
+
+	def add_prefix(self, prefix: str, handler: ComponentHandler):
+		if CUSTOM_ID_SEPARATOR in prefix:
+			raise ValueError(f"Prefix cannot contain '{CUSTOM_ID_SEPARATOR}': {prefix}")
+		if prefix in self._prefix_handlers:
+			raise ValueError(f"Prefix already routed: {prefix}")
+		self._prefix_handlers[prefix] = handler
+
+	def remove_prefix(self, prefix: str):
+		self._prefix_handlers.pop(prefix, None)
+
+	def add_message(self, message_id: hikari.Snowflakeish, handler: ComponentHandler):
+		self._message_handlers[hikari.Snowflake(message_id)] = handler
+
+	def remove_message(self, message_id: hikari.Snowflakeish):
+		self._message_handlers.pop(hikari.Snowflake(message_id), None)
+
+	def find(
+		self, interaction: hikari.ComponentInteraction
+	) -> Optional[ComponentHandler]:
+		handler = self._message_handlers.get(interaction.message.id)
+		if handler is None:
+			prefix = get_custom_id_prefix(interaction.custom_id)
+			handler = self._prefix_handlers.get(prefix)
+		return handler
+
+	async def on_interaction(self, event: hikari.InteractionCreateEvent):
+		interaction = event.interaction
+		if not isinstance(interaction, hikari.ComponentInteraction):
+			return
+		handler = None if interaction.user.is_bot else self.find(interaction)
+		if handler is None:
+			COMPONENT_INTERACTIONS.inc(result="dropped")
+			return
+		COMPONENT_INTERACTIONS.inc(result="routed")
+		await handler(interaction)
+
+	async def on_message_delete(self, event: hikari.GuildMessageDeleteEvent):
+		self.remove_message(event.message_id)
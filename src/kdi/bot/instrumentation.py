@@ -0,0 +1,84 @@
+from datetime import datetime, timezone
+from functools import wraps
+from time import perf_counter
+from typing import Any
+
+from hikari.internal import routes
+import hikari
+import lightbulb
+
+from ..util import metrics
+
+COMMAND_DURATION = metrics.histogram(
+	"kdi_command_duration_seconds",
+	"Time spent handling slash commands.",
+	["command", "outcome"],
+)
+
+INTERACTION_ACK_LATENCY = metrics.histogram(
+	"kdi_interaction_ack_seconds",
+	"Delay between an interaction's creation and its initial response.",
+)
+
+REST_REQUESTS = metrics.counter(
+	"kdi_rest_requests_total",
+	"REST requests made to Discord.",
+	["method", "route"],
+)
+
+
+def get_interaction_age(interaction_id: hikari.Snowflake):
+	return (datetime.now(timezone.utc) - interaction_id.created_at).total_seconds()
+
+
+def get_interaction_id(compiled_route: routes.CompiledRoute):
+	return hikari.Snowflake(compiled_route.compiled_path.split("/")[2])
+
+
+def instrument_rest():
+	request = hikari.impl.RESTClientImpl._request
+	if hasattr(request, "__wrapped__"):
+		return
+
+	@wraps(request)
+	async def counted_request(
+		rest: hikari.impl.RESTClientImpl,
+		compiled_route: routes.CompiledRoute,
+		**kwargs: Any,
+	):
+		route = compiled_route.route
+		REST_REQUESTS.inc(method=route.method, route=route.path_template)
+		response = await request(rest, compiled_route, **kwargs)
+		if route is routes.POST_INTERACTION_RESPONSE:
+			interaction_id = get_interaction_id(compiled_route)
+			INTERACTION_ACK_LATENCY.observe(get_interaction_age(interaction_id))
+		return response
+
+	setattr(hikari.impl.RESTClientImpl, "_request", counted_request)
+
+
+class CommandTimer:
+	_started: dict[lightbulb.Context, float]
+
+	def __init__(self, bot: lightbulb.BotApp):
+		self._started = {}
+
+		bot.subscribe(lightbulb.SlashCommandInvocationEvent, self.on_invocation)
+		bot.subscribe(lightbulb.SlashCommandCompletionEvent, self.on_completion)
+		bot.subscribe(lightbulb.SlashCommandErrorEvent, self.on_error)
+
+	def _finish(self, context: lightbulb.Context, outcome: str):
+		if (start := self._started.pop(context, None)) is None:
+			return
+		COMMAND_DURATION.observe(
+			perf_counter() - start, command=context.command.qualname, outcome=outcome
+		)
+
+	async def on_invocation(self, event: lightbulb.SlashCommandInvocationEvent):
+		self._started[event.context] = perf_counter()
+
+	async def on_completion(self, event: lightbulb.SlashCommandCompletionEvent):
+		self._finish(event.context, "success")
+
+	async def on_error(self, event: lightbulb.SlashCommandErrorEvent):
+		self._finish(event.context, "error")
@@ -0,0 +1,133 @@
+from dataclasses import dataclass
+from math import ceil
+from multiprocessing import get_context
+from typing import Optional, Sequence
+import asyncio
+import time
+
+import hikari
+
+from .app import create_app, get_session_db_path
+from .store import SQLiteSessionStore
+from .util import configure_logging, get_config, log
+
+SNOWFLAKE_TIMESTAMP_SHIFT = 22
+
+IDENTIFY_WINDOW_SECS = 5.0
+
+IDENTIFY_MARGIN_SECS = 1.0
+
+
+def get_shard_id(guild_id: hikari.Snowflakeish, shard_count: int):
+	return (int(guild_id) >> SNOWFLAKE_TIMESTAMP_SHIFT) % shard_count
+
+
+@dataclass(frozen=True)
+class ShardPlan:
+	shard_count: int
+	workers: tuple[tuple[int, ...], ...]
+	max_concurrency: int = 1
+
+	def get_worker(self, guild_id: hikari.Snowflakeish):
+		shard_id = get_shard_id(guild_id, self.shard_count)
+		for worker, shard_ids in enumerate(self.workers):
+			if shard_id in shard_ids:
+				return worker
+		raise LookupError(f"Shard not assigned to a worker: {shard_id}")
+
+	def get_start_delay(self, worker: int):
+		windows = sum(
+			ceil(len(shard_ids) / self.max_concurrency)
+			for shard_ids in self.workers[:worker]
+		)
+		return windows * (IDENTIFY_WINDOW_SECS + IDENTIFY_MARGIN_SECS)
+
+
+def plan_shards(shard_count: int, n_workers: int, max_concurrency: int = 1):
+	if shard_count < 1 or n_workers < 1 or max_concurrency < 1:
+		raise ValueError("Shard, worker and concurrency counts must be at least 1")
+	n_workers = min(n_workers, shard_count)
+	size, n_larger = divmod(shard_count, n_workers)
+	workers: list[tuple[int, ...]] = []
+	start = 0
+	for worker in range(n_workers):
+		end = start + size + (worker < n_larger)
+		workers.append(tuple(range(start, end)))
+		start = end
+	return ShardPlan(shard_count, tuple(workers), max_concurrency)
+
+
+async def fetch_gateway_bot_info(token: str, rest_url: Optional[str] = None):
+	rest = hikari.RESTApp(url=rest_url)
+	await rest.start()
+	try:
+		async with rest.acquire(token, hikari.TokenType.BOT) as client:
+			return await client.fetch_gateway_bot_info()
+	finally:
+		await rest.close()
+
+
+def run_worker(
+	worker: int = 0,
+	shard_ids: Optional[Sequence[int]] = None,
+	shard_count: Optional[int] = None,
+	start_delay: float = 0.0,
+):
+	app = create_app(worker=worker)
+	if start_delay > 0:
+		log.info(f"Waiting {start_delay:.0f}s for earlier workers to identify")
+		time.sleep(start_delay)
+	app.run(shard_ids=shard_ids, shard_count=shard_count)
+
+
+def launch(plan: ShardPlan):
+	if len(plan.workers) == 1:
+		run_worker(0, plan.workers[0], plan.shard_count)
+		return
+	context = get_context("spawn")
+	processes = [
+		context.Process(
+			target=run_worker,
+			args=(worker, shard_ids, plan.shard_count, plan.get_start_delay(worker)),
+			name=f"kdi-worker-{worker}",
+		)
+		for worker, shard_ids in enumerate(plan.workers)
+	]
+	for p in processes:
+		p.start()
+	try:
+		for p in processes:
+			p.join()
+			if p.exitcode:
+				log.error(f"{p.name} exited with code {p.exitcode}")
+	finally:
+		for p in processes:
+			if p.is_alive():
+				p.terminate()
+			p.join()
+
+
+async def reset_sessions():
+	if get_config().shards.session_store != "sqlite":
+		return
+	sessions = SQLiteSessionStore(get_session_db_path())
+	await sessions.clear()
+	await sessions.close()
+
+
+def main():
+	config = get_config()
+	configure_logging(config.logging.level, 0, 0)
+	asyncio.run(reset_sessions())
+	if config.shards.workers == 1 and config.shards.shard_count == 0:
+		run_worker()
+		return
+	info = asyncio.run(fetch_gateway_bot_info(config.bot.token))
+	shard_count = config.shards.shard_count or info.shard_count
+	plan = plan_shards(
+		shard_count,
+		config.shards.workers,
+		info.session_start_limit.max_concurrency,
+	)
+	log.info(f"Running {shard_count} shards across {len(plan.workers)} workers")
+	launch(plan)
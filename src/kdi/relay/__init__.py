@@ -1,3 +1,3 @@
-from .relay import relay_plugin
+from .relay import RelayPlugin
 
-__all__ = ["relay_plugin"]
+__all__ = ["RelayPlugin"]
@@ -1,18 +1,32 @@
-from concurrent.futures import ThreadPoolExecutor
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from pathlib import Path
+from textwrap import wrap
+from typing import Any, Callable, Optional, TypeVar
 import asyncio
+import os
+import re
+import shutil
 
 import hikari
 import lightbulb
 import ongaku
-import pyttsx3
 
-from ..bot import audio_client, kdi
-from ..util import get_cache_dir, get_config_value, log
+from ..bot import Capabilities, get_plugin
+from ..store import SessionStore
+from ..util import get_config, log, metrics
+from . import tts_worker
+from .relay_queue import Attachments, RelayQueue
+from .speech_queue import share_tracks, SpeechQueue, TrackFutures
+from .tts_cache import get_tts_cache_dir, TTSCache
+from .voice_sessions import VoiceSessionManager
 
 CHANNEL_NOT_SET_RESPONSE = r":warning: You haven't set a channel to relay messages into. Use `/relay channel {id}` e.g. `/relay channel 0123456789`."
 
-SET_CHANNEL_SUCCESS_RESPONSE = ":white_check_mark: Successfully set your relay channel."
+SET_CHANNEL_SUCCESS_RESPONSE = (
+	":white_check_mark: Successfully set your relay channel(s)."
+)
 
 UNTRUSTED_USER_RESPONSE = ":no_entry: Only trusted users can relay messages. Sorry!"
 
@@ -22,45 +36,224 @@ NOT_CONNECTED_RESPONSE = ":warning: Not currently connected to a channel."
 
 SUCCESSFUL_DISCONNECT_RESPONSE = ":white_check_mark: Successfully left the channel."
 
-SUCCESSFUL_SPEAK_RESPONSE = ":white_check_mark: Successfully spoke message."
+SUCCESSFUL_SPEAK_RESPONSE = ":white_check_mark: Successfully queued message."
+
+RELAY_QUEUE_FULL_RESPONSE = ":hourglass: Too many messages are waiting to be relayed. Please slow down and resend this one shortly."
+
+SPEECH_QUEUE_FULL_RESPONSE = (
+	":hourglass: Too many messages are waiting to be spoken. Try again shortly."
+)
+
+
+BROADCAST_PLAYING_STATUS = ":white_check_mark: Playing."
+
+BROADCAST_QUEUED_STATUS = ":hourglass: Queued behind earlier messages."
+
+BROADCAST_QUEUE_FULL_STATUS = ":no_entry: Speech queue is full."
+
+BROADCAST_START_TIMEOUT_SECS = 2.0
+
+T = TypeVar("T")
 
 
 def SUCCESSFUL_CONNECT_RESPONSE(channel: str):
 	return f":white_check_mark: Joined {channel}."
 
 
+def BROADCAST_FAILED_STATUS(error: BaseException):
+	return f":warning: Failed ({type(error).__name__})."
+
+
+def USER_CHANNELS_KEY(user_id: hikari.Snowflakeish):
+	return f"relay:channels:{user_id}"
+
+
+def BROADCAST_RESPONSE(statuses: list[tuple[str, str]]):
+	return "\n".join(f"**{guild}**: {status}" for guild, status in statuses)
+
+
+MAX_TARGET_CHANNELS = 4
+
+
+def get_channel_ids_from_options(options: lightbulb.OptionsProxy):
+	return {v.id for _, v in options.items() if isinstance(v, hikari.PartialChannel)}
+
+
+TTS_CACHE_LOOKUPS = metrics.counter(
+	"kdi_tts_cache_lookups_total",
+	"TTS cache lookups, by cache layer and result.",
+	["cache", "result"],
+)
+
+TTS_RENDER_DURATION = metrics.histogram(
+	"kdi_tts_render_seconds", "Time spent synthesizing uncached TTS audio."
+)
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_sentences(text: str, max_length: int):
+	return [
+		chunk
+		for sentence in SENTENCE_BOUNDARY.split(text.strip())
+		for chunk in wrap(sentence, max_length)
+	]
+
+
+def discard_render(path: Path):
+	def callback(job: asyncio.Future[None]):
+		path.unlink(missing_ok=True)
+		if not job.cancelled():
+			job.exception()
+
+	return callback
+
+
 class TTSClient:
-	_CACHE_FILE_NAME = "tts.mp3"
 	_DEFAULT_RATE = 165
-	_MAX_WORKERS = 1
-
-	def __init__(self):
-		self.engine = pyttsx3.init()
-		self.engine.setProperty("rate", self._DEFAULT_RATE)
-		self.executor = ThreadPoolExecutor(max_workers=self._MAX_WORKERS)
-		self.out_path = (get_cache_dir() / self._CACHE_FILE_NAME).absolute().as_posix()
-		self.load_config_voice()
-
-	def load_config_voice(self):
-		desired = get_config_value("relay", "voice")
-		desired_lower = desired.lower()
-		for available in self.engine.getProperty("voices"):
-			if desired_lower in available.id.lower():
-				self.engine.setProperty("voice", available.id)
-				return
-		log.warning(f"Failed to load specified voice '{desired}'. Available options:")
-		for available in self.engine.getProperty("voices"):
-			log.warning("\t* " + available.id)
-
-	def save_sync(self, message: str):
-		self.engine.save_to_file(message, self.out_path)
-		self.engine.runAndWait()
-
-	async def create_track(self, message: str):
-		track_path = await self.render(message)
-		load_result = await audio_client.rest.load_track(track_path)
-		if load_result is None:
-			raise FileNotFoundError(track_path)
+	_MAX_CACHED_LENGTH = 256
+	_MAX_CHUNK_LENGTH = 200
+	_MAX_WORKERS = min(4, os.cpu_count() or 1)
+	_OPUS_EXTENSION = ".ogg"
+
+	_audio_client: ongaku.Client
+	_cache: Optional[TTSCache]
+	_cache_task: Optional[asyncio.Task[TTSCache]]
+	_desired_voice: str
+	_ephemeral_paths: set[Path]
+	_executor: Optional[ProcessPoolExecutor]
+	_ffmpeg: Optional[str]
+	_voice_task: Optional[asyncio.Task[str]]
+	_worker: int
+
+	def __init__(self, audio_client: ongaku.Client, worker: int = 0):
+		self._audio_client = audio_client
+		self._cache = None
+		self._cache_task = None
+		self._desired_voice = get_config().relay.voice
+		self._ephemeral_paths = set()
+		self._executor = None
+		self._ffmpeg = None
+		self._voice_task = None
+		self._worker = worker
+
+	def _build_cache(self):
+		self._ffmpeg = shutil.which("ffmpeg")
+		directory = get_tts_cache_dir(self._worker)
+		if self._ffmpeg is None:
+			log.warning("ffmpeg not found; TTS audio will not be pre-encoded to Opus")
+			return TTSCache(directory=directory)
+		return TTSCache(directory=directory, extension=self._OPUS_EXTENSION)
+
+	@property
+	def cache(self):
+		if self._cache is None:
+			self._cache = self._build_cache()
+		return self._cache
+
+	async def load_cache(self):
+		if self._cache is not None:
+			return self._cache
+		if self._cache_task is None:
+			self._cache_task = asyncio.create_task(asyncio.to_thread(self._build_cache))
+		try:
+			cache = await self._cache_task
+		except Exception:
+			self._cache_task = None
+			raise
+		if self._cache is None:
+			self._cache = cache
+		return self._cache
+
+	@property
+	def executor(self):
+		if self._executor is None:
+			self._executor = ProcessPoolExecutor(
+				max_workers=self._MAX_WORKERS,
+				mp_context=get_context("spawn"),
+				initializer=tts_worker.init_worker,
+				initargs=(self._desired_voice, self._DEFAULT_RATE),
+			)
+		return self._executor
+
+	async def _run_in_pool(self, fn: Callable[..., T], *args: Any) -> T:
+		executor = self.executor
+		try:
+			return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+		except BrokenProcessPool:
+			if self._executor is executor:
+				log.warning("TTS worker pool broke; it will be rebuilt on next use")
+				self._executor = None
+				executor.shutdown(wait=False, cancel_futures=True)
+			raise
+
+	def shutdown(self):
+		if self._executor is not None:
+			self._executor.shutdown(wait=False, cancel_futures=True)
+			self._executor = None
+
+	async def _resolve_voice(self):
+		voice_id, available = await self._run_in_pool(tts_worker.get_voice_info)
+		if self._desired_voice.lower() not in voice_id.lower():
+			log.warning(
+				f"Failed to load specified voice '{self._desired_voice}'. Available options:"
+			)
+			for a in available:
+				log.warning("\t* " + a)
+		return voice_id
+
+	async def get_voice_id(self):
+		if self._voice_task is None:
+			self._voice_task = asyncio.create_task(self._resolve_voice())
+		try:
+			return await self._voice_task
+		except Exception:
+			self._voice_task = None
+			raise
+
+	async def warm_up(self):
+		cache, *_ = await asyncio.gather(
+			self.load_cache(),
+			self.get_voice_id(),
+			*[
+				self._run_in_pool(tts_worker.warm_up)
+				for _ in range(self._MAX_WORKERS - 1)
+			],
+		)
+		log.info(f"Loaded {len(cache)} cached TTS files")
+
+	async def cache_key(self, message: str):
+		cache = await self.load_cache()
+		voice_id = await self.get_voice_id()
+		return cache.make_key(message, voice_id, self._DEFAULT_RATE)
+
+	def is_cacheable(self, message: str):
+		return len(message) <= self._MAX_CACHED_LENGTH
+
+	def discard(self, path: Path):
+		if path in self._ephemeral_paths:
+			self._ephemeral_paths.discard(path)
+			path.unlink(missing_ok=True)
+
+	def release(self, track: ongaku.Track):
+		if track.info.uri is not None:
+			self.discard(Path(track.info.uri))
+
+	async def create_track(self, message: str, cacheable: bool = True):
+		key = await self.cache_key(message)
+		if cacheable and (track := self.cache.get_track(key)) is not None:
+			TTS_CACHE_LOOKUPS.inc(cache="track", result="hit")
+			return track
+		if cacheable:
+			TTS_CACHE_LOOKUPS.inc(cache="track", result="miss")
+		track_path = await self.render(message, cacheable)
+		try:
+			load_result = await self._audio_client.rest.load_track(track_path)
+			if load_result is None:
+				raise FileNotFoundError(track_path)
+		except BaseException:
+			self.discard(Path(track_path))
+			raise
 		track: Optional[ongaku.Track] = None
 		if isinstance(load_result, ongaku.Playlist):
 			track = load_result.tracks[0]
@@ -68,43 +261,138 @@ class TTSClient:
 			track = load_result
 		else:
 			track = load_result[0]
+		if cacheable:
+			self.cache.set_track(key, track)
 		return track
 
-	async def render(self, message: str):
-		await asyncio.get_running_loop().run_in_executor(
-			self.executor, self.save_sync, message
+	def prefetch(self, message: str, shared: bool = False) -> TrackFutures:
+		cacheable = shared or self.is_cacheable(message)
+		chunks = split_sentences(message, self._MAX_CHUNK_LENGTH)
+		return [asyncio.ensure_future(self.create_track(c, cacheable)) for c in chunks]
+
+	async def render(self, message: str, cacheable: bool = True):
+		key = await self.cache_key(message)
+		if cacheable and (track_path := self.cache.get(key)) is not None:
+			TTS_CACHE_LOOKUPS.inc(cache="file", result="hit")
+			return track_path
+		if cacheable:
+			TTS_CACHE_LOOKUPS.inc(cache="file", result="miss")
+		out_path = self.cache.temp_path()
+		job = asyncio.ensure_future(
+			self._run_in_pool(
+				tts_worker.synthesize, message, out_path.as_posix(), self._ffmpeg
+			)
 		)
-		return self.out_path
+		try:
+			with TTS_RENDER_DURATION.time():
+				await asyncio.shield(job)
+		except BaseException:
+			job.add_done_callback(discard_render(out_path))
+			raise
+		if not cacheable:
+			self._ephemeral_paths.add(out_path)
+			return out_path.as_posix()
+		return self.cache.add(key, out_path)
 
 
 class RelayPlugin(lightbulb.Plugin):
-	_trusted_user_ids: list[hikari.Snowflakeish]
+	CAPABILITIES = Capabilities(
+		hikari.Intents.DM_MESSAGES | hikari.Intents.GUILD_VOICE_STATES,
+		hikari.api.CacheComponents.GUILDS,
+	)
+
+	_MAX_CONCURRENT_UPLOADS = 2
+
+	_relay_queues: dict[hikari.Snowflakeish, RelayQueue]
+	_sessions: SessionStore
+	_speech_queues: dict[hikari.Snowflakeish, SpeechQueue]
 	_tts: TTSClient
-	_user_channel: dict[hikari.Snowflakeish, hikari.Snowflakeish]
+	_upload_slots: asyncio.Semaphore
+	_voices: VoiceSessionManager
 
-	def __init__(self):
+	def __init__(
+		self, audio_client: ongaku.Client, sessions: SessionStore, worker: int = 0
+	):
 		super().__init__("relay")
-		self._trusted_user_ids = get_config_value("user", "trusted_ids")
-		self._tts = TTSClient()
-		self._user_channel = {}
+		self._relay_queues = {}
+		self._sessions = sessions
+		self._speech_queues = {}
+		self._tts = TTSClient(audio_client, worker)
+		self._upload_slots = asyncio.Semaphore(self._MAX_CONCURRENT_UPLOADS)
+		self._voices = VoiceSessionManager(
+			audio_client,
+			get_config().relay.voice_idle_timeout_secs,
+			self._clear_speech_queue,
+		)
 
-		kdi.subscribe(hikari.DMMessageCreateEvent, self.on_dm)
+		self.command(relay_group)
+		self.listener(hikari.DMMessageCreateEvent, self.on_dm)
+		self.listener(hikari.StartedEvent, self.on_started)
+		self.listener(hikari.StoppingEvent, self.on_stopping)
+		self.listener(ongaku.ReadyEvent, self._voices.on_ready)
+		self.listener(ongaku.WebsocketClosedEvent, self._voices.on_websocket_closed)
+		self.listener(ongaku.TrackEndEvent, self.on_track_end)
+		self.listener(ongaku.QueueNextEvent, self.on_queue_advance)
+		self.listener(ongaku.QueueEmptyEvent, self.on_queue_advance)
+
+	def _get_speech_queue(self, player: ongaku.Player):
+		if (queue := self._speech_queues.get(player.guild_id)) is None:
+			queue = self._speech_queues[player.guild_id] = SpeechQueue(
+				player,
+				self._tts.prefetch,
+				self._tts.release,
+				get_config().relay.speech_queue_depth,
+			)
+		return queue
+
+	def _get_guild_name(self, guild_id: hikari.Snowflakeish):
+		guild = self.bot.cache.get_guild(guild_id)
+		return guild.name if guild is not None else str(guild_id)
+
+	async def _relay(
+		self, channel_id: hikari.Snowflakeish, content: str, attachments: Attachments
+	):
+		await self.bot.rest.create_message(
+			channel_id,
+			content or hikari.UNDEFINED,
+			attachments=attachments or hikari.UNDEFINED,
+		)
 
-	@staticmethod
-	def _get_player(guild_id: hikari.Snowflakeish):
-		try:
-			return audio_client.fetch_player(guild_id)
-		except Exception:
-			return audio_client.create_player(guild_id)
+	def _get_relay_queue(self, channel_id: hikari.Snowflakeish):
+		if (queue := self._relay_queues.get(channel_id)) is None:
+			queue = self._relay_queues[channel_id] = RelayQueue(
+				channel_id, self._relay, self._upload_slots
+			)
+		return queue
+
+	def _clear_speech_queue(self, guild_id: hikari.Snowflakeish):
+		if (queue := self._speech_queues.pop(guild_id, None)) is not None:
+			queue.clear()
 
 	def is_trusted_user(self, user_id: hikari.Snowflakeish):
-		return user_id in self._trusted_user_ids
+		return user_id in get_config().user.trusted_ids
+
+	async def get_user_channels(self, user_id: hikari.Snowflakeish) -> set[int]:
+		return set(await self._sessions.get(USER_CHANNELS_KEY(user_id)) or ())
+
+	async def set_user_channels(
+		self, user_id: hikari.Snowflakeish, channel_ids: set[hikari.Snowflake]
+	):
+		await self._sessions.set(USER_CHANNELS_KEY(user_id), sorted(channel_ids))
 
 	async def send_message(self, event: hikari.DMMessageCreateEvent):
-		if not event.content or event.content.startswith("/"):
+		content = event.content or ""
+		attachments = event.message.attachments
+		if content.startswith("/") or not (content or attachments):
 			return
-		if (channel_id := self._user_channel.get(event.author_id)) is not None:
-			await kdi.rest.create_message(channel_id, event.content)
+		if channel_ids := await self.get_user_channels(event.author_id):
+			accepted = [
+				self._get_relay_queue(c).put(content, attachments) for c in channel_ids
+			]
+			if not all(accepted):
+				await event.message.respond(
+					RELAY_QUEUE_FULL_RESPONSE, flags=hikari.MessageFlag.EPHEMERAL
+				)
 		else:
 			await event.message.respond(
 				CHANNEL_NOT_SET_RESPONSE, flags=hikari.MessageFlag.EPHEMERAL
@@ -120,20 +408,39 @@ class RelayPlugin(lightbulb.Plugin):
 			return
 		await self.send_message(event)
 
+	async def on_started(self, _: hikari.StartedEvent):
+		self._voices.start()
+		await self._tts.warm_up()
+
+	async def on_stopping(self, _: hikari.StoppingEvent):
+		self._voices.stop()
+		self._tts.shutdown()
+		await self._sessions.close()
+
+	async def on_track_end(self, event: ongaku.TrackEndEvent):
+		self._tts.release(event.track)
+		self._voices.touch(event.guild_id)
+
+	async def on_queue_advance(
+		self, event: ongaku.QueueNextEvent | ongaku.QueueEmptyEvent
+	):
+		if (queue := self._speech_queues.get(event.guild_id)) is not None:
+			queue.notify_advanced()
+
 	async def set_channel(self, ctx: lightbulb.SlashContext):
-		self._user_channel[ctx.user.id] = ctx.options["channel"].id
+		await self.set_user_channels(
+			ctx.user.id, get_channel_ids_from_options(ctx.options)
+		)
 		await ctx.respond(
 			SET_CHANNEL_SUCCESS_RESPONSE,
 			flags=hikari.MessageFlag.EPHEMERAL,
 		)
 
 	async def join(self, ctx: lightbulb.SlashContext):
-		channel: hikari.GuildVoiceChannel = ctx.options["channel"]
+		channel: hikari.InteractionChannel = ctx.options["channel"]
 		if ctx.guild_id is None or channel.name is None:
 			return
-		player = self._get_player(ctx.guild_id)
-
-		await player.connect(channel, deaf=False)
+		await self._voices.connect(ctx.guild_id, channel)
 		await ctx.respond(
 			SUCCESSFUL_CONNECT_RESPONSE(channel.name),
 			flags=hikari.MessageFlag.EPHEMERAL,
@@ -142,41 +449,89 @@ class RelayPlugin(lightbulb.Plugin):
 	async def leave(self, ctx: lightbulb.SlashContext):
 		if ctx.guild_id is None:
 			return
-		player = self._get_player(ctx.guild_id)
-		if not player.connected:
+		connected = self._voices.get(ctx.guild_id) is not None
+		if ctx.guild_id in self._voices:
+			await self._voices.disconnect(ctx.guild_id)
+		await ctx.respond(
+			SUCCESSFUL_DISCONNECT_RESPONSE if connected else NOT_CONNECTED_RESPONSE,
+			flags=hikari.MessageFlag.EPHEMERAL,
+		)
+
+	async def speak(self, ctx: lightbulb.SlashContext):
+		if ctx.guild_id is None:
+			return
+		if (player := self._voices.get(ctx.guild_id)) is None:
 			await ctx.respond(
 				NOT_CONNECTED_RESPONSE,
 				flags=hikari.MessageFlag.EPHEMERAL,
 			)
 			return
-		await player.disconnect()
+		self._voices.touch(ctx.guild_id)
+		queue = self._get_speech_queue(player)
+		if not queue.put(ctx.options["message"]):
+			await ctx.respond(
+				SPEECH_QUEUE_FULL_RESPONSE,
+				flags=hikari.MessageFlag.EPHEMERAL,
+			)
+			return
 		await ctx.respond(
-			SUCCESSFUL_DISCONNECT_RESPONSE,
+			SUCCESSFUL_SPEAK_RESPONSE,
 			flags=hikari.MessageFlag.EPHEMERAL,
 		)
 
-	async def speak(self, ctx: lightbulb.SlashContext):
-		if ctx.guild_id is None:
-			return
-		player = self._get_player(ctx.guild_id)
-		if not player.connected:
+	async def _broadcast_to(
+		self, player: ongaku.Player, message: str, tracks: TrackFutures
+	):
+		self._voices.touch(player.guild_id)
+		queue = self._get_speech_queue(player)
+		utterance = queue.put(message, share_tracks(tracks))
+		if utterance is None:
+			return BROADCAST_QUEUE_FULL_STATUS
+		try:
+			error = await asyncio.wait_for(
+				asyncio.shield(utterance.started), BROADCAST_START_TIMEOUT_SECS
+			)
+		except asyncio.TimeoutError:
+			return BROADCAST_QUEUED_STATUS
+		if error is not None:
+			return BROADCAST_FAILED_STATUS(error)
+		return BROADCAST_PLAYING_STATUS
+
+	async def broadcast(self, ctx: lightbulb.SlashContext):
+		players = self._voices.connected_players()
+		if not players:
+			await ctx.respond(
+				NOT_CONNECTED_RESPONSE,
+				flags=hikari.MessageFlag.EPHEMERAL,
+			)
 			return
-
+		await ctx.respond(
+			hikari.ResponseType.DEFERRED_MESSAGE_CREATE,
+			flags=hikari.MessageFlag.EPHEMERAL,
+		)
 		message = ctx.options["message"]
-		track = await self._tts.create_track(message)
-		await player.play(track)
+		tracks = self._tts.prefetch(message, shared=True)
+		statuses = await asyncio.gather(
+			*[self._broadcast_to(p, message, tracks) for p in players]
+		)
 		await ctx.respond(
-			SUCCESSFUL_SPEAK_RESPONSE,
+			BROADCAST_RESPONSE(
+				[
+					(self._get_guild_name(p.guild_id), status)
+					for p, status in zip(players, statuses)
+				]
+			),
 			flags=hikari.MessageFlag.EPHEMERAL,
 		)
 
 
-relay_plugin = RelayPlugin()
+def get_relay_plugin(ctx: lightbulb.Context):
+	return get_plugin(ctx.bot, RelayPlugin)
 
 
 @lightbulb.Check
 async def is_trusted_user(ctx: lightbulb.Context):
-	success = relay_plugin.is_trusted_user(ctx.user.id)
+	success = get_relay_plugin(ctx).is_trusted_user(ctx.user.id)
 	if not success:
 		await ctx.respond(UNTRUSTED_USER_RESPONSE, flags=hikari.MessageFlag.EPHEMERAL)
 	return success
@@ -192,7 +547,6 @@ async def is_sent_from_guild(ctx: lightbulb.Context):
 	return True
 
 
-@relay_plugin.command
 @lightbulb.add_checks(lightbulb.human_only, is_trusted_user)
 @lightbulb.command("relay", description="Allows you to send messages through the bot.")
 @lightbulb.implements(lightbulb.SlashCommandGroup)
@@ -200,18 +554,37 @@ async def relay_group(_):
 	pass
 
 
+CHANNEL_OPTIONS = [
+	lightbulb.option(
+		"channel" if i == 1 else f"channel-{i}",
+		description=f"The {ordinal} channel to relay into.",
+		default=None,
+		required=(i == 1),
+		type=hikari.TextableGuildChannel,
+	)
+	for (i, ordinal) in zip(
+		range(1, MAX_TARGET_CHANNELS + 1),
+		["first", "second", "third", "fourth"],
+	)
+]
+
+
+def channel_options(command: lightbulb.CommandLike):
+	for o in CHANNEL_OPTIONS:
+		command = o(command)
+	return command
+
+
 @relay_group.child
-@lightbulb.option(
-	"channel", "The relevant channel.", hikari.TextableGuildChannel, required=True
-)
+@channel_options
 @lightbulb.command(
 	"set-channel",
-	description="Sets the channel the bot will send your messages into.",
+	description="Sets the channels the bot will send your messages into.",
 	inherit_checks=True,
 )
 @lightbulb.implements(lightbulb.SlashSubCommand)
 async def set_channel_command(ctx: lightbulb.SlashContext):
-	await relay_plugin.set_channel(ctx)
+	await get_relay_plugin(ctx).set_channel(ctx)
 
 
 @relay_group.child
@@ -226,7 +599,7 @@ async def set_channel_command(ctx: lightbulb.SlashContext):
 )
 @lightbulb.implements(lightbulb.SlashSubCommand)
 async def join_command(ctx: lightbulb.SlashContext):
-	await relay_plugin.join(ctx)
+	await get_relay_plugin(ctx).join(ctx)
 
 
 @relay_group.child
@@ -238,7 +611,7 @@ async def join_command(ctx: lightbulb.SlashContext):
 )
 @lightbulb.implements(lightbulb.SlashSubCommand)
 async def leave_command(ctx: lightbulb.SlashContext):
-	await relay_plugin.leave(ctx)
+	await get_relay_plugin(ctx).leave(ctx)
 
 
 @relay_group.child
@@ -258,4 +631,23 @@ async def leave_command(ctx: lightbulb.SlashContext):
 )
 @lightbulb.implements(lightbulb.SlashSubCommand)
 async def speak_command(ctx: lightbulb.SlashContext):
-	await relay_plugin.speak(ctx)
+	await get_relay_plugin(ctx).speak(ctx)
+
+
+@relay_group.child
+@lightbulb.option(
+	"message",
+	"The message to speak.",
+	str,
+	required=True,
+	min_length=1,
+	max_length=1024,
+)
+@lightbulb.command(
+	"broadcast",
+	description="Sends TTS to every voice channel the bot is connected to.",
+	inherit_checks=True,
+)
+@lightbulb.implements(lightbulb.SlashSubCommand)
+async def broadcast_command(ctx: lightbulb.SlashContext):
+	await get_relay_plugin(ctx).broadcast(ctx)
@@ -0,0 +1,121 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional, Sequence
+import asyncio
+
+import hikari
+
+from ..util import log
+
+MAX_MESSAGE_LENGTH = 2000
+
+Attachments = Sequence[hikari.Resourceish]
+
+Sender = Callable[[hikari.Snowflakeish, str, Attachments], Awaitable[object]]
+
+
+@dataclass
+class RelayItem:
+	content: str
+	attachments: Attachments = ()
+
+
+def split_message(content: str):
+	return [
+		content[i : i + MAX_MESSAGE_LENGTH]
+		for i in range(0, len(content), MAX_MESSAGE_LENGTH)
+	]
+
+
+def split_item(content: str, attachments: Attachments):
+	items = [RelayItem(chunk) for chunk in split_message(content)]
+	if attachments:
+		if items:
+			items[-1].attachments = attachments
+		else:
+			items.append(RelayItem("", attachments))
+	return items
+
+
+class RelayQueue:
+	_COALESCE_WINDOW_SECS = 0.5
+	_MAX_DEPTH = 20
+
+	_arrived: asyncio.Event
+	_channel_id: hikari.Snowflakeish
+	_pending: deque[RelayItem]
+	_send: Sender
+	_upload_slots: asyncio.Semaphore
+	_worker: Optional[asyncio.Task[None]]
+
+	def __init__(
+		self,
+		channel_id: hikari.Snowflakeish,
+		send: Sender,
+		upload_slots: asyncio.Semaphore,
+	):
+		self._arrived = asyncio.Event()
+		self._channel_id = channel_id
+		self._pending = deque()
+		self._send = send
+		self._upload_slots = upload_slots
+		self._worker = None
+
+	def __len__(self):
+		return len(self._pending)
+
+	def full(self):
+		return len(self._pending) >= self._MAX_DEPTH
+
+	def put(self, content: str, attachments: Attachments = ()):
+		if self.full():
+			return False
+		self._pending.extend(split_item(content, attachments))
+		self._arrived.set()
+		if self._worker is None or self._worker.done():
+			self._worker = asyncio.create_task(self._run())
+		return True
+
+	async def join(self):
+		if self._worker is not None:
+			await self._worker
+
+	def _fits(self, length: int):
+		return length + 1 + len(self._pending[0].content) <= MAX_MESSAGE_LENGTH
+
+	async def _collect(self):
+		first = self._pending.popleft()
+		parts = [first.content]
+		attachments = first.attachments
+		length = len(first.content)
+		deadline = asyncio.get_running_loop().time() + self._COALESCE_WINDOW_SECS
+		while not attachments:
+			while self._pending and not attachments and self._fits(length):
+				item = self._pending.popleft()
+				parts.append(item.content)
+				attachments = item.attachments
+				length += 1 + len(item.content)
+			remaining = deadline - asyncio.get_running_loop().time()
+			if attachments or self._pending or remaining <= 0:
+				break
+			self._arrived.clear()
+			try:
+				await asyncio.wait_for(self._arrived.wait(), remaining)
+			except asyncio.TimeoutError:
+				break
+		return "\n".join(p for p in parts if p), attachments
+
+	async def _deliver(self, content: str, attachments: Attachments):
+		if not attachments:
+			await self._send(self._channel_id, content, attachments)
+			return
+		async with self._upload_slots:
+			await self._send(self._channel_id, content, attachments)
+
+	async def _run(self):
+		while self._pending:
+			content, attachments = await self._collect()
+			try:
+				await self._deliver(content, attachments)
+			except Exception:
+				log.exception(f"Failed to relay message to channel {self._channel_id}")
@@ -0,0 +1,124 @@
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+import asyncio
+
+import ongaku
+
+from ..util import log
+
+TrackFutures = list[asyncio.Future[ongaku.Track]]
+
+Releaser = Callable[[ongaku.Track], object]
+
+
+def create_future() -> asyncio.Future[Optional[BaseException]]:
+	return asyncio.get_running_loop().create_future()
+
+
+def share_tracks(tracks: TrackFutures) -> TrackFutures:
+	return [asyncio.shield(t) for t in tracks]
+
+
+@dataclass
+class Utterance:
+	message: str
+	tracks: TrackFutures
+	release: Releaser
+	enqueued: int = 0
+	started: asyncio.Future[Optional[BaseException]] = field(
+		default_factory=create_future
+	)
+
+	def cancel(self):
+		for track in self.tracks[self.enqueued :]:
+			if track.cancel() or track.cancelled() or track.exception() is not None:
+				continue
+			self.release(track.result())
+		self.enqueued = len(self.tracks)
+		if not self.started.done():
+			self.started.set_result(asyncio.CancelledError())
+
+
+class SpeechQueue:
+	_MAX_LOADED_TRACKS = 2
+
+	_advanced: asyncio.Event
+	_pending: asyncio.Queue[Utterance]
+	_player: ongaku.Player
+	_prefetch: Callable[[str], TrackFutures]
+	_release: Releaser
+	_worker: Optional[asyncio.Task[None]]
+
+	def __init__(
+		self,
+		player: ongaku.Player,
+		prefetch: Callable[[str], TrackFutures],
+		release: Releaser,
+		max_depth: int,
+	):
+		self._advanced = asyncio.Event()
+		self._pending = asyncio.Queue(maxsize=max_depth)
+		self._player = player
+		self._prefetch = prefetch
+		self._release = release
+		self._worker = None
+
+	def __len__(self):
+		return self._pending.qsize()
+
+	def full(self):
+		return self._pending.full()
+
+	def put(self, message: str, tracks: Optional[TrackFutures] = None):
+		if self.full():
+			return None
+		if tracks is None:
+			tracks = self._prefetch(message)
+		utterance = Utterance(message, tracks, self._release)
+		self._pending.put_nowait(utterance)
+		if self._worker is None or self._worker.done():
+			self._worker = asyncio.create_task(self._run())
+		return utterance
+
+	def notify_advanced(self):
+		self._advanced.set()
+
+	def clear(self):
+		if self._worker is not None:
+			self._worker.cancel()
+			self._worker = None
+		while not self._pending.empty():
+			self._pending.get_nowait().cancel()
+		for track in self._player.queue:
+			self._release(track)
+
+	async def _wait_for_room(self):
+		while len(self._player.queue) >= self._MAX_LOADED_TRACKS:
+			self._advanced.clear()
+			await self._advanced.wait()
+
+	async def _enqueue(self, track: ongaku.Track):
+		if self._player.queue:
+			self._player.add(track)
+		else:
+			await self._player.play(track)
+
+	async def _speak(self, utterance: Utterance):
+		try:
+			for future in utterance.tracks:
+				track = await future
+				await self._wait_for_room()
+				await self._enqueue(track)
+				utterance.enqueued += 1
+				if not utterance.started.done():
+					utterance.started.set_result(None)
+		except Exception as e:
+			if not utterance.started.done():
+				utterance.started.set_result(e)
+			log.exception(f"Failed to speak in guild {self._player.guild_id}")
+		finally:
+			utterance.cancel()
+
+	async def _run(self):
+		while not self._pending.empty():
+			await self._speak(self._pending.get_nowait())
@@ -0,0 +1,134 @@
+from collections import OrderedDict
+from hashlib import sha256
+from pathlib import Path
+from typing import Optional
+from unicodedata import normalize
+from uuid import uuid4
+import os
+
+import ongaku
+
+from ..util import get_cache_dir
+
+
+def normalize_text(text: str):
+	return " ".join(normalize("NFC", text).split())
+
+
+def get_tts_cache_dir(worker: int = 0):
+	name = "tts" if worker == 0 else f"tts-{worker}"
+	return get_cache_dir() / name
+
+
+class TTSCache:
+	_DEFAULT_EXTENSION = ".mp3"
+	_MAX_BYTES = 64 * 1024 * 1024
+	_TEMP_DIR_NAME = "tmp"
+
+	_dir: Path
+	_entries: OrderedDict[str, int]
+	_extension: str
+	_max_bytes: int
+	_size: int
+	_tracks: dict[str, ongaku.Track]
+
+	def __init__(
+		self,
+		max_bytes: int = _MAX_BYTES,
+		directory: Optional[Path] = None,
+		extension: str = _DEFAULT_EXTENSION,
+	):
+		self._dir = directory if directory is not None else get_tts_cache_dir()
+		self._dir.mkdir(parents=True, exist_ok=True)
+		self._clear_temp_dir()
+		self._entries = OrderedDict()
+		self._extension = extension
+		self._max_bytes = max_bytes
+		self._size = 0
+		self._tracks = {}
+		self._load_existing()
+
+	def __contains__(self, key: str):
+		return key in self._entries
+
+	def __len__(self):
+		return len(self._entries)
+
+	@property
+	def size(self):
+		return self._size
+
+	@staticmethod
+	def make_key(text: str, voice: str, rate: int):
+		return sha256(f"{voice}\0{rate}\0{normalize_text(text)}".encode()).hexdigest()
+
+	@property
+	def temp_dir(self):
+		return self._dir / self._TEMP_DIR_NAME
+
+	def _clear_temp_dir(self):
+		self.temp_dir.mkdir(exist_ok=True)
+		for f in self.temp_dir.iterdir():
+			f.unlink(missing_ok=True)
+
+	def temp_path(self):
+		return (self.temp_dir / (uuid4().hex + self._extension)).absolute()
+
+	def _load_existing(self):
+		files: list[tuple[Path, os.stat_result]] = []
+		for f in self._dir.iterdir():
+			if not f.is_file():
+				continue
+			if f.suffix != self._extension:
+				f.unlink(missing_ok=True)
+			else:
+				files.append((f, f.stat()))
+		for f, stat in sorted(files, key=lambda x: x[1].st_mtime):
+			self._entries[f.stem] = stat.st_size
+			self._size += stat.st_size
+		self._evict()
+
+	def path_for(self, key: str):
+		return (self._dir / (key + self._extension)).absolute()
+
+	def get(self, key: str):
+		if key not in self._entries:
+			return None
+		path = self.path_for(key)
+		if not path.exists():
+			self._remove(key)
+			return None
+		self._entries.move_to_end(key)
+		os.utime(path)
+		return path.as_posix()
+
+	def get_track(self, key: str):
+		if self.get(key) is None:
+			return None
+		return self._tracks.get(key)
+
+	def add(self, key: str, source: Optional[Path] = None):
+		path = self.path_for(key)
+		if source is not None:
+			os.replace(source, path)
+		if key in self._entries:
+			self._remove(key)
+		size = path.stat().st_size
+		self._entries[key] = size
+		self._size += size
+		self._evict()
+		return path.as_posix()
+
+	def set_track(self, key: str, track: ongaku.Track):
+		if key in self._entries:
+			self._tracks[key] = track
+
+	def _remove(self, key: str):
+		self._size -= self._entries.pop(key)
+		self._tracks.pop(key, None)
+
+	def _evict(self):
+		while self._size > self._max_bytes and len(self._entries) > 1:
+			key = next(iter(self._entries))
+			self._remove(key)
+			self.path_for(key).unlink(missing_ok=True)
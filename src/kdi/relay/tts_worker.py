@@ -0,0 +1,86 @@
+from pathlib import Path
+from typing import Optional
+import subprocess
+
+import pyttsx3
+
+OPUS_BITRATE = "64k"
+
+OPUS_SAMPLE_RATE = "48000"
+
+_engine: Optional[pyttsx3.Engine] = None
+
+
+def find_voice(engine: pyttsx3.Engine, desired: str):
+	desired_lower = desired.lower()
+	for available in engine.getProperty("voices"):
+		if desired_lower in available.id.lower():
+			return available.id
+	return None
+
+
+def init_worker(desired_voice: str, rate: int):
+	global _engine
+	_engine = pyttsx3.init()
+	_engine.setProperty("rate", rate)
+	if (voice_id := find_voice(_engine, desired_voice)) is not None:
+		_engine.setProperty("voice", voice_id)
+
+
+def get_engine():
+	if _engine is None:
+		raise RuntimeError("TTS worker used before initialization")
+	return _engine
+
+
+def warm_up():
+	get_engine()
+
+
+def get_voice_info():
+	engine = get_engine()
+	available = [v.id for v in engine.getProperty("voices")]
+	return engine.getProperty("voice"), available
+
+
+def encode_opus(ffmpeg: str, source: str, out_path: str):
+	subprocess.run(
+		[
+			ffmpeg,
+			"-y",
+			"-loglevel",
+			"error",
+			"-i",
+			source,
+			"-ac",
+			"2",
+			"-ar",
+			OPUS_SAMPLE_RATE,
+			"-c:a",
+			"libopus",
+			"-b:a",
+			OPUS_BITRATE,
+			"-application",
+			"voip",
+			"-frame_duration",
+			"20",
+			out_path,
+		],
+		check=True,
+		stdin=subprocess.DEVNULL,
+	)
+
+
+def synthesize(message: str, out_path: str, ffmpeg: Optional[str] = None):
+	engine = get_engine()
+	if ffmpeg is None:
+		engine.save_to_file(message, out_path)
+		engine.runAndWait()
+		return
+	raw_path = Path(out_path).with_suffix(".wav")
+	try:
+		engine.save_to_file(message, raw_path.as_posix())
+		engine.runAndWait()
+		encode_opus(ffmpeg, raw_path.as_posix(), out_path)
+	finally:
+		raw_path.unlink(missing_ok=True)
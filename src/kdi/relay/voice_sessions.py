@@ -0,0 +1,132 @@
+from typing import Callable, Optional
+import asyncio
+
+import hikari
+import ongaku
+
+from ..util import log
+
+VOICE_DISCONNECTED_CLOSE_CODE = 4014
+
+DisconnectHook = Callable[[hikari.Snowflake], object]
+
+
+class VoiceSessionManager:
+	_IDLE_CHECK_INTERVAL_SECS = 30.0
+
+	_channels: dict[hikari.Snowflake, hikari.Snowflake]
+	_client: ongaku.Client
+	_idle_timeout_secs: float
+	_last_active: dict[hikari.Snowflake, float]
+	_on_disconnect: DisconnectHook
+	_players: dict[hikari.Snowflake, ongaku.Player]
+	_reaper: Optional[asyncio.Task[None]]
+
+	def __init__(
+		self,
+		client: ongaku.Client,
+		idle_timeout_secs: float,
+		on_disconnect: DisconnectHook,
+	):
+		self._channels = {}
+		self._client = client
+		self._idle_timeout_secs = idle_timeout_secs
+		self._last_active = {}
+		self._on_disconnect = on_disconnect
+		self._players = {}
+		self._reaper = None
+
+	def __contains__(self, guild_id: hikari.Snowflakeish):
+		return hikari.Snowflake(guild_id) in self._players
+
+	def get(self, guild_id: hikari.Snowflakeish):
+		player = self._players.get(hikari.Snowflake(guild_id))
+		if player is None or not player.connected:
+			return None
+		return player
+
+	def connected_players(self):
+		return [p for p in self._players.values() if p.connected]
+
+	def touch(self, guild_id: hikari.Snowflakeish):
+		guild_id = hikari.Snowflake(guild_id)
+		if guild_id in self._players:
+			self._last_active[guild_id] = asyncio.get_running_loop().time()
+
+	async def connect(
+		self, guild_id: hikari.Snowflakeish, channel: hikari.PartialChannel
+	):
+		guild_id = hikari.Snowflake(guild_id)
+		if (player := self._players.get(guild_id)) is None:
+			player = self._players[guild_id] = self._client.create_player(guild_id)
+		await player.connect(channel.id, deaf=False)
+		self._channels[guild_id] = channel.id
+		self.touch(guild_id)
+		return player
+
+	async def disconnect(self, guild_id: hikari.Snowflakeish):
+		guild_id = hikari.Snowflake(guild_id)
+		player = self._players.pop(guild_id, None)
+		self._channels.pop(guild_id, None)
+		self._last_active.pop(guild_id, None)
+		if player is None:
+			return
+		self._on_disconnect(guild_id)
+		try:
+			if player.connected:
+				await player.disconnect()
+			await self._client.delete_player(guild_id)
+		except ongaku.OngakuError:
+			log.exception(f"Failed to clean up voice session in guild {guild_id}")
+
+	async def reconnect(self, guild_id: hikari.Snowflakeish):
+		guild_id = hikari.Snowflake(guild_id)
+		player = self._players.get(guild_id)
+		channel_id = self._channels.get(guild_id)
+		if player is None or channel_id is None:
+			return
+		try:
+			await player.connect(channel_id, deaf=False)
+			self.touch(guild_id)
+		except ongaku.OngakuError:
+			log.exception(f"Failed to reconnect voice session in guild {guild_id}")
+			await self.disconnect(guild_id)
+
+	async def on_ready(self, event: ongaku.ReadyEvent):
+		if event.resumed:
+			return
+		await asyncio.gather(*[self.reconnect(g) for g in list(self._players)])
+
+	async def on_websocket_closed(self, event: ongaku.WebsocketClosedEvent):
+		if not event.by_remote or event.guild_id not in self._players:
+			return
+		if event.code == VOICE_DISCONNECTED_CLOSE_CODE:
+			await self.disconnect(event.guild_id)
+		else:
+			await self.reconnect(event.guild_id)
+
+	def _is_idle(self, guild_id: hikari.Snowflake, now: float):
+		player = self._players[guild_id]
+		last_active = self._last_active.get(guild_id, now)
+		return not player.queue and now - last_active >= self._idle_timeout_secs
+
+	async def disconnect_idle(self):
+		now = asyncio.get_running_loop().time()
+		idle = [g for g in self._players if self._is_idle(g, now)]
+		await asyncio.gather(*[self.disconnect(g) for g in idle])
+		return idle
+
+	async def _reap(self):
+		while True:
+			await asyncio.sleep(self._IDLE_CHECK_INTERVAL_SECS)
+			for guild_id in await self.disconnect_idle():
+				log.info(f"Disconnected idle voice session in guild {guild_id}")
+
+	def start(self):
+		if self._reaper is None or self._reaper.done():
+			self._reaper = asyncio.create_task(self._reap())
+
+	def stop(self):
+		if self._reaper is not None:
+			self._reaper.cancel()
+			self._reaper = None
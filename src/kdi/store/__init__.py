@@ -1,3 +1,12 @@
-from .user_data import User, users, UserStore
+from .member_prefetch import MemberPrefetch
+from .session_store import MemorySessionStore, SessionStore, SQLiteSessionStore
+from .user_data import User, UserStore
 
-__all__ = ["User", "users", "UserStore"]
+__all__ = [
+	"MemberPrefetch",
+	"MemorySessionStore",
+	"SessionStore",
+	"SQLiteSessionStore",
+	"User",
+	"UserStore",
+]
@@ -0,0 +1,136 @@
+from array import array
+from typing import Callable, Hashable
+
+DELETED_ROW = -2
+
+EMPTY_ROW = -1
+
+_HASH_MASK = (1 << 64) - 1
+
+_MIN_CAPACITY = 8
+
+_MIN_GARBAGE_BYTES = 4096
+
+
+class StringTable:
+	__slots__ = ("_data", "_ends", "_garbage", "_starts")
+
+	_data: bytearray
+	_ends: "array[int]"
+	_garbage: int
+	_starts: "array[int]"
+
+	def __init__(self):
+		self._data = bytearray()
+		self._ends = array("I")
+		self._garbage = 0
+		self._starts = array("I")
+
+	def __len__(self):
+		return len(self._starts)
+
+	def __getitem__(self, row: int):
+		return self._data[self._starts[row] : self._ends[row]].decode()
+
+	def __setitem__(self, row: int, value: str):
+		encoded = value.encode()
+		start = self._starts[row]
+		old_length = self._ends[row] - start
+		if len(encoded) <= old_length:
+			self._data[start : start + len(encoded)] = encoded
+			self._garbage += old_length - len(encoded)
+		else:
+			start = self._starts[row] = len(self._data)
+			self._data += encoded
+			self._garbage += old_length
+		self._ends[row] = start + len(encoded)
+		if self._garbage > max(_MIN_GARBAGE_BYTES, len(self._data) // 2):
+			self._compact()
+
+	@property
+	def nbytes(self):
+		return len(self._data) + self._starts.itemsize * 2 * len(self._starts)
+
+	def append(self, value: str):
+		self._starts.append(len(self._data))
+		self._data += value.encode()
+		self._ends.append(len(self._data))
+
+	def clear(self):
+		self._data.clear()
+		del self._ends[:]
+		self._garbage = 0
+		del self._starts[:]
+
+	def _compact(self):
+		data = bytearray()
+		for row, (start, end) in enumerate(zip(self._starts, self._ends)):
+			self._starts[row] = len(data)
+			data += self._data[start:end]
+			self._ends[row] = len(data)
+		self._data = data
+		self._garbage = 0
+
+
+class RowIndex:
+	__slots__ = ("_key_of", "_n_filled", "_n_rows", "_slots")
+
+	_key_of: Callable[[int], Hashable]
+	_n_filled: int
+	_n_rows: int
+	_slots: "array[int]"
+
+	def __init__(self, key_of: Callable[[int], Hashable]):
+		self._key_of = key_of
+		self.clear()
+
+	def __len__(self):
+		return self._n_rows
+
+	@property
+	def nbytes(self):
+		return self._slots.itemsize * len(self._slots)
+
+	def _locate(self, key: Hashable):
+		mask = len(self._slots) - 1
+		perturb = hash(key) & _HASH_MASK
+		i = perturb & mask
+		while (row := self._slots[i]) != EMPTY_ROW and (
+			row == DELETED_ROW or self._key_of(row) != key
+		):
+			perturb >>= 5
+			i = (i * 5 + perturb + 1) & mask
+		return i
+
+	def find(self, key: Hashable) -> int:
+		return self._slots[self._locate(key)]
+
+	def add(self, key: Hashable, row: int):
+		if (self._n_filled + 1) * 3 > len(self._slots) * 2:
+			self._resize()
+		self._slots[self._locate(key)] = row
+		self._n_filled += 1
+		self._n_rows += 1
+
+	def remove(self, key: Hashable):
+		i = self._locate(key)
+		if self._slots[i] == EMPTY_ROW:
+			return False
+		self._slots[i] = DELETED_ROW
+		self._n_rows -= 1
+		return True
+
+	def clear(self):
+		self._n_filled = 0
+		self._n_rows = 0
+		self._slots = array("i", [EMPTY_ROW]) * _MIN_CAPACITY
+
+	def _resize(self):
+		rows = [row for row in self._slots if row >= 0]
+		capacity = _MIN_CAPACITY
+		while (len(rows) + 1) * 3 > capacity:
+			capacity *= 2
+		self._slots = array("i", [EMPTY_ROW]) * capacity
+		for row in rows:
+			self._slots[self._locate(self._key_of(row))] = row
+		self._n_filled = len(rows)
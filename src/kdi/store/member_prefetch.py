@@ -0,0 +1,97 @@
+from typing import Optional
+import asyncio
+
+import hikari
+
+from ..bot import Capabilities
+from ..util import log
+from .user_data import UserStore
+
+PREFETCH_NONCE = "kdi-member-prefetch"
+
+
+class MemberPrefetch:
+	CAPABILITIES = Capabilities(hikari.Intents.GUILDS | hikari.Intents.GUILD_MEMBERS)
+
+	_bot: hikari.GatewayBot
+	_cancelled: bool
+	_done: asyncio.Event
+	_n_members: int
+	_pending: set[hikari.Snowflake]
+	_store: UserStore
+
+	def __init__(self, bot: hikari.GatewayBot, store: UserStore):
+		self._bot = bot
+		self._cancelled = False
+		self._done = asyncio.Event()
+		self._n_members = 0
+		self._pending = set()
+		self._store = store
+
+		bot.subscribe(hikari.GuildAvailableEvent, self.on_guild_available)
+		bot.subscribe(hikari.MemberChunkEvent, self.on_member_chunk)
+		bot.subscribe(hikari.StoppingEvent, self.on_stopping)
+
+	@property
+	def pending(self):
+		return frozenset(self._pending)
+
+	@property
+	def n_members(self):
+		return self._n_members
+
+	async def request(self, guild_id: hikari.Snowflake):
+		if self._cancelled or guild_id in self._pending:
+			return
+		self._pending.add(guild_id)
+		self._done.clear()
+		try:
+			await self._bot.request_guild_members(guild_id, nonce=PREFETCH_NONCE)
+		except hikari.HikariError:
+			log.exception(f"Failed to request members of guild {guild_id}")
+			self._finish(guild_id)
+
+	def cancel(self):
+		self._cancelled = True
+		self._pending.clear()
+		self._done.set()
+
+	async def wait(self, timeout: Optional[float] = None):
+		if self._done.is_set():
+			return True
+		try:
+			await asyncio.wait_for(self._done.wait(), timeout)
+		except asyncio.TimeoutError:
+			return False
+		return True
+
+	def _finish(self, guild_id: hikari.Snowflake):
+		self._pending.discard(guild_id)
+		if not self._pending:
+			self._done.set()
+
+	async def on_guild_available(self, event: hikari.GuildAvailableEvent):
+		await self.request(event.guild_id)
+
+	async def on_member_chunk(self, event: hikari.MemberChunkEvent):
+		if event.nonce != PREFETCH_NONCE or event.guild_id not in self._pending:
+			return
+		n_added = self._store.store_many(
+			(m.id, m.username, m.display_name)
+			for m in event.members.values()
+			if not m.is_bot
+		)
+		self._n_members += n_added
+		log.debug(
+			f"Prefetched member chunk {event.chunk_index + 1}/{event.chunk_count} "
+			f"of guild {event.guild_id} ({n_added} new users)"
+		)
+		if event.chunk_index + 1 >= event.chunk_count:
+			self._finish(event.guild_id)
+			log.info(
+				f"Finished prefetching members of guild {event.guild_id} "
+				f"({len(self._store)} users known)"
+			)
+
+	async def on_stopping(self, _: hikari.StoppingEvent):
+		self.cancel()
@@ -0,0 +1,107 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Optional, TypeVar
+import asyncio
+import json
+import sqlite3
+
+SQLITE_TIMEOUT_SECS = 5.0
+
+T = TypeVar("T")
+
+
+class SessionStore(ABC):
+	@abstractmethod
+	async def get(self, key: str) -> Optional[Any]: ...
+
+	@abstractmethod
+	async def set(self, key: str, value: Any) -> None: ...
+
+	@abstractmethod
+	async def delete(self, key: str) -> None: ...
+
+	@abstractmethod
+	async def clear(self) -> None: ...
+
+	async def close(self):
+		pass
+
+
+class MemorySessionStore(SessionStore):
+	_values: dict[str, str]
+
+	def __init__(self):
+		self._values = {}
+
+	async def get(self, key: str):
+		if (value := self._values.get(key)) is None:
+			return None
+		return json.loads(value)
+
+	async def set(self, key: str, value: Any):
+		self._values[key] = json.dumps(value)
+
+	async def delete(self, key: str):
+		self._values.pop(key, None)
+
+	async def clear(self):
+		self._values.clear()
+
+
+class SQLiteSessionStore(SessionStore):
+	_connection: sqlite3.Connection
+	_executor: ThreadPoolExecutor
+
+	def __init__(self, path: Path):
+		self._connection = sqlite3.connect(
+			path,
+			check_same_thread=False,
+			isolation_level=None,
+			timeout=SQLITE_TIMEOUT_SECS,
+		)
+		self._connection.execute("PRAGMA journal_mode=WAL")
+		self._connection.execute(
+			"CREATE TABLE IF NOT EXISTS sessions (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+		)
+		self._executor = ThreadPoolExecutor(
+			max_workers=1, thread_name_prefix="kdi-sessions"
+		)
+
+	async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+		return await asyncio.get_running_loop().run_in_executor(
+			self._executor, fn, *args
+		)
+
+	def _get(self, key: str):
+		row = self._connection.execute(
+			"SELECT value FROM sessions WHERE key = ?", (key,)
+		).fetchone()
+		return json.loads(row[0]) if row is not None else None
+
+	def _set(self, key: str, value: str):
+		self._connection.execute(
+			"INSERT OR REPLACE INTO sessions (key, value) VALUES (?, ?)", (key, value)
+		)
+
+	def _delete(self, key: str):
+		self._connection.execute("DELETE FROM sessions WHERE key = ?", (key,))
+
+	def _clear(self):
+		self._connection.execute("DELETE FROM sessions")
+
+	async def get(self, key: str):
+		return await self._run(self._get, key)
+
+	async def set(self, key: str, value: Any):
+		await self._run(self._set, key, json.dumps(value))
+
+	async def delete(self, key: str):
+		await self._run(self._delete, key)
+
+	async def clear(self):
+		await self._run(self._clear)
+
+	async def close(self):
+		await self._run(self._connection.close)
+		self._executor.shutdown()
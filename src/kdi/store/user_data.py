@@ -1,34 +1,332 @@
+from array import array
+from bisect import bisect_left, bisect_right, insort
 from dataclasses import dataclass
+from time import monotonic
+from typing import Iterable, Optional
 
 import hikari
 
+from .compact import EMPTY_ROW, RowIndex, StringTable
 
-@dataclass
+MAX_SUGGESTIONS = 25
+
+UserRecord = tuple[hikari.Snowflakeish, str, Optional[str]]
+
+
+def fold_name(name: str):
+	return name.casefold()
+
+
+@dataclass(slots=True)
 class User:
 	id: hikari.Snowflakeish
 	name: str
+	display_name: Optional[str] = None
+
+	@property
+	def aliases(self):
+		if self.display_name and self.display_name != self.name:
+			return [self.name, self.display_name]
+		return [self.name]
+
+
+@dataclass(frozen=True)
+class UserStoreStats:
+	hits: int
+	misses: int
+	evictions: int
 
 
 class UserStore:
-	_id_to_name: dict[hikari.Snowflakeish, User]
-	_name_to_id: dict[str, User]
+	_display_names: StringTable
+	_evictions: int
+	_free_rows: "array[int]"
+	_hits: int
+	_id_index: RowIndex
+	_ids: "array[int]"
+	_max_users: int
+	_misses: int
+	_name_index: RowIndex
+	_names: StringTable
+	_newer: "array[int]"
+	_newest: int
+	_older: "array[int]"
+	_oldest: int
+	_prefix_index: "array[int]"
+	_stored_at: "array[float]"
+	_ttl_secs: float
 
-	def __init__(self):
-		self._id_to_name = {}
-		self._name_to_id = {}
+	def __init__(self, max_users: int = 0, ttl_secs: float = 0):
+		self._display_names = StringTable()
+		self._evictions = 0
+		self._free_rows = array("I")
+		self._hits = 0
+		self._ids = array("Q")
+		self._max_users = max_users
+		self._misses = 0
+		self._names = StringTable()
+		self._id_index = RowIndex(self._ids.__getitem__)
+		self._name_index = RowIndex(self._names.__getitem__)
+		self._newer = array("i")
+		self._newest = EMPTY_ROW
+		self._older = array("i")
+		self._oldest = EMPTY_ROW
+		self._prefix_index = array("I")
+		self._stored_at = array("d")
+		self._ttl_secs = ttl_secs
+
+	def __len__(self):
+		return len(self._ids) - len(self._free_rows)
+
+	@property
+	def nbytes(self):
+		columns = [
+			self._free_rows,
+			self._ids,
+			self._newer,
+			self._older,
+			self._prefix_index,
+			self._stored_at,
+		]
+		return (
+			self._display_names.nbytes
+			+ self._id_index.nbytes
+			+ self._name_index.nbytes
+			+ self._names.nbytes
+			+ sum(c.itemsize * len(c) for c in columns)
+		)
+
+	@property
+	def stats(self):
+		return UserStoreStats(self._hits, self._misses, self._evictions)
 
 	def clear(self):
-		self._id_to_name.clear()
-		self._name_to_id.clear()
+		self._display_names.clear()
+		del self._free_rows[:]
+		self._id_index.clear()
+		del self._ids[:]
+		self._name_index.clear()
+		self._names.clear()
+		del self._newer[:]
+		self._newest = EMPTY_ROW
+		del self._older[:]
+		self._oldest = EMPTY_ROW
+		del self._prefix_index[:]
+		del self._stored_at[:]
+
+	def _user_at(self, row: int):
+		display_name = self._display_names[row]
+		return User(self._ids[row], self._names[row], display_name or None)
+
+	def _is_live(self, row: int):
+		return self._id_index.find(self._ids[row]) == row
+
+	def _is_expired(self, row: int, now: float):
+		return bool(self._ttl_secs) and now - self._stored_at[row] >= self._ttl_secs
+
+	def _link(self, row: int):
+		self._older[row] = self._newest
+		self._newer[row] = EMPTY_ROW
+		if self._newest == EMPTY_ROW:
+			self._oldest = row
+		else:
+			self._newer[self._newest] = row
+		self._newest = row
+
+	def _unlink(self, row: int):
+		older, newer = self._older[row], self._newer[row]
+		if older == EMPTY_ROW:
+			self._oldest = newer
+		else:
+			self._newer[older] = newer
+		if newer == EMPTY_ROW:
+			self._newest = older
+		else:
+			self._older[newer] = older
+
+	def _touch(self, row: int):
+		if row != self._newest:
+			self._unlink(row)
+			self._link(row)
+
+	def _alias_key(self, entry: int):
+		row = entry >> 1
+		alias = self._display_names[row] if entry & 1 else self._names[row]
+		return fold_name(alias)
+
+	def _alias_entries(self, row: int):
+		entries = [row << 1]
+		display_name = self._display_names[row]
+		if display_name and display_name != self._names[row]:
+			entries.append(row << 1 | 1)
+		return entries
+
+	def _index(self, row: int, pending: Optional[set[int]]):
+		if pending is not None:
+			pending.add(row)
+			return
+		for entry in self._alias_entries(row):
+			insort(self._prefix_index, entry, key=self._alias_key)
+
+	def _unindex(self, row: int, pending: Optional[set[int]]):
+		if pending is not None:
+			pending.add(row)
+			return
+		for entry in self._alias_entries(row):
+			i = bisect_left(
+				self._prefix_index, self._alias_key(entry), key=self._alias_key
+			)
+			while self._prefix_index[i] != entry:
+				i += 1
+			del self._prefix_index[i]
+
+	def _reindex(self, rows: set[int]):
+		kept = array("I", (e for e in self._prefix_index if e >> 1 not in rows))
+		added = sorted(
+			(e for row in rows if self._is_live(row) for e in self._alias_entries(row)),
+			key=self._alias_key,
+		)
+		merged = array("I")
+		start = 0
+		for entry in added:
+			end = bisect_right(
+				kept, self._alias_key(entry), lo=start, key=self._alias_key
+			)
+			merged.extend(kept[start:end])
+			merged.append(entry)
+			start = end
+		merged.extend(kept[start:])
+		self._prefix_index = merged
+
+	def _allocate(self, uid: hikari.Snowflakeish, name: str, display_name: str):
+		if self._free_rows:
+			row = self._free_rows.pop()
+			self._ids[row] = uid
+			self._names[row] = name
+			self._display_names[row] = display_name
+		else:
+			row = len(self._ids)
+			self._ids.append(uid)
+			self._names.append(name)
+			self._display_names.append(display_name)
+			self._newer.append(EMPTY_ROW)
+			self._older.append(EMPTY_ROW)
+			self._stored_at.append(0.0)
+		self._id_index.add(uid, row)
+		self._name_index.add(name, row)
+		return row
+
+	def _remove(self, row: int, pending: Optional[set[int]]):
+		self._unindex(row, pending)
+		self._id_index.remove(self._ids[row])
+		self._name_index.remove(self._names[row])
+		self._unlink(row)
+		self._names[row] = ""
+		self._display_names[row] = ""
+		self._free_rows.append(row)
+
+	def _evict(self, row: int, pending: Optional[set[int]]):
+		self._remove(row, pending)
+		self._evictions += 1
+
+	def _rename(
+		self, row: int, name: str, display_name: str, pending: Optional[set[int]]
+	):
+		self._unindex(row, pending)
+		if self._names[row] != name:
+			self._name_index.remove(self._names[row])
+			self._names[row] = name
+			self._name_index.add(name, row)
+		self._display_names[row] = display_name
+		self._index(row, pending)
+
+	def _expire(self, now: float, pending: Optional[set[int]]):
+		while self._oldest != EMPTY_ROW and self._is_expired(self._oldest, now):
+			self._evict(self._oldest, pending)
+
+	def _put(
+		self,
+		uid: hikari.Snowflakeish,
+		name: str,
+		display_name: Optional[str],
+		pending: Optional[set[int]],
+	):
+		now = monotonic()
+		self._expire(now, pending)
+		display_name = display_name or ""
+		row = self._id_index.find(uid)
+		owner = self._name_index.find(name)
+		if owner not in (EMPTY_ROW, row):
+			self._remove(owner, pending)
+		if row != EMPTY_ROW:
+			if self._names[row] != name or self._display_names[row] != display_name:
+				self._rename(row, name, display_name, pending)
+			self._touch(row)
+			self._stored_at[row] = now
+			return False
+		if self._max_users and len(self) >= self._max_users:
+			self._evict(self._oldest, pending)
+		row = self._allocate(uid, name, display_name)
+		self._link(row)
+		self._stored_at[row] = now
+		self._index(row, pending)
+		return True
 
 	def get(self, id_or_name: hikari.Snowflakeish | str):
 		if isinstance(id_or_name, str):
-			return self._name_to_id.get(id_or_name)
-		return self._id_to_name.get(id_or_name)
+			row = self._name_index.find(id_or_name)
+		else:
+			row = self._id_index.find(id_or_name)
+		if row != EMPTY_ROW and self._is_expired(row, monotonic()):
+			self._evict(row, None)
+			row = EMPTY_ROW
+		if row == EMPTY_ROW:
+			self._misses += 1
+			return None
+		self._hits += 1
+		self._touch(row)
+		return self._user_at(row)
+
+	def store(
+		self, uid: hikari.Snowflakeish, name: str, display_name: Optional[str] = None
+	):
+		self._put(uid, name, display_name, None)
 
-	def store(self, uid: hikari.Snowflakeish, name: str):
-		if name not in self._name_to_id and uid not in self._id_to_name:
-			self._id_to_name[uid] = self._name_to_id[name] = User(uid, name)
+	def store_many(self, records: Iterable[UserRecord]):
+		pending: set[int] = set()
+		n_added = 0
+		for uid, name, display_name in records:
+			n_added += self._put(uid, name, display_name, pending)
+		if pending:
+			self._reindex(pending)
+		return n_added
 
+	def resolve(self, name: str):
+		if (user := self.get(name)) is not None:
+			return user
+		folded_name = fold_name(name)
+		now = monotonic()
+		i = bisect_left(self._prefix_index, folded_name, key=self._alias_key)
+		while i < len(self._prefix_index):
+			entry = self._prefix_index[i]
+			if self._alias_key(entry) != folded_name:
+				break
+			if not self._is_expired(entry >> 1, now):
+				self._touch(entry >> 1)
+				return self._user_at(entry >> 1)
+			i += 1
+		return None
 
-users = UserStore()
+	def search(self, prefix: str, limit: int = MAX_SUGGESTIONS):
+		folded_prefix = fold_name(prefix)
+		now = monotonic()
+		rows: dict[int, None] = {}
+		i = bisect_left(self._prefix_index, folded_prefix, key=self._alias_key)
+		while i < len(self._prefix_index) and len(rows) < limit:
+			entry = self._prefix_index[i]
+			if not self._alias_key(entry).startswith(folded_prefix):
+				break
+			if not self._is_expired(entry >> 1, now):
+				rows.setdefault(entry >> 1)
+			i += 1
+		return [self._user_at(row) for row in rows]
@@ -1,3 +1,3 @@
-from .teams import teams_plugin
+from .teams import TeamsPlugin
 
-__all__ = ["teams_plugin"]
+__all__ = ["TeamsPlugin"]
@@ -5,7 +5,7 @@ from typing import DefaultDict, Optional
 import hikari
 import lightbulb
 
-from ..util import get_config_value, shuffled
+from ..util import get_config, shuffled
 from .teams_state import Team
 
 
@@ -17,9 +17,9 @@ class CoresMessage:
 
 	def __init__(self):
 		self._assigned_names = defaultdict(self.get_name)
-		self._color = get_config_value("bot", "color")
+		self._color = get_config().bot.color
 		self._message = None
-		name_components = get_config_value("teams", "core_name_components")
+		name_components = get_config().teams.core_name_components
 		self._possible_names = shuffled(
 			[" ".join(sequence) for sequence in product(*name_components)]
 		)
@@ -3,8 +3,7 @@ from typing import Collection, Optional
 import hikari
 import lightbulb
 
-from ..bot import kdi
-from ..util import get_config_value, KeySet
+from ..util import get_config, KeySet
 from .teams_state import Team
 
 
@@ -18,7 +17,7 @@ PLAYERS_EMBED_NO_PLAYERS_LIST = "Nobody at the moment :("
 
 PLAYERS_EMBED_TITLE = ":video_game: Players"
 
-ACTION_ROW = kdi.rest.build_message_action_row()
+ACTION_ROW = hikari.impl.MessageActionRowBuilder()
 ACTION_ROW.add_interactive_button(
 	hikari.ButtonStyle.PRIMARY,
 	PLAYER_AVAILABLE_ID,
@@ -42,11 +41,12 @@ class PlayersMessage:
 	_message: Optional[hikari.Message]
 
 	def __init__(self):
-		self._color = get_config_value("bot", "color")
+		self._color = get_config().bot.color
 		self._message = None
 
-	def matches(self, message: hikari.Message) -> bool:
-		return self._message is not None and self._message.id == message.id
+	@property
+	def message_id(self):
+		return self._message.id if self._message is not None else None
 
 	def build_embed(self, players: Collection[KeySet] = []):
 		n_players = sum(len(p) for p in players)
@@ -4,43 +4,49 @@ from lightbulb.ext import tasks
 import hikari
 import lightbulb
 
-from ..bot import kdi
-from ..util import get_config_value
+from ..util import get_config
 
 TWENTY_MINUTES_SECS = 60 * 20
 
-ROUND_REMINDER_CRON = get_config_value("teams", "round_reminder_cron")
+MAX_REMINDERS = 8
 
 
 class RoundReminder:
 	_channel_id: Optional[hikari.Snowflakeish]
 	_prev_message: Optional[hikari.Message]
+	_rest: Optional[hikari.api.RESTClient]
 	_role: Optional[hikari.Role]
+	_task: tasks.Task
 
 	def __init__(self):
 		self._channel_id = None
 		self._prev_message = None
+		self._rest = None
 		self._role = None
+		self._task = tasks.task(
+			tasks.CronTrigger(get_config().teams.round_reminder_cron),
+			max_executions=MAX_REMINDERS,
+		)(self.remind)
 
 	def start(self, ctx: lightbulb.SlashContext):
 		self._channel_id = ctx.channel_id
+		self._rest = ctx.bot.rest
 		self._role = ctx.options["reminder-role"]
-		self.task.start()
+		self._task.start()
 
 	def stop(self):
-		self.task.cancel()
+		self._task.cancel()
 
 	async def send(self):
-		if self._channel_id is None or self._role is None:
+		if self._rest is None or self._channel_id is None or self._role is None:
 			return
-		self._prev_message = await kdi.rest.create_message(
+		self._prev_message = await self._rest.create_message(
 			self._channel_id,
 			f"{self._role.mention} Please prepare for the next round!",
 			role_mentions=True,
 		)
 
-	@tasks.task(tasks.CronTrigger(ROUND_REMINDER_CRON), max_executions=8)
-	async def task(self):
+	async def remind(self):
 		if self._prev_message is not None:
 			await self._prev_message.delete()
 			self._prev_message = None
@@ -3,8 +3,16 @@ from typing import Callable
 import hikari
 import lightbulb
 
-from ..bot import kdi
-from ..util import check_flag, get_config_value, TEST_DATA_FLAG
+from ..bot import Capabilities, ComponentRouter, get_plugin
+from ..store import User, UserStore
+from ..util import (
+	check_flag,
+	Config,
+	get_config,
+	metrics,
+	subscribe_config,
+	TEST_DATA_FLAG,
+)
 from .cores_message import CoresMessage
 from .players_message import (
 	PlayersMessage,
@@ -23,34 +31,47 @@ SELF_DESTRUCT_FOOTER = "This message will self-destruct momentarily."
 
 SELF_DESTRUCT_TIME_SECS = 6.0
 
+UNKNOWN_PLAYER_MSG = "is not a known user."
+
+GENERATE_DURATION = metrics.histogram(
+	"kdi_teams_generate_seconds", "Time spent generating teams."
+)
+
 
-def get_usernames_from_options(options: lightbulb.OptionsProxy):
-	return {
-		v.username
-		for _, v in options.items()
-		if isinstance(v, hikari.InteractionMember)
-	}
+def build_player_choice(user: User):
+	label = user.name
+	if user.display_name and user.display_name != user.name:
+		label = f"{user.display_name} ({user.name})"
+	return hikari.impl.AutocompleteChoiceBuilder(name=label, value=user.name)
 
 
 class TeamsPlugin(lightbulb.Plugin):
+	CAPABILITIES = Capabilities(hikari.Intents.GUILD_MESSAGES)
+
 	_color: str
+	_components: ComponentRouter
 	_cores_message: CoresMessage
 	_players_message: PlayersMessage
 	_round_reminder: RoundReminder
 	_state: TeamsState
-	_trusted_user_ids: set[int]
+	_unsubscribe_config: Callable[[], None]
+	_users: UserStore
 
-	def __init__(self):
+	def __init__(self, users: UserStore, components: ComponentRouter):
 		super().__init__("teams")
-		self._color = get_config_value("bot", "color")
+		self._color = get_config().bot.color
+		self._components = components
 		self._cores_message = CoresMessage()
 		self._round_reminder = RoundReminder()
 		self._players_message = PlayersMessage()
 		self._state = TeamsState()
-		self._trusted_user_ids = get_config_value("user", "trusted_ids")
+		self._users = users
 
-		kdi.subscribe(hikari.GuildMessageDeleteEvent, self.on_gm_delete)
-		kdi.subscribe(hikari.InteractionCreateEvent, self.on_interaction)
+		self.command(teams_group)
+		self.listener(hikari.GuildMessageDeleteEvent, self.on_gm_delete)
+		self.listener(hikari.StoppingEvent, self.on_stopping)
+		self.remove_hook(self.detach_config)
+		self._unsubscribe_config = subscribe_config(self.on_config_changed)
 
 	@property
 	def cores(self):
@@ -61,18 +82,48 @@ class TeamsPlugin(lightbulb.Plugin):
 		return self._state._players - self._state._cores
 
 	def is_trusted_user(self, user_id: hikari.Snowflakeish):
-		return user_id in self._trusted_user_ids
+		return user_id in get_config().user.trusted_ids
+
+	def remember_user(self, user: hikari.User):
+		self._users.store(user.id, user.username, user.display_name)
+
+	def resolve_usernames(self, options: lightbulb.OptionsProxy):
+		names: set[str] = set()
+		unknown: list[str] = []
+		for _, v in options.items():
+			if isinstance(v, hikari.User):
+				names.add(v.username)
+			elif isinstance(v, str):
+				if (user := self._users.resolve(v)) is None:
+					unknown.append(v)
+				else:
+					names.add(user.name)
+		return names, unknown
+
+	def on_config_changed(self, config: Config):
+		self._state.set_blocks(config.teams.blocks)
+
+	def detach_config(self):
+		self._unsubscribe_config()
+
+	async def on_stopping(self, _: hikari.StoppingEvent):
+		self.detach_config()
 
 	async def start(self, ctx: lightbulb.SlashContext):
 		self._state.reset()
 		if check_flag(TEST_DATA_FLAG):
 			self.load_test_data()
 		if ctx.options["auto-core"]:
+			self.remember_user(ctx.member or ctx.user)
 			self._state.add_core({ctx.user.username})
 		if ctx.options["reminder-role"]:
 			self._round_reminder.start(ctx)
+		if (message_id := self._players_message.message_id) is not None:
+			self._components.remove_message(message_id)
 		await self._cores_message.create(ctx, self.cores)
 		await self._players_message.create(ctx, self.players)
+		if (message_id := self._players_message.message_id) is not None:
+			self._components.add_message(message_id, self.check_players_interaction)
 
 	async def stop(self, ctx: lightbulb.SlashContext):
 		await ctx.respond(STOP_RESPONSE, flags=hikari.MessageFlag.EPHEMERAL)
@@ -103,8 +154,14 @@ class TeamsPlugin(lightbulb.Plugin):
 		error_msg: str,
 		state_method: Callable[[KeySet], bool],
 	):
-		names = get_usernames_from_options(ctx.options)
-		if state_method(names):
+		names, unknown = self.resolve_usernames(ctx.options)
+		if unknown:
+			embed = self.build_embed(
+				f"{action} {player_type}: Failure",
+				f"**{' / '.join(unknown)}** {UNKNOWN_PLAYER_MSG}",
+				False,
+			)
+		elif state_method(names):
 			embed = self.build_embed(
 				f"{action} {player_type}: Success",
 				f"**{' / '.join(names)}** {success_msg}",
@@ -165,14 +222,23 @@ class TeamsPlugin(lightbulb.Plugin):
 		)
 
 	async def generate(self, ctx: lightbulb.SlashContext):
-		teams = self._state.generate(ctx.options["max-size"])
+		with GENERATE_DURATION.time():
+			teams = self._state.generate(ctx.options["max-size"])
 		message = TeamsMessage()
 		await ctx.respond(embed=message.build_embed(self._state.round_number, teams))
 
+	async def suggest_players(
+		self,
+		option: hikari.AutocompleteInteractionOption,
+		interaction: hikari.AutocompleteInteraction,
+	):
+		self.remember_user(interaction.member or interaction.user)
+		prefix = option.value if isinstance(option.value, str) else ""
+		return [build_player_choice(u) for u in self._users.search(prefix)]
+
 	async def check_players_interaction(self, interaction: hikari.ComponentInteraction):
-		if not self._players_message.matches(interaction.message):
-			return
 		modified = False
+		self.remember_user(interaction.member or interaction.user)
 		player = {interaction.user.username}
 		if interaction.custom_id == PLAYER_AVAILABLE_ID:
 			modified |= self._state.add_player(player)
@@ -189,27 +255,19 @@ class TeamsPlugin(lightbulb.Plugin):
 		await self._cores_message.check_delete(event)
 		await self._players_message.check_delete(event)
 
-	async def on_interaction(self, event: hikari.InteractionCreateEvent):
-		if (
-			not isinstance(event.interaction, hikari.ComponentInteraction)
-			or event.interaction.user.is_bot
-		):
-			return
-		await self.check_players_interaction(event.interaction)
-
 
-teams_plugin = TeamsPlugin()
+def get_teams_plugin(ctx: lightbulb.Context):
+	return get_plugin(ctx.bot, TeamsPlugin)
 
 
 @lightbulb.Check
 async def is_trusted_user(ctx: lightbulb.Context):
-	success = teams_plugin.is_trusted_user(ctx.user.id)
+	success = get_teams_plugin(ctx).is_trusted_user(ctx.user.id)
 	if not success:
 		await ctx.respond(UNTRUSTED_USER_RESPONSE, flags=hikari.MessageFlag.EPHEMERAL)
 	return success
 
 
-@teams_plugin.command
 @lightbulb.add_checks(lightbulb.human_only, is_trusted_user)
 @lightbulb.command(
 	"teams", description="Allows you to generate randomized teams of players."
@@ -239,7 +297,7 @@ async def teams_group(_):
 )
 @lightbulb.implements(lightbulb.SlashSubCommand)
 async def start_command(ctx: lightbulb.SlashContext):
-	await teams_plugin.start(ctx)
+	await get_teams_plugin(ctx).start(ctx)
 
 
 @teams_group.child
@@ -250,22 +308,24 @@ async def start_command(ctx: lightbulb.SlashContext):
 )
 @lightbulb.implements(lightbulb.SlashSubCommand)
 async def stop_command(ctx: lightbulb.SlashContext):
-	await teams_plugin.stop(ctx)
+	await get_teams_plugin(ctx).stop(ctx)
 
 
 MAX_PLAYERS = 4
 
+PLAYER_OPTION_NAMES = [f"player-{i}" for i in range(1, MAX_PLAYERS + 1)]
+
 PLAYER_OPTIONS = [
 	lightbulb.option(
-		f"player-{i}",
+		name,
 		description=f"The {ordinal} player who will be in the core.",
+		autocomplete=True,
 		default=None,
-		required=(i == 1),
-		type=hikari.User,
+		required=(i == 0),
+		type=str,
 	)
-	for (i, ordinal) in zip(
-		range(1, MAX_PLAYERS + 1),
-		["first", "second", "third", "fourth"],
+	for (i, (name, ordinal)) in enumerate(
+		zip(PLAYER_OPTION_NAMES, ["first", "second", "third", "fourth"])
 	)
 ]
 
@@ -285,7 +345,7 @@ def player_options(command: lightbulb.CommandLike):
 )
 @lightbulb.implements(lightbulb.SlashSubCommand)
 async def add_core_command(ctx: lightbulb.SlashContext):
-	await teams_plugin.add_core(ctx)
+	await get_teams_plugin(ctx).add_core(ctx)
 
 
 @teams_group.child
@@ -297,7 +357,7 @@ async def add_core_command(ctx: lightbulb.SlashContext):
 )
 @lightbulb.implements(lightbulb.SlashSubCommand)
 async def remove_core_command(ctx: lightbulb.SlashContext):
-	await teams_plugin.remove_core(ctx)
+	await get_teams_plugin(ctx).remove_core(ctx)
 
 
 @teams_group.child
@@ -309,7 +369,7 @@ async def remove_core_command(ctx: lightbulb.SlashContext):
 )
 @lightbulb.implements(lightbulb.SlashSubCommand)
 async def add_player_command(ctx: lightbulb.SlashContext):
-	await teams_plugin.add_player(ctx)
+	await get_teams_plugin(ctx).add_player(ctx)
 
 
 @teams_group.child
@@ -321,7 +381,19 @@ async def add_player_command(ctx: lightbulb.SlashContext):
 )
 @lightbulb.implements(lightbulb.SlashSubCommand)
 async def remove_player_command(ctx: lightbulb.SlashContext):
-	await teams_plugin.remove_player(ctx)
+	await get_teams_plugin(ctx).remove_player(ctx)
+
+
+@add_core_command.autocomplete(*PLAYER_OPTION_NAMES)
+@remove_core_command.autocomplete(*PLAYER_OPTION_NAMES)
+@add_player_command.autocomplete(*PLAYER_OPTION_NAMES)
+@remove_player_command.autocomplete(*PLAYER_OPTION_NAMES)
+async def player_autocomplete(
+	option: hikari.AutocompleteInteractionOption,
+	interaction: hikari.AutocompleteInteraction,
+):
+	teams = get_plugin(interaction.app, TeamsPlugin)
+	return await teams.suggest_players(option, interaction)
 
 
 @teams_group.child
@@ -340,4 +412,4 @@ async def remove_player_command(ctx: lightbulb.SlashContext):
 )
 @lightbulb.implements(lightbulb.SlashSubCommand)
 async def generate_command(ctx: lightbulb.SlashContext):
-	await teams_plugin.generate(ctx)
+	await get_teams_plugin(ctx).generate(ctx)
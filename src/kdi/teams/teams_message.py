@@ -1,19 +1,20 @@
 import hikari
 from random import choice
 
-from ..util import get_config_value, shuffled
+from ..util import get_config, Names, shuffled
 from .teams_state import Team
 
 
 class TeamsMessage:
 	_color: str
-	_name_components: list[list[str]]
-	_player_emojis: list[str]
+	_name_components: tuple[Names, ...]
+	_player_emojis: Names
 
 	def __init__(self):
-		self._color = get_config_value("bot", "color")
-		self._name_components = get_config_value("teams", "team_name_components")
-		self._player_emojis = get_config_value("teams", "player_emojis")
+		config = get_config()
+		self._color = config.bot.color
+		self._name_components = config.teams.team_name_components
+		self._player_emojis = config.teams.player_emojis
 
 	def build_embed(self, i_round: int, teams: list[Team]):
 		name_components = list(map(shuffled, self._name_components))
@@ -5,7 +5,7 @@ from typing import Iterable, Optional, Sequence
 
 from ..util import (
 	clamp,
-	get_config_value,
+	get_config,
 	intersects,
 	KeySet,
 	MagneticGraph,
@@ -42,7 +42,7 @@ class TeamsState:
 			for p in players:
 				self.add_player(p)
 
-		self._load_blocks()
+		self.set_blocks(get_config().teams.blocks)
 
 	def reset(self):
 		self._cores.clear()
@@ -50,14 +50,13 @@ class TeamsState:
 		self._players.clear()
 		self._round_number = 0
 
-	def _load_blocks(self):
-		for name_pair in get_config_value("teams", "blocks"):
-			if len(name_pair) != 2:
-				raise RuntimeError(
-					"Each entry in the 'teams.blocks' config array must contain two usernames"
-				)
-			self._blocks.add(Team(name_pair))
-			self._forces.repel(name_pair[0], name_pair[1])
+	def set_blocks(self, blocks: Sequence[tuple[str, str]]):
+		for block in self._blocks:
+			if len(block) == 2:
+				self._forces.reset_polarity(*block)
+		self._blocks = {Team(name_pair) for name_pair in blocks}
+		for name_pair in blocks:
+			self._forces.repel(*name_pair)
 
 	@property
 	def players(self):
@@ -1,4 +1,12 @@
-from .config import get_config_value
+from .config import (
+	Config,
+	ConfigError,
+	ConfigWatcher,
+	get_config,
+	Names,
+	subscribe_config,
+	unsubscribe_config,
+)
 from .helpers import (
 	check_flag,
 	clamp,
@@ -8,21 +16,33 @@ from .helpers import (
 	TEST_DATA_FLAG,
 	shuffled,
 )
-from .logger import log
+from .logger import configure_logging, log
+from .loop_monitor import LoopMonitor
+from .metrics import metrics, MetricsServer
 from .undirected_graph import Key, KeySet, MagneticGraph, NodeWeights
 
 __all__ = [
 	"check_flag",
 	"clamp",
+	"Config",
+	"ConfigError",
+	"ConfigWatcher",
+	"configure_logging",
 	"flatten_2d",
 	"get_cache_dir",
-	"get_config_value",
+	"get_config",
 	"intersects",
 	"Key",
 	"KeySet",
 	"log",
+	"LoopMonitor",
 	"MagneticGraph",
+	"metrics",
+	"MetricsServer",
+	"Names",
 	"NodeWeights",
 	"shuffled",
+	"subscribe_config",
 	"TEST_DATA_FLAG",
+	"unsubscribe_config",
 ]
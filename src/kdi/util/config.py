@@ -1,4 +1,10 @@
+from dataclasses import dataclass, fields, MISSING
+from functools import partial
 from pathlib import Path
+from typing import Any, Callable, get_args, get_origin, get_type_hints, Optional
+import asyncio
+import logging
+import os
 import tomllib as toml
 
 from .logger import log
@@ -6,6 +12,159 @@ from .logger import log
 
 CONFIG_FILE_NAME = "config.toml"
 
+ConfigTable = dict[str, Any]
+
+Names = tuple[str, ...]
+
+
+class ConfigError(ValueError):
+	pass
+
+
+@dataclass(frozen=True)
+class BotConfig:
+	token: str
+	color: str = "#48F8AC"
+	config_poll_secs: float = 5.0
+
+
+@dataclass(frozen=True)
+class UserConfig:
+	trusted_ids: frozenset[int] = frozenset()
+	store_max_users: int = 0
+	store_ttl_secs: float = 0.0
+
+
+@dataclass(frozen=True)
+class RelayConfig:
+	audio_password: str
+	voice: str = "Zira"
+	speech_queue_depth: int = 8
+	voice_idle_timeout_secs: float = 900.0
+
+
+@dataclass(frozen=True)
+class TeamsConfig:
+	core_name_components: tuple[Names, ...]
+	team_name_components: tuple[Names, ...]
+	player_emojis: Names
+	blocks: tuple[tuple[str, str], ...] = ()
+	round_reminder_cron: str = "50 * * * *"
+
+
+@dataclass(frozen=True)
+class LoggingConfig:
+	level: str = "INFO"
+	max_bytes: int = 5 * 1024 * 1024
+	backup_count: int = 3
+
+	def __post_init__(self):
+		if self.level not in logging.getLevelNamesMapping():
+			raise ConfigError(
+				f"Config key 'logging.level' is not a level: '{self.level}'"
+			)
+
+
+@dataclass(frozen=True)
+class MetricsConfig:
+	enabled: bool = False
+	host: str = "127.0.0.1"
+	port: int = 9464
+
+
+@dataclass(frozen=True)
+class LoopMonitorConfig:
+	enabled: bool = True
+	interval_secs: float = 1.0
+	lag_threshold_secs: float = 0.25
+	watchdog: bool = False
+
+
+SESSION_STORES = ("memory", "sqlite")
+
+
+@dataclass(frozen=True)
+class ShardsConfig:
+	workers: int = 1
+	shard_count: int = 0
+	session_store: str = "memory"
+
+	def __post_init__(self):
+		if self.workers < 1:
+			raise ConfigError("Config key 'shards.workers' must be at least 1")
+		if self.shard_count < 0:
+			raise ConfigError("Config key 'shards.shard_count' cannot be negative")
+		if self.session_store not in SESSION_STORES:
+			raise ConfigError(
+				f"Config key 'shards.session_store' is not a store: '{self.session_store}'"
+			)
+		if self.workers > 1 and self.session_store == "memory":
+			raise ConfigError(
+				"Config key 'shards.session_store' must be shared when workers > 1"
+			)
+
+
+@dataclass(frozen=True)
+class Config:
+	bot: BotConfig
+	user: UserConfig
+	relay: RelayConfig
+	teams: TeamsConfig
+	logging: LoggingConfig
+	metrics: MetricsConfig
+	loop_monitor: LoopMonitorConfig
+	shards: ShardsConfig
+
+
+ConfigSubscriber = Callable[[Config], object]
+
+
+def _convert(path: str, value: object, hint: Any) -> Any:
+	origin, args = get_origin(hint), get_args(hint)
+	if origin is tuple or origin is frozenset:
+		if not isinstance(value, list):
+			raise ConfigError(f"Config key '{path}' must be an array")
+		if origin is frozenset or args[-1] is Ellipsis:
+			args = (args[0],) * len(value)
+		elif len(value) != len(args):
+			raise ConfigError(f"Config key '{path}' must contain {len(args)} entries")
+		return origin(
+			_convert(f"{path}[{i}]", v, h) for i, (v, h) in enumerate(zip(value, args))
+		)
+	if hint is float and isinstance(value, int) and not isinstance(value, bool):
+		return float(value)
+	if not isinstance(value, hint) or (isinstance(value, bool) and hint is not bool):
+		raise ConfigError(f"Config key '{path}' must be of type {hint.__name__}")
+	return value
+
+
+def _parse_table(cls: Any, table_key: str, table: ConfigTable):
+	hints = get_type_hints(cls)
+	values: ConfigTable = {}
+	for f in fields(cls):
+		if f.name in table:
+			values[f.name] = _convert(
+				f"{table_key}.{f.name}", table[f.name], hints[f.name]
+			)
+		elif f.default is MISSING:
+			raise ConfigError(
+				f"Config table '{table_key}' missing required key: '{f.name}'"
+			)
+	for key in table.keys() - values.keys():
+		log.warning(f"Ignoring unknown config key: '{table_key}.{key}'")
+	return cls(**values)
+
+
+def parse_config(data: ConfigTable):
+	hints = get_type_hints(Config)
+	tables: ConfigTable = {}
+	for f in fields(Config):
+		table = data.get(f.name, {})
+		if not isinstance(table, dict):
+			raise ConfigError(f"Config key '{f.name}' must be a table")
+		tables[f.name] = _parse_table(hints[f.name], f.name, table)
+	return Config(**tables)
+
 
 def get_config_path():
 	p = Path(__file__).parents[3] / "config" / CONFIG_FILE_NAME
@@ -19,25 +178,101 @@ def read_config_file():
 
 config_file_data = None
 
+config_snapshot: Optional[Config] = None
+
+config_subscribers: list[ConfigSubscriber] = []
+
 
 def load_config():
-	global config_file_data
+	global config_file_data, config_snapshot
 	config_file_data = read_config_file()
+	config_snapshot = None
 
 
-def get_config_value(table_key: str, key: str):
+def get_config():
+	global config_snapshot
+	if config_snapshot is not None:
+		return config_snapshot
 	if config_file_data is None:
 		load_config()
 	if config_file_data is None:
 		log.critical(f"Failed to load config file ({get_config_path()})")
 		exit(1)
-	if table_key not in config_file_data:
-		log.critical(
-			f"Config file ({get_config_path()}) missing table key: '{table_key}'"
-		)
-		exit(1)
-	table = config_file_data[table_key]
-	if key not in table:
-		log.critical(f"Config table '{table_key}' missing required key: '{key}'")
+	try:
+		config_snapshot = parse_config(config_file_data)
+	except ConfigError as e:
+		log.critical(f"Invalid config file ({get_config_path()}): {e}")
 		exit(1)
-	return table[key]
+	return config_snapshot
+
+
+def subscribe_config(callback: ConfigSubscriber) -> Callable[[], None]:
+	config_subscribers.append(callback)
+	return partial(unsubscribe_config, callback)
+
+
+def unsubscribe_config(callback: ConfigSubscriber):
+	if callback in config_subscribers:
+		config_subscribers.remove(callback)
+
+
+def reload_config():
+	global config_file_data, config_snapshot
+	data = read_config_file()
+	snapshot = parse_config(data)
+	if snapshot == config_snapshot:
+		return False
+	config_file_data, config_snapshot = data, snapshot
+	for callback in list(config_subscribers):
+		try:
+			callback(snapshot)
+		except Exception:
+			log.exception(f"Config subscriber {callback!r} failed")
+	return True
+
+
+class ConfigWatcher:
+	_interval_secs: float
+	_mtime: Optional[int]
+	_task: Optional[asyncio.Task[None]]
+
+	def __init__(self, interval_secs: float):
+		self._interval_secs = interval_secs
+		self._mtime = None
+		self._task = None
+
+	@staticmethod
+	def _read_mtime():
+		try:
+			return os.stat(get_config_path()).st_mtime_ns
+		except OSError:
+			return None
+
+	def check(self):
+		mtime = self._read_mtime()
+		if mtime is None or mtime == self._mtime:
+			return False
+		self._mtime = mtime
+		try:
+			changed = reload_config()
+		except (ConfigError, OSError, toml.TOMLDecodeError) as e:
+			log.error(f"Ignoring invalid config file ({get_config_path()}): {e}")
+			return False
+		if changed:
+			log.info(f"Reloaded config file ({get_config_path()})")
+		return changed
+
+	async def _run(self):
+		while True:
+			await asyncio.sleep(self._interval_secs)
+			self.check()
+
+	def start(self):
+		if self._task is None or self._task.done():
+			self._mtime = self._read_mtime()
+			self._task = asyncio.create_task(self._run())
+
+	def stop(self):
+		if self._task is not None:
+			self._task.cancel()
+			self._task = None
@@ -1,21 +1,60 @@
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from queue import SimpleQueue
+from typing import Optional
+import atexit
 import logging
 
 
-def get_log_path():
-	p = Path(__file__).parents[3] / "logs" / "last_run.txt"
+def get_log_path(worker: int = 0):
+	name = "kdi.log" if worker == 0 else f"kdi-{worker}.log"
+	p = Path(__file__).parents[3] / "logs" / name
 	return p.absolute()
 
 
 LOGGING_LEVEL = logging.DEBUG
 
+LOG_FORMATTER = logging.Formatter("%(asctime)s - %(levelname)s: %(message)s")
+
+log_queue: "SimpleQueue[logging.LogRecord]" = SimpleQueue()
+
+console_handler = logging.StreamHandler()
+console_handler.setFormatter(LOG_FORMATTER)
+
+file_handler: Optional[RotatingFileHandler] = None
+
+log_listener = QueueListener(log_queue, console_handler, respect_handler_level=True)
+
+listener_started = False
+
 log = logging.getLogger("kdi")
 log.setLevel(LOGGING_LEVEL)
+log.addHandler(QueueHandler(log_queue))
+
+
+def start_log_listener():
+	global listener_started
+	if listener_started:
+		return
+	log_listener.start()
+	atexit.register(log_listener.stop)
+	listener_started = True
 
-console_handler = logging.StreamHandler()
-console_handler.setLevel(LOGGING_LEVEL)
-console_handler.setFormatter(
-	logging.Formatter("%(asctime)s - %(levelname)s: %(message)s")
-)
 
-log.addHandler(console_handler)
+def configure_logging(level: str, max_bytes: int, backup_count: int, worker: int = 0):
+	global file_handler
+	log.setLevel(level)
+	start_log_listener()
+	if file_handler is not None or max_bytes <= 0:
+		return
+	path = get_log_path(worker)
+	path.parent.mkdir(parents=True, exist_ok=True)
+	file_handler = RotatingFileHandler(
+		path,
+		backupCount=backup_count,
+		delay=True,
+		encoding="utf-8",
+		maxBytes=max_bytes,
+	)
+	file_handler.setFormatter(LOG_FORMATTER)
+	log_listener.handlers = (*log_listener.handlers, file_handler)
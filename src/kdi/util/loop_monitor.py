@@ -0,0 +1,110 @@
+from threading import Event, get_ident, Thread
+from time import perf_counter
+from types import FrameType
+from typing import Any, Optional
+import asyncio
+import sys
+import traceback
+
+from .logger import log
+from .metrics import metrics
+
+LOOP_LAG = metrics.histogram(
+	"kdi_event_loop_lag_seconds",
+	"Delay between when the loop lag probe was due and when it ran.",
+)
+
+SLOW_CALLBACKS = metrics.counter(
+	"kdi_slow_callbacks_total",
+	"Times the event loop was blocked past the lag threshold.",
+	["task"],
+)
+
+
+def describe_task(task: Optional[asyncio.Task[Any]]):
+	if task is None:
+		return "<callback>"
+	return getattr(task.get_coro(), "__qualname__", task.get_name())
+
+
+def format_stack(frame: Optional[FrameType]):
+	if frame is None:
+		return ""
+	return "".join(traceback.format_stack(frame))
+
+
+class LoopMonitor:
+	_due_at: float
+	_interval: float
+	_loop: Optional[asyncio.AbstractEventLoop]
+	_loop_thread_id: Optional[int]
+	_probe: Optional[asyncio.Task[None]]
+	_reported_due_at: Optional[float]
+	_stopped: Event
+	_threshold: float
+	_use_watchdog: bool
+	_watchdog: Optional[Thread]
+
+	def __init__(self, interval: float, threshold: float, watchdog: bool = False):
+		self._due_at = float("inf")
+		self._interval = interval
+		self._loop = None
+		self._loop_thread_id = None
+		self._probe = None
+		self._reported_due_at = None
+		self._stopped = Event()
+		self._threshold = threshold
+		self._use_watchdog = watchdog
+		self._watchdog = None
+
+	def record_lag(self, lag: float):
+		LOOP_LAG.observe(lag)
+		if lag >= self._threshold:
+			log.warning(f"Event loop lagged {lag:.3f}s behind schedule")
+
+	async def _run_probe(self):
+		while True:
+			self._due_at = perf_counter() + self._interval
+			await asyncio.sleep(self._interval)
+			self.record_lag(max(0.0, perf_counter() - self._due_at))
+
+	def check_stalled(self):
+		due_at = self._due_at
+		stalled_for = perf_counter() - due_at
+		if stalled_for < self._threshold or due_at == self._reported_due_at:
+			return None
+		self._reported_due_at = due_at
+		if self._loop is None or self._loop_thread_id is None:
+			return None
+		name = describe_task(asyncio.current_task(self._loop))
+		stack = format_stack(sys._current_frames().get(self._loop_thread_id))
+		SLOW_CALLBACKS.inc(task=name)
+		log.warning(f"Event loop blocked for {stalled_for:.3f}s in {name}\n{stack}")
+		return name
+
+	def _run_watchdog(self):
+		while not self._stopped.wait(self._threshold / 2):
+			self.check_stalled()
+
+	def start(self):
+		if self._probe is not None and not self._probe.done():
+			return
+		self._loop = asyncio.get_running_loop()
+		self._loop_thread_id = get_ident()
+		self._probe = asyncio.create_task(self._run_probe())
+		if self._use_watchdog:
+			self._stopped.clear()
+			self._watchdog = Thread(
+				target=self._run_watchdog, name="kdi-loop-watchdog", daemon=True
+			)
+			self._watchdog.start()
+
+	def stop(self):
+		if self._probe is not None:
+			self._probe.cancel()
+			self._probe = None
+		self._due_at = float("inf")
+		if self._watchdog is not None:
+			self._stopped.set()
+			self._watchdog.join()
+			self._watchdog = None
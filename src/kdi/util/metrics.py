@@ -0,0 +1,246 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from math import inf
+from time import perf_counter
+from typing import Optional, Sequence, TypeVar
+
+from aiohttp import web
+
+from .logger import log
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = tuple[str, ...]
+
+M = TypeVar("M", bound="Metric")
+
+
+def escape_label_value(value: str):
+	return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_value(value: float):
+	if value == inf:
+		return "+Inf"
+	if value == -inf:
+		return "-Inf"
+	return repr(float(value))
+
+
+class Metric(ABC):
+	TYPE = "untyped"
+
+	_help: str
+	_label_names: tuple[str, ...]
+	_name: str
+
+	def __init__(self, name: str, help: str, label_names: Sequence[str] = ()):
+		self._help = help
+		self._label_names = tuple(label_names)
+		self._name = name
+
+	@property
+	def name(self):
+		return self._name
+
+	def _key(self, labels: dict[str, str]) -> LabelValues:
+		if labels.keys() != set(self._label_names):
+			raise ValueError(
+				f"Metric '{self._name}' expects labels {self._label_names}, got {tuple(labels)}"
+			)
+		return tuple(str(labels[n]) for n in self._label_names)
+
+	def _format_labels(self, values: LabelValues, extra: str = ""):
+		pairs = [
+			f'{n}="{escape_label_value(v)}"' for n, v in zip(self._label_names, values)
+		]
+		if extra:
+			pairs.append(extra)
+		return "{" + ",".join(pairs) + "}" if pairs else ""
+
+	@abstractmethod
+	def samples(self) -> list[str]: ...
+
+	def render(self):
+		lines = [
+			f"# HELP {self._name} {self._help}",
+			f"# TYPE {self._name} {self.TYPE}",
+		]
+		lines.extend(self.samples())
+		return "\n".join(lines)
+
+
+class ScalarMetric(Metric):
+	_values: dict[LabelValues, float]
+
+	def __init__(self, name: str, help: str, label_names: Sequence[str] = ()):
+		super().__init__(name, help, label_names)
+		self._values = {}
+
+	def _add(self, amount: float, labels: dict[str, str]):
+		key = self._key(labels)
+		self._values[key] = self._values.get(key, 0.0) + amount
+
+	def value(self, **labels: str):
+		return self._values.get(self._key(labels), 0.0)
+
+	def samples(self):
+		return [
+			f"{self._name}{self._format_labels(k)} {format_value(v)}"
+			for k, v in sorted(self._values.items())
+		]
+
+
+class Counter(ScalarMetric):
+	TYPE = "counter"
+
+	def inc(self, amount: float = 1.0, **labels: str):
+		if amount < 0:
+			raise ValueError("Counters can only increase")
+		self._add(amount, labels)
+
+
+class Gauge(ScalarMetric):
+	TYPE = "gauge"
+
+	def inc(self, amount: float = 1.0, **labels: str):
+		self._add(amount, labels)
+
+	def dec(self, amount: float = 1.0, **labels: str):
+		self.inc(-amount, **labels)
+
+	def set(self, value: float, **labels: str):
+		self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+	TYPE = "histogram"
+
+	_buckets: tuple[float, ...]
+	_counts: dict[LabelValues, list[int]]
+	_sums: dict[LabelValues, float]
+
+	def __init__(
+		self,
+		name: str,
+		help: str,
+		label_names: Sequence[str] = (),
+		buckets: Sequence[float] = DEFAULT_BUCKETS,
+	):
+		super().__init__(name, help, label_names)
+		self._buckets = (*sorted(buckets), inf)
+		self._counts = {}
+		self._sums = {}
+
+	def observe(self, value: float, **labels: str):
+		key = self._key(labels)
+		if (counts := self._counts.get(key)) is None:
+			counts = self._counts[key] = [0] * len(self._buckets)
+		counts[bisect_left(self._buckets, value)] += 1
+		self._sums[key] = self._sums.get(key, 0.0) + value
+
+	@contextmanager
+	def time(self, **labels: str):
+		start = perf_counter()
+		try:
+			yield
+		finally:
+			self.observe(perf_counter() - start, **labels)
+
+	def count(self, **labels: str):
+		return sum(self._counts.get(self._key(labels), ()))
+
+	def samples(self):
+		lines: list[str] = []
+		for key, counts in sorted(self._counts.items()):
+			total = 0
+			for bound, n in zip(self._buckets, counts):
+				total += n
+				le = f'le="{format_value(bound)}"'
+				lines.append(
+					f"{self._name}_bucket{self._format_labels(key, le)} {total}"
+				)
+			labels = self._format_labels(key)
+			lines.append(f"{self._name}_sum{labels} {format_value(self._sums[key])}")
+			lines.append(f"{self._name}_count{labels} {total}")
+		return lines
+
+
+class MetricsRegistry:
+	_metrics: dict[str, Metric]
+
+	def __init__(self):
+		self._metrics = {}
+
+	def _register(self, metric: M) -> M:
+		if metric.name in self._metrics:
+			raise ValueError(f"Metric '{metric.name}' is already registered")
+		self._metrics[metric.name] = metric
+		return metric
+
+	def counter(self, name: str, help: str, label_names: Sequence[str] = ()):
+		return self._register(Counter(name, help, label_names))
+
+	def gauge(self, name: str, help: str, label_names: Sequence[str] = ()):
+		return self._register(Gauge(name, help, label_names))
+
+	def histogram(
+		self,
+		name: str,
+		help: str,
+		label_names: Sequence[str] = (),
+		buckets: Sequence[float] = DEFAULT_BUCKETS,
+	):
+		return self._register(Histogram(name, help, label_names, buckets))
+
+	def get(self, name: str):
+		return self._metrics.get(name)
+
+	def render(self):
+		return "".join(m.render() + "\n" for _, m in sorted(self._metrics.items()))
+
+
+metrics = MetricsRegistry()
+
+
+class MetricsServer:
+	_host: str
+	_port: int
+	_registry: MetricsRegistry
+	_runner: Optional[web.AppRunner]
+
+	def __init__(self, registry: MetricsRegistry, host: str, port: int):
+		self._host = host
+		self._port = port
+		self._registry = registry
+		self._runner = None
+
+	@property
+	def port(self):
+		if self._runner is None or not self._runner.addresses:
+			return None
+		return self._runner.addresses[0][1]
+
+	async def _handle(self, _: web.Request):
+		return web.Response(
+			body=self._registry.render().encode(),
+			headers={"Content-Type": CONTENT_TYPE},
+		)
+
+	async def start(self):
+		if self._runner is not None:
+			return
+		app = web.Application()
+		app.router.add_get("/metrics", self._handle)
+		self._runner = web.AppRunner(app, access_log=None)
+		await self._runner.setup()
+		await web.TCPSite(self._runner, self._host, self._port).start()
+		log.info(f"Serving metrics on http://{self._host}:{self.port}/metrics")
+
+	async def stop(self):
+		if self._runner is not None:
+			await self._runner.cleanup()
+			self._runner = None
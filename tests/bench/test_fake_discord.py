@@ -0,0 +1,71 @@
+from aiohttp import ClientSession
+import pytest
+
+from kdi.bench.fake_discord import (
+	APPLICATION_ID,
+	build_interaction,
+	build_user,
+	COMPONENT_INTERACTION_TYPE,
+	FakeDiscord,
+)
+
+
+class TestFakeDiscord:
+	@pytest.mark.asyncio
+	async def test_serves_gateway_and_counts_requests(self):
+		async with FakeDiscord() as discord, ClientSession() as session:
+			async with session.get(f"{discord.rest_url}/gateway/bot") as response:
+				assert (await response.json())["url"] == discord.gateway_url
+			url = f"{discord.rest_url}/applications/{APPLICATION_ID}/commands"
+			async with session.put(url, json=[{"name": "teams"}]) as response:
+				assert (await response.json())[0]["name"] == "teams"
+		assert [c["name"] for c in discord.commands] == ["teams"]
+		assert discord.requests == {
+			"GET /api/v10/gateway/bot": 1,
+			"PUT /api/v10/applications/{application}/commands": 1,
+		}
+
+	@pytest.mark.asyncio
+	async def test_tracks_interaction_responses(self):
+		async with FakeDiscord() as discord, ClientSession() as session:
+			interaction = build_interaction(
+				discord.next_snowflake(),
+				COMPONENT_INTERACTION_TYPE,
+				{},
+				build_user(1, "user"),
+				guild_id=2,
+				channel_id=3,
+			)
+			await discord.dispatch_interaction(interaction)
+			response = discord.expect_response(int(interaction["id"]))
+			token = interaction["token"]
+			url = (
+				f"{discord.rest_url}/interactions/{interaction['id']}/{token}/callback"
+			)
+			payload = {"type": 4, "data": {"content": "hi"}}
+			async with session.post(url, json=payload) as r:
+				assert r.status == 204
+			assert await response == payload
+			url = f"{discord.rest_url}/webhooks/{APPLICATION_ID}/{token}/messages/@original"
+			async with session.get(url) as r:
+				message = await r.json()
+		assert message["content"] == "hi"
+		assert message["channel_id"] == "3"
+		assert message["guild_id"] == "2"
+
+	@pytest.mark.asyncio
+	async def test_resolves_matching_messages(self):
+		async with FakeDiscord() as discord, ClientSession() as session:
+			other = discord.expect_message(lambda m: m["content"] == "other")
+			created = discord.expect_message(lambda m: m["content"] == "hi")
+			url = f"{discord.rest_url}/channels/5/messages"
+			async with session.post(url, json={"content": "hi"}) as r:
+				message_id = (await r.json())["id"]
+			assert (await created)["channel_id"] == "5"
+			assert not other.done()
+			async with session.patch(
+				f"{url}/{message_id}", json={"content": "edited"}
+			) as r:
+				assert (await r.json())["content"] == "edited"
+			async with session.patch(f"{url}/404", json={}) as r:
+				assert r.status == 404
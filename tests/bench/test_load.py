@@ -0,0 +1,120 @@
+from pathlib import Path
+from pytest_mock import MockerFixture
+import json
+import pytest
+
+from kdi.bench.load import (
+	CLICK_SCENARIO,
+	COMMAND_SCENARIO,
+	DM_SCENARIO,
+	DEFAULT_MAX_TEAM_SIZE,
+	DEFAULT_PLAYERS,
+	format_report,
+	LoadReport,
+	LoadTest,
+	main,
+	run_load_test,
+	Scenario,
+	ScenarioReport,
+	summarize_latencies,
+)
+
+
+@pytest.fixture
+def report():
+	return LoadReport(
+		setup_secs=0.1,
+		duration_secs=2.0,
+		scenarios=[
+			ScenarioReport(CLICK_SCENARIO, 10, 8, 1, 1, {"p50": 3.0, "max": 9.0})
+		],
+		rest_calls={"PATCH /channels/{channel}/messages/{message}": 16},
+	)
+
+
+class TestSummarizeLatencies:
+	def test_empty(self):
+		assert summarize_latencies([]) == {}
+
+	def test_percentiles(self):
+		summary = summarize_latencies([i / 1000 for i in range(100, 0, -1)])
+		assert summary == pytest.approx(
+			{"p50": 50.0, "p95": 95.0, "p99": 99.0, "max": 100.0}
+		)
+
+
+class TestFormatReport:
+	def test_lists_scenarios_and_rest_calls(self, report: LoadReport):
+		text = format_report(report)
+		assert "button_click: 8/10 completed, 1 failed, 1 dropped" in text
+		assert "16  PATCH /channels/{channel}/messages/{message}" in text
+
+
+class TestLoadTest:
+	def test_default_players_fit_team_names(self, mocker: MockerFixture):
+		LoadTest(mocker.MagicMock())
+
+	def test_rejects_too_many_players_for_team_names(self, mocker: MockerFixture):
+		with pytest.raises(ValueError):
+			LoadTest(
+				mocker.MagicMock(), n_players=DEFAULT_PLAYERS + DEFAULT_MAX_TEAM_SIZE
+			)
+
+
+class TestRunLoadTest:
+	@pytest.mark.asyncio
+	async def test_drives_plugins(self, mocker: MockerFixture):
+		mocker.patch("kdi.relay.relay.TTSClient.warm_up", mocker.AsyncMock())
+		report = await run_load_test(
+			[
+				Scenario(CLICK_SCENARIO, 20, 1000),
+				Scenario(COMMAND_SCENARIO, 2, 1000),
+				Scenario(DM_SCENARIO, 5, 1000),
+			],
+			timeout=5,
+			n_players=4,
+		)
+		outcomes = {
+			s.name: (s.completed, s.failed, s.dropped) for s in report.scenarios
+		}
+		assert outcomes == {
+			CLICK_SCENARIO: (20, 0, 0),
+			COMMAND_SCENARIO: (2, 0, 0),
+			DM_SCENARIO: (5, 0, 0),
+		}
+		assert (
+			report.rest_calls[
+				"POST /api/v10/interactions/{interaction}/{token}/callback"
+			]
+			== 22
+		)
+		assert all(s.latency_ms["max"] > 0 for s in report.scenarios)
+
+
+class TestMain:
+	def test_writes_json_report(
+		self, mocker: MockerFixture, report: LoadReport, tmp_path: Path
+	):
+		run = mocker.patch("kdi.bench.load.run_load_test", return_value=report)
+		output = tmp_path / "load.json"
+		main(["--clicks", "10", "--dms", "0", "--output", output.as_posix()])
+		scenarios = run.call_args.args[0]
+		assert scenarios[0] == Scenario(CLICK_SCENARIO, 10, 100.0)
+		assert scenarios[2].count == 0
+		assert json.loads(output.read_text())["scenarios"][0]["completed"] == 8
+
+	@pytest.mark.parametrize(
+		"argv",
+		[
+			["--click-rate", "0"],
+			["--command-rate", "0"],
+			["--dm-rate", "-1"],
+			["--clicks", "-1"],
+			["--players", "0"],
+		],
+	)
+	def test_rejects_invalid_arguments(self, mocker: MockerFixture, argv: list[str]):
+		run = mocker.patch("kdi.bench.load.run_load_test")
+		with pytest.raises(SystemExit):
+			main(argv)
+		run.assert_not_called()
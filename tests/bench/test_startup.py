@@ -0,0 +1,68 @@
+from pathlib import Path
+import json
+
+from pytest_mock import MockerFixture
+import pytest
+
+from kdi.bench.startup import (
+	format_report,
+	ImportTiming,
+	main,
+	measure_construction,
+	measure_ready,
+	parse_import_times,
+	StartupReport,
+)
+
+SAMPLE_IMPORT_TIMES = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   kdi.util.helpers
+import time:       300 |        420 | kdi.util
+unrelated output
+"""
+
+
+class TestParseImportTimes:
+	def test_parses_timings(self):
+		assert parse_import_times(SAMPLE_IMPORT_TIMES) == [
+			ImportTiming("kdi.util.helpers", 120, 120),
+			ImportTiming("kdi.util", 300, 420),
+		]
+
+
+class TestMeasureConstruction:
+	def test_times_each_component(self):
+		assert set(measure_construction()) == {
+			"audio_client",
+			"bot",
+			"relay_plugin",
+			"teams_plugin",
+			"user_store",
+		}
+
+
+class TestMeasureReady:
+	@pytest.mark.asyncio
+	async def test_starts_against_fake_discord(self, mocker: MockerFixture):
+		mocker.patch("kdi.relay.relay.TTSClient.warm_up", mocker.AsyncMock())
+		assert 0 < await measure_ready(timeout=10) < 10
+
+
+class TestMain:
+	def test_writes_json_report(self, mocker: MockerFixture, tmp_path: Path):
+		report = StartupReport(
+			python="3.11",
+			module="kdi.app",
+			import_total_us=420,
+			imports=[ImportTiming("kdi.util", 300, 420)],
+			construction_secs={"bot": 0.5},
+			ready_secs=None,
+		)
+		mocker.patch("kdi.bench.startup.run", return_value=report)
+		output = tmp_path / "startup.json"
+		main(["--no-ready", "--output", output.as_posix()])
+		data = json.loads(output.read_text())
+		assert data["imports"] == [
+			{"module": "kdi.util", "self_us": 300, "cumulative_us": 420}
+		]
+		assert "500.0ms  bot" in format_report(report)
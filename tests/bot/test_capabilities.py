@@ -0,0 +1,38 @@
+import hikari
+
+from kdi.bot import Capabilities, combine_capabilities
+
+CacheComponents = hikari.api.CacheComponents
+
+
+class TestCapabilities:
+	def test_defaults_to_nothing(self):
+		capabilities = Capabilities()
+		assert capabilities.intents == hikari.Intents.NONE
+		assert capabilities.cache == CacheComponents.NONE
+
+	def test_union(self):
+		a = Capabilities(hikari.Intents.GUILDS, CacheComponents.GUILDS)
+		b = Capabilities(hikari.Intents.DM_MESSAGES, CacheComponents.ME)
+		assert a | b == Capabilities(
+			hikari.Intents.GUILDS | hikari.Intents.DM_MESSAGES,
+			CacheComponents.GUILDS | CacheComponents.ME,
+		)
+
+	def test_cache_settings(self):
+		settings = Capabilities(cache=CacheComponents.GUILDS).cache_settings()
+		assert settings.components == CacheComponents.GUILDS
+
+
+class TestCombineCapabilities:
+	def test_empty(self):
+		assert combine_capabilities() == Capabilities()
+
+	def test_combines_all(self):
+		assert combine_capabilities(
+			Capabilities(hikari.Intents.GUILDS),
+			Capabilities(hikari.Intents.GUILD_MEMBERS),
+			Capabilities(cache=CacheComponents.ME),
+		) == Capabilities(
+			hikari.Intents.GUILDS | hikari.Intents.GUILD_MEMBERS, CacheComponents.ME
+		)
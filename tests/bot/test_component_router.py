@@ -0,0 +1,108 @@
+from pytest_mock import MockType, MockerFixture
+import hikari
+import pytest
+
+from kdi.bot.component_router import (
+	COMPONENT_INTERACTIONS,
+	ComponentRouter,
+	get_custom_id_prefix,
+)
+
+
+@pytest.fixture
+def router(mocker: MockerFixture):
+	return ComponentRouter(mocker.MagicMock(spec=hikari.GatewayBot))
+
+
+@pytest.fixture
+def handler(mocker: MockerFixture):
+	return mocker.AsyncMock()
+
+
+def make_event(mocker: MockerFixture, custom_id: str, message_id: int = 1):
+	event = mocker.MagicMock(spec=hikari.InteractionCreateEvent)
+	event.interaction = mocker.MagicMock(spec=hikari.ComponentInteraction)
+	event.interaction.custom_id = custom_id
+	event.interaction.message.id = hikari.Snowflake(message_id)
+	event.interaction.user.is_bot = False
+	return event
+
+
+class TestGetCustomIdPrefix:
+	@pytest.mark.parametrize(
+		"custom_id, prefix", [("teams:join", "teams"), ("teams", "teams"), ("", "")]
+	)
+	def test_splits_on_separator(self, custom_id: str, prefix: str):
+		assert get_custom_id_prefix(custom_id) == prefix
+
+
+class TestComponentRouter:
+	def test_subscribes(self, mocker: MockerFixture):
+		bot = mocker.MagicMock(spec=hikari.GatewayBot)
+		router = ComponentRouter(bot)
+		bot.subscribe.assert_any_call(
+			hikari.InteractionCreateEvent, router.on_interaction
+		)
+
+	def test_rejects_duplicate_prefixes(
+		self, router: ComponentRouter, handler: MockType
+	):
+		router.add_prefix("teams", handler)
+		with pytest.raises(ValueError):
+			router.add_prefix("teams", handler)
+		with pytest.raises(ValueError):
+			router.add_prefix("a:b", handler)
+
+	@pytest.mark.asyncio
+	async def test_routes_by_prefix(
+		self, mocker: MockerFixture, router: ComponentRouter, handler: MockType
+	):
+		router.add_prefix("teams", handler)
+		event = make_event(mocker, "teams:join")
+		await router.on_interaction(event)
+		handler.assert_awaited_once_with(event.interaction)
+
+	@pytest.mark.asyncio
+	async def test_message_routes_take_precedence(
+		self, mocker: MockerFixture, router: ComponentRouter, handler: MockType
+	):
+		prefix_handler = mocker.AsyncMock()
+		router.add_prefix("teams", prefix_handler)
+		router.add_message(7, handler)
+		await router.on_interaction(make_event(mocker, "teams:join", 7))
+		handler.assert_awaited_once()
+		prefix_handler.assert_not_awaited()
+
+	@pytest.mark.asyncio
+	async def test_drops_unmatched(
+		self, mocker: MockerFixture, router: ComponentRouter, handler: MockType
+	):
+		router.add_prefix("teams", handler)
+		dropped = COMPONENT_INTERACTIONS.value(result="dropped")
+		await router.on_interaction(make_event(mocker, "relay:stop"))
+		bot_event = make_event(mocker, "teams:join")
+		bot_event.interaction.user.is_bot = True
+		await router.on_interaction(bot_event)
+		handler.assert_not_awaited()
+		assert COMPONENT_INTERACTIONS.value(result="dropped") == dropped + 2
+
+	@pytest.mark.asyncio
+	async def test_ignores_other_interactions(
+		self, mocker: MockerFixture, router: ComponentRouter
+	):
+		event = mocker.MagicMock(spec=hikari.InteractionCreateEvent)
+		event.interaction = mocker.MagicMock(spec=hikari.CommandInteraction)
+		routed = COMPONENT_INTERACTIONS.value(result="dropped")
+		await router.on_interaction(event)
+		assert COMPONENT_INTERACTIONS.value(result="dropped") == routed
+
+	@pytest.mark.asyncio
+	async def test_forgets_deleted_messages(
+		self, mocker: MockerFixture, router: ComponentRouter, handler: MockType
+	):
+		router.add_message(7, handler)
+		event = mocker.MagicMock(spec=hikari.GuildMessageDeleteEvent)
+		event.message_id = hikari.Snowflake(7)
+		await router.on_message_delete(event)
+		await router.on_interaction(make_event(mocker, "players", 7))
+		handler.assert_not_awaited()
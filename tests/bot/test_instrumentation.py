@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone
+
+from hikari.internal import routes
+from pytest_mock import MockerFixture
+import hikari
+import lightbulb
+import pytest
+
+from kdi.bot.instrumentation import (
+	COMMAND_DURATION,
+	CommandTimer,
+	get_interaction_age,
+	get_interaction_id,
+	instrument_rest,
+	REST_REQUESTS,
+)
+
+
+class TestInteractionTiming:
+	def test_parses_interaction_id(self):
+		route = routes.POST_INTERACTION_RESPONSE.compile(interaction=123, token="abc")
+		assert get_interaction_id(route) == 123
+
+	def test_measures_age(self):
+		created_at = datetime.now(timezone.utc) - timedelta(seconds=2)
+		interaction_id = hikari.Snowflake.from_datetime(created_at)
+		assert 1.9 < get_interaction_age(interaction_id) < 3
+
+
+class TestInstrumentRest:
+	@pytest.mark.asyncio
+	async def test_counts_requests_by_route(self, mocker: MockerFixture):
+		instrument_rest()
+		instrument_rest()
+		rest = mocker.MagicMock(spec=hikari.impl.RESTClientImpl)
+		rest._close_event = None
+		route = routes.GET_CHANNEL.compile(channel=123)
+		labels = {"method": "GET", "route": "/channels/{channel}"}
+		before = REST_REQUESTS.value(**labels)
+		with pytest.raises(hikari.ComponentStateConflictError):
+			await hikari.impl.RESTClientImpl._request(rest, route)
+		assert REST_REQUESTS.value(**labels) == before + 1
+
+
+class TestCommandTimer:
+	@pytest.mark.asyncio
+	async def test_observes_command_duration(self, mocker: MockerFixture):
+		bot = mocker.MagicMock(spec=lightbulb.BotApp)
+		timer = CommandTimer(bot)
+		assert bot.subscribe.call_count == 3
+		event = mocker.MagicMock(spec=lightbulb.SlashCommandCompletionEvent)
+		event.context.command.qualname = "teams generate"
+		before = COMMAND_DURATION.count(command="teams generate", outcome="success")
+		await timer.on_invocation(event)
+		await timer.on_completion(event)
+		await timer.on_error(event)
+		after = COMMAND_DURATION.count(command="teams generate", outcome="success")
+		assert after == before + 1
+		assert COMMAND_DURATION.count(command="teams generate", outcome="error") == 0
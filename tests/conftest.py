@@ -1,7 +1,7 @@
 from pytest_mock import MockerFixture
 import pytest
 
-from kdi.bot.bot import KDI
+from kdi.bot import KDI
 from kdi.util.config import load_config
 
 
@@ -9,4 +9,18 @@ from kdi.util.config import load_config
 def use_example_config(session_mocker: MockerFixture):
 	session_mocker.patch("kdi.util.config.CONFIG_FILE_NAME", "config.example.toml")
 	load_config()
-	session_mocker.patch("kdi.bot.bot.kdi", KDI())
+
+
+@pytest.fixture(scope="session", autouse=True)
+def isolate_log_files(
+	session_mocker: MockerFixture, tmp_path_factory: pytest.TempPathFactory
+):
+	session_mocker.patch(
+		"kdi.util.logger.get_log_path",
+		return_value=tmp_path_factory.mktemp("logs") / "kdi.log",
+	)
+
+
+@pytest.fixture(scope="session")
+def bot(use_example_config: None):
+	return KDI()
@@ -0,0 +1,163 @@
+import asyncio
+
+from pytest_mock import MockType, MockerFixture
+import aiohttp
+import hikari
+import pytest
+
+from kdi.relay.relay_queue import (
+	MAX_MESSAGE_LENGTH,
+	RelayItem,
+	RelayQueue,
+	split_item,
+	split_message,
+)
+
+SAMPLE_CHANNEL_ID = 246
+
+
+@pytest.fixture
+def sender(mocker: MockerFixture):
+	return mocker.AsyncMock()
+
+
+@pytest.fixture
+def upload_slots():
+	return asyncio.Semaphore(1)
+
+
+@pytest.fixture
+def short_window(mocker: MockerFixture):
+	mocker.patch("kdi.relay.relay_queue.RelayQueue._COALESCE_WINDOW_SECS", 0.01)
+
+
+class TestSplitMessage:
+	def test_keeps_short_messages(self):
+		assert split_message("hi") == ["hi"]
+
+	def test_splits_long_messages(self):
+		chunks = split_message("a" * (MAX_MESSAGE_LENGTH + 1))
+		assert list(map(len, chunks)) == [MAX_MESSAGE_LENGTH, 1]
+
+
+class TestSplitItem:
+	def test_attaches_to_last_chunk(self):
+		attachments = ["file"]
+		items = split_item("a" * (MAX_MESSAGE_LENGTH + 1), attachments)
+		assert [i.attachments for i in items] == [(), attachments]
+
+	def test_allows_attachment_only(self):
+		assert split_item("", ["file"]) == [RelayItem("", ["file"])]
+
+
+class TestRelayQueue:
+	@pytest.mark.asyncio
+	async def test_coalesces_burst(
+		self, upload_slots: asyncio.Semaphore, sender: MockType, short_window: None
+	):
+		queue = RelayQueue(SAMPLE_CHANNEL_ID, sender, upload_slots)
+		queue.put("one")
+		await asyncio.sleep(0)
+		queue.put("two")
+		queue.put("three")
+		await queue.join()
+		sender.assert_called_once_with(SAMPLE_CHANNEL_ID, "one\ntwo\nthree", ())
+
+	@pytest.mark.asyncio
+	async def test_sends_after_window(
+		self, upload_slots: asyncio.Semaphore, sender: MockType, short_window: None
+	):
+		queue = RelayQueue(SAMPLE_CHANNEL_ID, sender, upload_slots)
+		queue.put("one")
+		await queue.join()
+		queue.put("two")
+		await queue.join()
+		assert [c.args[1] for c in sender.call_args_list] == ["one", "two"]
+
+	@pytest.mark.asyncio
+	async def test_respects_length_limit(
+		self, upload_slots: asyncio.Semaphore, sender: MockType, short_window: None
+	):
+		queue = RelayQueue(SAMPLE_CHANNEL_ID, sender, upload_slots)
+		first = "a" * (MAX_MESSAGE_LENGTH - 1)
+		queue.put(first)
+		queue.put("b")
+		queue.put("c")
+		await queue.join()
+		assert [c.args[1] for c in sender.call_args_list] == [first, "b\nc"]
+
+	@pytest.mark.asyncio
+	async def test_rejects_when_full(
+		self,
+		upload_slots: asyncio.Semaphore,
+		mocker: MockerFixture,
+		sender: MockType,
+		short_window: None,
+	):
+		mocker.patch("kdi.relay.relay_queue.RelayQueue._MAX_DEPTH", 2)
+		queue = RelayQueue(SAMPLE_CHANNEL_ID, sender, upload_slots)
+		assert queue.put("one")
+		assert queue.put("two")
+		assert not queue.put("three")
+		assert queue.full()
+		await queue.join()
+
+	@pytest.mark.asyncio
+	async def test_survives_failed_send(
+		self, upload_slots: asyncio.Semaphore, sender: MockType, short_window: None
+	):
+		sender.side_effect = [hikari.ForbiddenError("", {}, b""), None]
+		queue = RelayQueue(SAMPLE_CHANNEL_ID, sender, upload_slots)
+		queue.put("one")
+		await queue.join()
+		queue.put("two")
+		await queue.join()
+		assert sender.call_count == 2
+
+	@pytest.mark.asyncio
+	@pytest.mark.parametrize("error", [OSError, aiohttp.ClientConnectionError])
+	async def test_keeps_draining_after_error(
+		self,
+		upload_slots: asyncio.Semaphore,
+		sender: MockType,
+		short_window: None,
+		error: type[Exception],
+	):
+		sender.side_effect = [error, None]
+		queue = RelayQueue(SAMPLE_CHANNEL_ID, sender, upload_slots)
+		queue.put("one" * 1000)
+		await queue.join()
+		assert sender.call_count == 2
+
+	@pytest.mark.asyncio
+	async def test_sends_attachments_separately(
+		self, upload_slots: asyncio.Semaphore, sender: MockType, short_window: None
+	):
+		queue = RelayQueue(SAMPLE_CHANNEL_ID, sender, upload_slots)
+		queue.put("one")
+		queue.put("two", ["file"])
+		queue.put("three")
+		await queue.join()
+		assert [c.args[1:] for c in sender.call_args_list] == [
+			("one\ntwo", ["file"]),
+			("three", ()),
+		]
+
+	@pytest.mark.asyncio
+	async def test_caps_concurrent_uploads(
+		self, upload_slots: asyncio.Semaphore, short_window: None
+	):
+		active = peak = 0
+
+		async def send(*_: object):
+			nonlocal active, peak
+			active += 1
+			peak = max(peak, active)
+			await asyncio.sleep(0.01)
+			active -= 1
+
+		queues = [RelayQueue(i, send, upload_slots) for i in range(3)]
+		for q in queues:
+			q.put("", ["file"])
+		await asyncio.gather(*[q.join() for q in queues])
+		assert peak == 1
@@ -0,0 +1,148 @@
+import asyncio
+
+from pytest_mock import MockType, MockerFixture
+import ongaku
+import pytest
+
+from kdi.relay.speech_queue import share_tracks, SpeechQueue
+
+
+def prefetch(message: str):
+	async def create_track(chunk: str):
+		return chunk
+
+	return [asyncio.create_task(create_track(c)) for c in message.split()]
+
+
+def release(_: object):
+	pass
+
+
+@pytest.fixture
+def player(mocker: MockerFixture):
+	player = mocker.MagicMock(spec=ongaku.Player)
+	player.queue = []
+	player.play = mocker.AsyncMock(side_effect=player.queue.append)
+	player.add = mocker.MagicMock(side_effect=player.queue.append)
+	return player
+
+
+async def drain(queue: SpeechQueue):
+	while queue._worker is not None and not queue._worker.done():
+		await asyncio.sleep(0)
+
+
+def finish_track(player: MockType, queue: SpeechQueue):
+	player.queue.pop(0)
+	queue.notify_advanced()
+
+
+class TestSpeechQueue:
+	@pytest.mark.asyncio
+	async def test_plays_first_track(self, player: MockType):
+		queue = SpeechQueue(player, prefetch, release, 4)
+		assert queue.put("a")
+		await drain(queue)
+		player.play.assert_called_once_with("a")
+
+	@pytest.mark.asyncio
+	async def test_preloads_next_track(self, player: MockType):
+		queue = SpeechQueue(player, prefetch, release, 4)
+		queue.put("a b c")
+		for _ in range(10):
+			await asyncio.sleep(0)
+		assert player.queue == ["a", "b"]
+		finish_track(player, queue)
+		await drain(queue)
+		assert player.queue == ["b", "c"]
+
+	@pytest.mark.asyncio
+	async def test_keeps_message_order(self, player: MockType):
+		queue = SpeechQueue(player, prefetch, release, 4)
+		queue.put("a")
+		queue.put("b")
+		queue.put("c")
+		for _ in range(10):
+			await asyncio.sleep(0)
+		finish_track(player, queue)
+		await drain(queue)
+		assert player.queue == ["b", "c"]
+
+	@pytest.mark.asyncio
+	async def test_rejects_when_full(self, player: MockType):
+		player.queue.extend(["x", "y"])
+		queue = SpeechQueue(player, prefetch, release, 1)
+		assert queue.put("a")
+		await asyncio.sleep(0)
+		assert queue.put("b")
+		assert not queue.put("c")
+		assert queue.full()
+
+	@pytest.mark.asyncio
+	async def test_clear_cancels_pending(self, player: MockType):
+		player.queue.extend(["x", "y"])
+		queue = SpeechQueue(player, prefetch, release, 4)
+		queue.put("a")
+		queue.put("b")
+		queue.clear()
+		assert len(queue) == 0
+		await asyncio.sleep(0)
+		player.add.assert_not_called()
+
+	@pytest.mark.asyncio
+	async def test_signals_start(self, player: MockType):
+		queue = SpeechQueue(player, prefetch, release, 4)
+		utterance = queue.put("a b")
+		assert utterance is not None
+		assert await utterance.started is None
+
+	@pytest.mark.asyncio
+	async def test_signals_failure(self, player: MockType):
+		player.play.side_effect = ongaku.PlayerConnectError("")
+		queue = SpeechQueue(player, prefetch, release, 4)
+		utterance = queue.put("a")
+		assert utterance is not None
+		assert isinstance(await utterance.started, ongaku.PlayerConnectError)
+
+	@pytest.mark.asyncio
+	async def test_shares_tracks(self, player: MockType):
+		tracks = prefetch("a")
+		queue = SpeechQueue(player, prefetch, release, 4)
+		queue.put("a", share_tracks(tracks))
+		queue.clear()
+		assert await tracks[0] == "a"
+
+	@pytest.mark.asyncio
+	async def test_releases_cleared_tracks(
+		self, player: MockType, mocker: MockerFixture
+	):
+		releaser = mocker.MagicMock()
+		player.queue.extend(["x", "y"])
+		queue = SpeechQueue(player, prefetch, releaser, 4)
+		queue.put("a b")
+		queue.put("c")
+		for _ in range(10):
+			await asyncio.sleep(0)
+		queue.clear()
+		await asyncio.sleep(0)
+		released = [c.args[0] for c in releaser.call_args_list]
+		assert sorted(released) == ["a", "b", "c", "x", "y"]
+
+	@pytest.mark.asyncio
+	async def test_releases_unplayed_tracks(
+		self, player: MockType, mocker: MockerFixture
+	):
+		releaser = mocker.MagicMock()
+		player.play.side_effect = ongaku.PlayerConnectError("")
+		queue = SpeechQueue(player, prefetch, releaser, 4)
+		queue.put("a b")
+		await drain(queue)
+		assert [c.args[0] for c in releaser.call_args_list] == ["a", "b"]
+
+	@pytest.mark.asyncio
+	async def test_keeps_enqueued_tracks(self, player: MockType, mocker: MockerFixture):
+		releaser = mocker.MagicMock()
+		queue = SpeechQueue(player, prefetch, releaser, 4)
+		queue.put("a")
+		await drain(queue)
+		releaser.assert_not_called()
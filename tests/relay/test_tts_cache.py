@@ -0,0 +1,122 @@
+from pathlib import Path
+import os
+
+from pytest_mock import MockerFixture
+import pytest
+
+from kdi.relay.tts_cache import get_tts_cache_dir, normalize_text, TTSCache
+
+
+def write_entry(cache: TTSCache, key: str, n_bytes: int):
+	cache.path_for(key).write_bytes(b"\0" * n_bytes)
+	return cache.add(key)
+
+
+@pytest.fixture
+def cache(tmp_path: Path):
+	return TTSCache(max_bytes=100, directory=tmp_path)
+
+
+class TestNormalizeText:
+	def test_collapses_whitespace(self):
+		assert normalize_text("  round \n starting\t") == "round starting"
+
+	def test_preserves_case(self):
+		assert normalize_text("NASA") == "NASA"
+
+
+class TestMakeKey:
+	def test_ignores_whitespace(self):
+		assert TTSCache.make_key("a  b", "v", 1) == TTSCache.make_key(" a b ", "v", 1)
+
+	@pytest.mark.parametrize("voice, rate", [("w", 1), ("v", 2)])
+	def test_depends_on_voice_and_rate(self, voice: str, rate: int):
+		assert TTSCache.make_key("a", "v", 1) != TTSCache.make_key("a", voice, rate)
+
+
+class TestTTSCache:
+	def test_get_missing(self, cache: TTSCache):
+		assert cache.get("missing") is None
+
+	def test_add_and_get(self, cache: TTSCache):
+		path = write_entry(cache, "a", 10)
+		assert cache.get("a") == path
+		assert cache.size == 10
+
+	def test_evicts_least_recently_used(self, cache: TTSCache):
+		write_entry(cache, "a", 40)
+		write_entry(cache, "b", 40)
+		cache.get("a")
+		write_entry(cache, "c", 40)
+		assert "a" in cache and "c" in cache
+		assert "b" not in cache
+		assert not cache.path_for("b").exists()
+		assert cache.size == 80
+
+	def test_adds_from_source(self, cache: TTSCache):
+		source = cache.temp_path()
+		source.write_bytes(b"\0" * 10)
+		path = cache.add("a", source)
+		assert not source.exists()
+		assert Path(path).exists()
+		assert cache.size == 10
+
+	def test_uses_extension(self, tmp_path: Path):
+		cache = TTSCache(directory=tmp_path, extension=".ogg")
+		assert cache.path_for("a").suffix == ".ogg"
+		assert cache.temp_path().suffix == ".ogg"
+
+	def test_temp_paths_are_unique(self, cache: TTSCache):
+		assert cache.temp_path() != cache.temp_path()
+
+	def test_clears_temp_dir(self, tmp_path: Path):
+		cache = TTSCache(directory=tmp_path)
+		leftover = cache.temp_path()
+		leftover.touch()
+		TTSCache(directory=tmp_path)
+		assert not leftover.exists()
+
+	def test_separates_worker_dirs(self):
+		assert get_tts_cache_dir().name == "tts"
+		assert get_tts_cache_dir(2).name == "tts-2"
+		assert get_tts_cache_dir(2).parent == get_tts_cache_dir().parent
+
+	def test_keeps_other_worker_temp_files(self, tmp_path: Path):
+		cache = TTSCache(directory=tmp_path / "tts-1")
+		rendering = cache.temp_path()
+		rendering.touch()
+		TTSCache(directory=tmp_path / "tts-2")
+		assert rendering.exists()
+
+	def test_removes_other_formats(self, tmp_path: Path):
+		(tmp_path / "old.mp3").write_bytes(b"\0" * 10)
+		(tmp_path / "new.ogg").write_bytes(b"\0" * 10)
+		cache = TTSCache(directory=tmp_path, extension=".ogg")
+		assert not (tmp_path / "old.mp3").exists()
+		assert "new" in cache
+		assert cache.size == 10
+
+	def test_forgets_deleted_files(self, cache: TTSCache):
+		write_entry(cache, "a", 10)
+		cache.path_for("a").unlink()
+		assert cache.get("a") is None
+		assert cache.size == 0
+
+	def test_tracks_follow_entries(self, mocker: MockerFixture, cache: TTSCache):
+		track = mocker.MagicMock()
+		cache.set_track("a", track)
+		assert cache.get_track("a") is None
+		write_entry(cache, "a", 60)
+		cache.set_track("a", track)
+		assert cache.get_track("a") is track
+		write_entry(cache, "b", 60)
+		assert cache.get_track("a") is None
+
+	def test_loads_existing_in_mtime_order(self, tmp_path: Path):
+		for i, key in enumerate(["old", "new"]):
+			path = tmp_path / f"{key}.mp3"
+			path.write_bytes(b"\0" * 60)
+			os.utime(path, (i, i))
+		cache = TTSCache(max_bytes=100, directory=tmp_path)
+		assert len(cache) == 1
+		assert "new" in cache
@@ -0,0 +1,50 @@
+from pathlib import Path
+
+from pytest_mock import MockType, MockerFixture
+import pytest
+
+from kdi.relay import tts_worker
+
+
+def touch(_: str, path: str):
+	Path(path).touch()
+
+
+@pytest.fixture
+def engine(mocker: MockerFixture):
+	engine = mocker.MagicMock()
+	engine.save_to_file.side_effect = touch
+	mocker.patch("kdi.relay.tts_worker._engine", engine)
+	return engine
+
+
+@pytest.fixture
+def runner(mocker: MockerFixture):
+	return mocker.patch("subprocess.run")
+
+
+class TestSynthesize:
+	def test_requires_init(self, mocker: MockerFixture):
+		mocker.patch("kdi.relay.tts_worker._engine", None)
+		with pytest.raises(RuntimeError):
+			tts_worker.synthesize("hi", "out.mp3")
+
+	def test_writes_directly_without_ffmpeg(
+		self, engine: MockType, runner: MockType, tmp_path: Path
+	):
+		out_path = (tmp_path / "out.mp3").as_posix()
+		tts_worker.synthesize("hi", out_path)
+		engine.save_to_file.assert_called_once_with("hi", out_path)
+		runner.assert_not_called()
+
+	def test_encodes_opus(self, engine: MockType, runner: MockType, tmp_path: Path):
+		out_path = (tmp_path / "out.ogg").as_posix()
+		raw_path = tmp_path / "out.wav"
+		tts_worker.synthesize("hi", out_path, "ffmpeg")
+		engine.save_to_file.assert_called_once_with("hi", raw_path.as_posix())
+		args = runner.call_args.args[0]
+		assert args[0] == "ffmpeg"
+		assert args[-1] == out_path
+		assert "libopus" in args
+		assert tts_worker.OPUS_BITRATE in args
+		assert not raw_path.exists()
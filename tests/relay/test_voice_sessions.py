@@ -0,0 +1,150 @@
+from pytest_mock import MockType, MockerFixture
+import hikari
+import ongaku
+import pytest
+
+from kdi.relay.voice_sessions import (
+	VOICE_DISCONNECTED_CLOSE_CODE,
+	VoiceSessionManager,
+)
+
+SAMPLE_GUILD_ID = hikari.Snowflake(369)
+
+SAMPLE_CHANNEL_ID = hikari.Snowflake(246)
+
+
+@pytest.fixture
+def player(mocker: MockerFixture):
+	player = mocker.MagicMock(spec=ongaku.Player)
+	player.guild_id = SAMPLE_GUILD_ID
+	player.connected = True
+	player.queue = []
+	player.connect = mocker.AsyncMock()
+	player.disconnect = mocker.AsyncMock()
+	return player
+
+
+@pytest.fixture
+def client(mocker: MockerFixture, player: MockType):
+	client = mocker.MagicMock(spec=ongaku.Client)
+	client.create_player.return_value = player
+	client.delete_player = mocker.AsyncMock()
+	return client
+
+
+@pytest.fixture
+def channel(mocker: MockerFixture):
+	channel = mocker.MagicMock(spec=hikari.InteractionChannel)
+	channel.id = SAMPLE_CHANNEL_ID
+	return channel
+
+
+@pytest.fixture
+def on_disconnect(mocker: MockerFixture):
+	return mocker.MagicMock()
+
+
+@pytest.fixture
+def voices(client: MockType, on_disconnect: MockType):
+	return VoiceSessionManager(client, 60, on_disconnect)
+
+
+class TestVoiceSessionManager:
+	def test_get_unknown_guild(self, voices: VoiceSessionManager):
+		assert voices.get(SAMPLE_GUILD_ID) is None
+
+	@pytest.mark.asyncio
+	async def test_connect_registers_player(
+		self,
+		voices: VoiceSessionManager,
+		channel: MockType,
+		player: MockType,
+	):
+		await voices.connect(SAMPLE_GUILD_ID, channel)
+		player.connect.assert_called_once_with(SAMPLE_CHANNEL_ID, deaf=False)
+		assert voices.get(SAMPLE_GUILD_ID) is player
+		assert voices.connected_players() == [player]
+
+	@pytest.mark.asyncio
+	async def test_get_ignores_dropped_player(
+		self, voices: VoiceSessionManager, channel: MockType, player: MockType
+	):
+		await voices.connect(SAMPLE_GUILD_ID, channel)
+		player.connected = False
+		assert voices.get(SAMPLE_GUILD_ID) is None
+
+	@pytest.mark.asyncio
+	async def test_disconnect_releases_player(
+		self,
+		voices: VoiceSessionManager,
+		channel: MockType,
+		client: MockType,
+		player: MockType,
+		on_disconnect: MockType,
+	):
+		await voices.connect(SAMPLE_GUILD_ID, channel)
+		await voices.disconnect(SAMPLE_GUILD_ID)
+		player.disconnect.assert_called_once()
+		client.delete_player.assert_called_once_with(SAMPLE_GUILD_ID)
+		on_disconnect.assert_called_once_with(SAMPLE_GUILD_ID)
+		assert SAMPLE_GUILD_ID not in voices
+
+	@pytest.mark.asyncio
+	async def test_reconnects_after_new_session(
+		self,
+		mocker: MockerFixture,
+		voices: VoiceSessionManager,
+		channel: MockType,
+		player: MockType,
+	):
+		await voices.connect(SAMPLE_GUILD_ID, channel)
+		event = mocker.MagicMock(spec=ongaku.ReadyEvent)
+		event.resumed = False
+		await voices.on_ready(event)
+		player.connect.assert_called_with(SAMPLE_CHANNEL_ID, deaf=False)
+		assert player.connect.call_count == 2
+
+	@pytest.mark.asyncio
+	@pytest.mark.parametrize(
+		"code, expected_connects", [(4006, 2), (VOICE_DISCONNECTED_CLOSE_CODE, 1)]
+	)
+	async def test_handles_closed_websocket(
+		self,
+		mocker: MockerFixture,
+		voices: VoiceSessionManager,
+		channel: MockType,
+		player: MockType,
+		code: int,
+		expected_connects: int,
+	):
+		await voices.connect(SAMPLE_GUILD_ID, channel)
+		event = mocker.MagicMock(spec=ongaku.WebsocketClosedEvent)
+		event.guild_id = SAMPLE_GUILD_ID
+		event.by_remote = True
+		event.code = code
+		await voices.on_websocket_closed(event)
+		assert player.connect.call_count == expected_connects
+		assert (SAMPLE_GUILD_ID in voices) == (expected_connects == 2)
+
+	@pytest.mark.asyncio
+	async def test_disconnects_idle_players(
+		self,
+		mocker: MockerFixture,
+		voices: VoiceSessionManager,
+		channel: MockType,
+		player: MockType,
+	):
+		await voices.connect(SAMPLE_GUILD_ID, channel)
+		voices._last_active[SAMPLE_GUILD_ID] -= 120
+		player.queue = ["track"]
+		assert await voices.disconnect_idle() == []
+		player.queue = []
+		assert await voices.disconnect_idle() == [SAMPLE_GUILD_ID]
+		assert SAMPLE_GUILD_ID not in voices
+
+	@pytest.mark.asyncio
+	async def test_keeps_recently_active_players(
+		self, voices: VoiceSessionManager, channel: MockType
+	):
+		await voices.connect(SAMPLE_GUILD_ID, channel)
+		assert await voices.disconnect_idle() == []
@@ -0,0 +1,84 @@
+from kdi.store.compact import EMPTY_ROW, RowIndex, StringTable
+
+
+class TestStringTable:
+	def test_append_and_get(self):
+		table = StringTable()
+		for value in ["alice", "", "ʕ•ᴥ•ʔ"]:
+			table.append(value)
+		assert [table[i] for i in range(len(table))] == ["alice", "", "ʕ•ᴥ•ʔ"]
+
+	def test_overwrites_rows(self):
+		table = StringTable()
+		for value in ["alice", "bob", "carol"]:
+			table.append(value)
+		table[1] = "robert"
+		table[0] = "al"
+		assert [table[i] for i in range(len(table))] == ["al", "robert", "carol"]
+
+	def test_compacts_garbage(self):
+		table = StringTable()
+		table.append("")
+		for i in range(5_000):
+			table[0] = "x" * (i % 64)
+		assert table.nbytes < 16_384
+
+	def test_clear(self):
+		table = StringTable()
+		table.append("alice")
+		table.clear()
+		assert len(table) == 0
+		assert table.nbytes == 0
+
+
+class TestRowIndex:
+	def test_finds_rows(self):
+		keys = [f"user{i}" for i in range(100)]
+		index = RowIndex(keys.__getitem__)
+		for row, key in enumerate(keys):
+			index.add(key, row)
+		assert len(index) == 100
+		assert all(index.find(key) == row for row, key in enumerate(keys))
+
+	def test_missing_key(self):
+		keys = [1, 2]
+		index = RowIndex(keys.__getitem__)
+		index.add(1, 0)
+		assert index.find(2) == EMPTY_ROW
+
+	def test_handles_colliding_hashes(self):
+		keys = [i << 32 for i in range(50)]
+		index = RowIndex(keys.__getitem__)
+		for row, key in enumerate(keys):
+			index.add(key, row)
+		assert all(index.find(key) == row for row, key in enumerate(keys))
+
+	def test_removes_rows(self):
+		keys = list(range(100))
+		index = RowIndex(keys.__getitem__)
+		for row, key in enumerate(keys):
+			index.add(key, row)
+		for key in keys[::2]:
+			assert index.remove(key)
+		assert not index.remove(0)
+		assert len(index) == 50
+		assert all(index.find(key) == EMPTY_ROW for key in keys[::2])
+		assert all(index.find(key) == key for key in keys[1::2])
+
+	def test_reuses_deleted_slots(self):
+		keys = list(range(10_000))
+		index = RowIndex(keys.__getitem__)
+		index.add(0, 0)
+		for key in keys[1:]:
+			index.add(key, key)
+			index.remove(key)
+		assert index.nbytes <= 64
+		assert index.find(0) == 0
+
+	def test_clear(self):
+		keys = [1]
+		index = RowIndex(keys.__getitem__)
+		index.add(1, 0)
+		index.clear()
+		assert index.find(1) == EMPTY_ROW
+		assert len(index) == 0
@@ -0,0 +1,127 @@
+from pytest_mock import MockType, MockerFixture
+import hikari
+import pytest
+
+from kdi.store import MemberPrefetch, UserStore
+from kdi.store.member_prefetch import PREFETCH_NONCE
+
+SAMPLE_GUILD_ID = hikari.Snowflake(369)
+
+
+@pytest.fixture
+def bot(mocker: MockerFixture):
+	bot = mocker.MagicMock(spec=hikari.GatewayBot)
+	bot.request_guild_members = mocker.AsyncMock()
+	return bot
+
+
+@pytest.fixture
+def store():
+	return UserStore()
+
+
+@pytest.fixture
+def prefetch(bot: MockType, store: UserStore):
+	return MemberPrefetch(bot, store)
+
+
+def make_member(mocker: MockerFixture, uid: int, name: str, is_bot: bool = False):
+	member = mocker.MagicMock(spec=hikari.Member)
+	member.display_name = name.title()
+	member.id = uid
+	member.is_bot = is_bot
+	member.username = name
+	return member
+
+
+def make_chunk(
+	mocker: MockerFixture,
+	members: list[MockType],
+	index: int = 0,
+	count: int = 1,
+	nonce: str = PREFETCH_NONCE,
+):
+	event = mocker.MagicMock(spec=hikari.MemberChunkEvent)
+	event.chunk_count = count
+	event.chunk_index = index
+	event.guild_id = SAMPLE_GUILD_ID
+	event.members = {m.id: m for m in members}
+	event.nonce = nonce
+	return event
+
+
+class TestMemberPrefetch:
+	def test_subscriptions(self, bot: MockType, prefetch: MemberPrefetch):
+		assert bot.subscribe.call_count == 3
+
+	@pytest.mark.asyncio
+	async def test_requests_available_guilds(
+		self, mocker: MockerFixture, bot: MockType, prefetch: MemberPrefetch
+	):
+		event = mocker.MagicMock(spec=hikari.GuildAvailableEvent)
+		event.guild_id = SAMPLE_GUILD_ID
+		await prefetch.on_guild_available(event)
+		await prefetch.on_guild_available(event)
+		bot.request_guild_members.assert_called_once_with(
+			SAMPLE_GUILD_ID, nonce=PREFETCH_NONCE
+		)
+		assert prefetch.pending == {SAMPLE_GUILD_ID}
+
+	@pytest.mark.asyncio
+	async def test_stores_chunks(
+		self, mocker: MockerFixture, prefetch: MemberPrefetch, store: UserStore
+	):
+		await prefetch.request(SAMPLE_GUILD_ID)
+		await prefetch.on_member_chunk(
+			make_chunk(
+				mocker,
+				[make_member(mocker, 1, "alice"), make_member(mocker, 2, "kdi", True)],
+				count=2,
+			)
+		)
+		assert not await prefetch.wait(0)
+		await prefetch.on_member_chunk(
+			make_chunk(mocker, [make_member(mocker, 3, "bob")], index=1, count=2)
+		)
+		assert await prefetch.wait(0)
+		assert prefetch.n_members == 2
+		assert store.get("alice") is not None
+		assert store.get("kdi") is None
+		assert not prefetch.pending
+
+	@pytest.mark.asyncio
+	async def test_ignores_foreign_chunks(
+		self, mocker: MockerFixture, prefetch: MemberPrefetch, store: UserStore
+	):
+		await prefetch.request(SAMPLE_GUILD_ID)
+		await prefetch.on_member_chunk(
+			make_chunk(mocker, [make_member(mocker, 1, "alice")], nonce="other")
+		)
+		assert len(store) == 0
+
+	@pytest.mark.asyncio
+	async def test_cancel_stops_prefetch(
+		self,
+		mocker: MockerFixture,
+		bot: MockType,
+		prefetch: MemberPrefetch,
+		store: UserStore,
+	):
+		await prefetch.request(SAMPLE_GUILD_ID)
+		prefetch.cancel()
+		assert await prefetch.wait(0)
+		await prefetch.on_member_chunk(
+			make_chunk(mocker, [make_member(mocker, 1, "alice")])
+		)
+		await prefetch.request(hikari.Snowflake(246))
+		assert len(store) == 0
+		bot.request_guild_members.assert_called_once()
+
+	@pytest.mark.asyncio
+	async def test_recovers_from_failed_request(
+		self, bot: MockType, prefetch: MemberPrefetch
+	):
+		bot.request_guild_members.side_effect = hikari.ComponentStateConflictError("")
+		await prefetch.request(SAMPLE_GUILD_ID)
+		assert not prefetch.pending
+		assert await prefetch.wait(0)
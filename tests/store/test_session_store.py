@@ -0,0 +1,73 @@
+from pathlib import Path
+from pytest_mock import MockerFixture
+import asyncio
+import pytest
+import threading
+
+from kdi.store import MemorySessionStore, SessionStore, SQLiteSessionStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def sessions(request: pytest.FixtureRequest, tmp_path: Path):
+	if request.param == "memory":
+		store = MemorySessionStore()
+	else:
+		store = SQLiteSessionStore(tmp_path / "sessions.sqlite3")
+	yield store
+	asyncio.run(store.close())
+
+
+class TestSessionStore:
+	def test_is_abstract(self):
+		assert SessionStore.__abstractmethods__ == frozenset(
+			{"get", "set", "delete", "clear"}
+		)
+
+	@pytest.mark.asyncio
+	async def test_round_trips_values(self, sessions: SessionStore):
+		await sessions.set("relay:channels:1", [2, 3])
+		assert await sessions.get("relay:channels:1") == [2, 3]
+		assert await sessions.get("relay:channels:2") is None
+
+	@pytest.mark.asyncio
+	async def test_overwrites(self, sessions: SessionStore):
+		await sessions.set("key", {"a": 1})
+		await sessions.set("key", {"a": 2})
+		assert await sessions.get("key") == {"a": 2}
+
+	@pytest.mark.asyncio
+	async def test_delete_and_clear(self, sessions: SessionStore):
+		await sessions.set("a", 1)
+		await sessions.set("b", 2)
+		await sessions.delete("a")
+		await sessions.delete("missing")
+		assert await sessions.get("a") is None
+		await sessions.clear()
+		assert await sessions.get("b") is None
+
+	@pytest.mark.asyncio
+	async def test_copies_values(self, sessions: SessionStore):
+		value = [1]
+		await sessions.set("key", value)
+		value.append(2)
+		assert await sessions.get("key") == [1]
+
+
+class TestSQLiteSessionStore:
+	@pytest.mark.asyncio
+	async def test_shares_between_connections(self, tmp_path: Path):
+		path = tmp_path / "sessions.sqlite3"
+		writer, reader = SQLiteSessionStore(path), SQLiteSessionStore(path)
+		await writer.set("key", "value")
+		assert await reader.get("key") == "value"
+		await writer.close()
+		await reader.close()
+
+	@pytest.mark.asyncio
+	async def test_queries_off_event_loop(self, tmp_path: Path, mocker: MockerFixture):
+		sessions = SQLiteSessionStore(tmp_path / "sessions.sqlite3")
+		mocker.patch.object(
+			sessions, "_get", side_effect=lambda _: threading.current_thread()
+		)
+		assert await sessions.get("key") is not threading.current_thread()
+		await sessions.close()
@@ -1,10 +1,10 @@
 from pytest_mock import MockType, MockerFixture
-from unittest.mock import call
 import hikari
 import lightbulb
 import pytest
 
-from kdi.bot import kdi
+from kdi.bot import ComponentRouter
+from kdi.store import UserStore
 from kdi.teams.teams import (
 	is_trusted_user,
 	PLAYER_AVAILABLE_ID,
@@ -12,30 +12,81 @@ from kdi.teams.teams import (
 	start_command,
 	teams_group,
 	TeamsPlugin,
+	UNKNOWN_PLAYER_MSG,
 )
+from kdi.teams.players_message import PlayersMessage
 from kdi.teams.teams_state import TeamsState
 
 
+@pytest.fixture
+def users():
+	return UserStore()
+
+
+@pytest.fixture
+def components(mocker: MockerFixture):
+	return ComponentRouter(mocker.MagicMock(spec=hikari.GatewayBot))
+
+
 class TestPluginInit:
-	def test_subscriptions(self, mocker: MockerFixture):
-		subscriber = mocker.spy(hikari.GatewayBot, "subscribe")
+	def test_listeners(self, components: ComponentRouter, users: UserStore):
+		teams = TeamsPlugin(users, components)
 
-		teams = TeamsPlugin()
+		assert dict(teams.listeners) == {
+			hikari.GuildMessageDeleteEvent: [teams.on_gm_delete],
+			hikari.StoppingEvent: [teams.on_stopping],
+		}
 
-		assert subscriber.call_count == 2
-		subscriber.assert_has_calls(
-			[
-				call(kdi, hikari.GuildMessageDeleteEvent, teams.on_gm_delete),
-				call(kdi, hikari.InteractionCreateEvent, teams.on_interaction),
-			]
-		)
+	@pytest.mark.asyncio
+	async def test_unsubscribes_config_on_stopping(
+		self, components: ComponentRouter, users: UserStore, mocker: MockerFixture
+	):
+		subscribers = mocker.patch("kdi.util.config.config_subscribers", [])
+		teams = TeamsPlugin(users, components)
+		assert subscribers == [teams.on_config_changed]
+		await teams.on_stopping(mocker.MagicMock())
+		assert subscribers == []
+
+	def test_unsubscribes_config_on_removal(
+		self, components: ComponentRouter, users: UserStore, mocker: MockerFixture
+	):
+		subscribers = mocker.patch("kdi.util.config.config_subscribers", [])
+		bot = mocker.MagicMock(spec=lightbulb.BotApp)
+		teams = TeamsPlugin(users, components)
+		lightbulb.BotApp.remove_plugin(bot, teams)
+		assert subscribers == []
+
+	def test_commands(self, components: ComponentRouter, users: UserStore):
+		assert TeamsPlugin(users, components)._raw_commands == [teams_group]
+
+
+class TestPluginOnConfigChanged:
+	def test_updates_blocks(
+		self, components: ComponentRouter, users: UserStore, mocker: MockerFixture
+	):
+		config = mocker.MagicMock()
+		config.teams.blocks = (("a", "b"),)
+		teams = TeamsPlugin(users, components)
+		teams.on_config_changed(config)
+		assert teams._state._blocks == {frozenset("ab")}
+
+	def test_reads_trusted_ids_from_snapshot(
+		self, components: ComponentRouter, users: UserStore, mocker: MockerFixture
+	):
+		config = mocker.patch("kdi.teams.teams.get_config").return_value
+		config.user.trusted_ids = frozenset({42})
+		teams = TeamsPlugin(users, components)
+		assert teams.is_trusted_user(42)
+		assert not teams.is_trusted_user(123)
 
 
 class TestPluginStart:
 	@pytest.fixture
 	def start_context(self, mocker: MockerFixture):
 		ctx = mocker.MagicMock(spec=lightbulb.SlashContext)
+		ctx.member = None
 		ctx.respond = mocker.AsyncMock()
+		ctx.user.display_name = SAMPLE_PLAYER_NAME
 		ctx.user.id = 123
 		ctx.user.is_bot = False
 		ctx.user.username = SAMPLE_PLAYER_NAME
@@ -48,10 +99,12 @@ class TestPluginStart:
 	@pytest.mark.asyncio
 	async def test_resets_state(
 		self,
+		components: ComponentRouter,
+		users: UserStore,
 		state_resetter: MockType,
 		start_context: MockType,
 	):
-		teams = TeamsPlugin()
+		teams = TeamsPlugin(users, components)
 		await teams.start(start_context)
 		await teams.stop(start_context)
 
@@ -60,6 +113,8 @@ class TestPluginStart:
 	@pytest.mark.asyncio
 	async def test_creates_players_message(
 		self,
+		components: ComponentRouter,
+		users: UserStore,
 		mocker: MockerFixture,
 		start_context: MockType,
 	):
@@ -67,7 +122,7 @@ class TestPluginStart:
 			"kdi.teams.players_message.PlayersMessage.create", mocker.AsyncMock()
 		)
 
-		teams = TeamsPlugin()
+		teams = TeamsPlugin(users, components)
 		await teams.start(start_context)
 		await teams.stop(start_context)
 
@@ -75,16 +130,37 @@ class TestPluginStart:
 			start_context, teams._state._players - teams._state._cores
 		)
 
+	@pytest.mark.asyncio
+	async def test_routes_players_message(
+		self,
+		users: UserStore,
+		components: ComponentRouter,
+		mocker: MockerFixture,
+		player_interaction: MockType,
+		start_context: MockType,
+	):
+		async def create(pm: PlayersMessage, *_: object):
+			pm._message = player_interaction.message
+
+		mocker.patch.object(PlayersMessage, "create", create)
+		teams = TeamsPlugin(users, components)
+		await teams.start(start_context)
+		await teams.stop(start_context)
+
+		assert components.find(player_interaction) == teams.check_players_interaction
+
 
 class TestPluginOnGMDelete:
 	@pytest.mark.asyncio
-	async def test_checks_player_message(self, mocker: MockerFixture):
+	async def test_checks_player_message(
+		self, components: ComponentRouter, users: UserStore, mocker: MockerFixture
+	):
 		event = mocker.MagicMock(spec=hikari.GuildMessageDeleteEvent)
 		pm_delete_checker = mocker.patch(
 			"kdi.teams.players_message.PlayersMessage.check_delete", mocker.AsyncMock()
 		)
 
-		teams = TeamsPlugin()
+		teams = TeamsPlugin(users, components)
 		await teams.on_gm_delete(event)
 
 		pm_delete_checker.assert_called_once()
@@ -99,7 +175,10 @@ def player_interaction(mocker: MockerFixture):
 	interaction.create_initial_response = mocker.AsyncMock()
 	interaction.custom_id = PLAYER_AVAILABLE_ID
 	interaction.message = mocker.MagicMock(spec=hikari.Message)
+	interaction.member = None
 	interaction.message.id = 248
+	interaction.user.display_name = SAMPLE_PLAYER_NAME
+	interaction.user.id = 123
 	interaction.user.is_bot = False
 	interaction.user.username = SAMPLE_PLAYER_NAME
 	return interaction
@@ -136,13 +215,15 @@ class TestCheckPlayersInteraction:
 	@pytest.mark.asyncio
 	async def test_player_available(
 		self,
+		components: ComponentRouter,
+		users: UserStore,
 		player_interaction: MockType,
 		state_player_adder: MockType,
 		cm_updater: MockType,
 		pm_updater: MockType,
 	):
 		player = {player_interaction.user.username}
-		teams = TeamsPlugin()
+		teams = TeamsPlugin(users, components)
 		teams._players_message._message = player_interaction.message
 		await teams.check_players_interaction(player_interaction)
 
@@ -160,6 +241,8 @@ class TestCheckPlayersInteraction:
 	@pytest.mark.asyncio
 	async def test_player_unavailable(
 		self,
+		components: ComponentRouter,
+		users: UserStore,
 		player_interaction: MockType,
 		state_player_remover: MockType,
 		cm_updater: MockType,
@@ -167,7 +250,7 @@ class TestCheckPlayersInteraction:
 	):
 		player_interaction.custom_id = PLAYER_UNAVAILABLE_ID
 		player = {player_interaction.user.username}
-		teams = TeamsPlugin()
+		teams = TeamsPlugin(users, components)
 		teams._players_message._message = player_interaction.message
 		teams._state.add_player(player)
 		await teams.check_players_interaction(player_interaction)
@@ -182,11 +265,15 @@ class TestCheckPlayersInteraction:
 
 	@pytest.mark.asyncio
 	async def test_player_available_duplicate(
-		self, player_interaction: MockType, state_player_adder: MockType
+		self,
+		components: ComponentRouter,
+		users: UserStore,
+		player_interaction: MockType,
+		state_player_adder: MockType,
 	):
 		player = {player_interaction.user.username}
 
-		teams = TeamsPlugin()
+		teams = TeamsPlugin(users, components)
 		teams._players_message._message = player_interaction.message
 		teams._state.add_player(player)
 		await teams.check_players_interaction(player_interaction)
@@ -199,12 +286,16 @@ class TestCheckPlayersInteraction:
 
 	@pytest.mark.asyncio
 	async def test_player_unavailable_nonexistent(
-		self, player_interaction: MockType, state_player_remover: MockType
+		self,
+		components: ComponentRouter,
+		users: UserStore,
+		player_interaction: MockType,
+		state_player_remover: MockType,
 	):
 		player = {player_interaction.user.username}
 		player_interaction.custom_id = PLAYER_UNAVAILABLE_ID
 
-		teams = TeamsPlugin()
+		teams = TeamsPlugin(users, components)
 		teams._players_message._message = player_interaction.message
 		await teams.check_players_interaction(player_interaction)
 
@@ -212,21 +303,128 @@ class TestCheckPlayersInteraction:
 		assert not state_player_remover.spy_return
 
 
-class TestPluginOnInteraction:
+class TestSuggestPlayers:
+	@pytest.fixture(autouse=True)
+	def known_users(self, users: UserStore):
+		users.store(1, "alice", "Alice")
+		users.store(2, "bob", "Ally")
+		users.store(3, "carol")
+
+	@pytest.fixture
+	def autocomplete_interaction(self, mocker: MockerFixture):
+		interaction = mocker.MagicMock(spec=hikari.AutocompleteInteraction)
+		interaction.member = None
+		interaction.user.display_name = "Dave"
+		interaction.user.id = 4
+		interaction.user.username = "dave"
+		return interaction
+
+	def make_option(self, mocker: MockerFixture, value: str):
+		option = mocker.MagicMock(spec=hikari.AutocompleteInteractionOption)
+		option.value = value
+		return option
+
 	@pytest.mark.asyncio
-	async def test_player_available(
-		self, mocker: MockerFixture, player_interaction_event: MockType
+	async def test_matches_names_by_prefix(
+		self,
+		components: ComponentRouter,
+		users: UserStore,
+		mocker: MockerFixture,
+		autocomplete_interaction: MockType,
 	):
-		mock_check_player_interaction = mocker.patch(
-			"kdi.teams.teams.TeamsPlugin.check_players_interaction", mocker.AsyncMock()
+		teams = TeamsPlugin(users, components)
+		choices = await teams.suggest_players(
+			self.make_option(mocker, "AL"), autocomplete_interaction
 		)
+		assert [(c.name, c.value) for c in choices] == [
+			("Alice (alice)", "alice"),
+			("Ally (bob)", "bob"),
+		]
+
+	@pytest.mark.asyncio
+	async def test_remembers_requester(
+		self,
+		components: ComponentRouter,
+		users: UserStore,
+		mocker: MockerFixture,
+		autocomplete_interaction: MockType,
+	):
+		teams = TeamsPlugin(users, components)
+		choices = await teams.suggest_players(
+			self.make_option(mocker, "da"), autocomplete_interaction
+		)
+		assert [c.value for c in choices] == ["dave"]
 
-		teams = TeamsPlugin()
-		await teams.on_interaction(player_interaction_event)
 
-		mock_check_player_interaction.assert_called_once_with(
-			player_interaction_event.interaction
+class TestResolveUsernames:
+	@pytest.fixture(autouse=True)
+	def known_users(self, users: UserStore):
+		users.store(1, "alice", "Alice")
+		users.store(2, "bob", "Bobby")
+
+	def test_accepts_names_and_users(
+		self, components: ComponentRouter, users: UserStore, mocker: MockerFixture
+	):
+		member = mocker.MagicMock(spec=hikari.InteractionMember)
+		member.username = "carol"
+		options = lightbulb.OptionsProxy(
+			{"player-1": member, "player-2": "alice", "player-3": None}
 		)
+		teams = TeamsPlugin(users, components)
+		assert teams.resolve_usernames(options) == ({"alice", "carol"}, [])
+
+	def test_resolves_display_names(
+		self, components: ComponentRouter, users: UserStore
+	):
+		options = lightbulb.OptionsProxy({"player-1": "bobby"})
+		teams = TeamsPlugin(users, components)
+		assert teams.resolve_usernames(options) == ({"bob"}, [])
+
+	def test_reports_unknown_names(self, components: ComponentRouter, users: UserStore):
+		options = lightbulb.OptionsProxy({"player-1": "alice", "player-2": "alcie"})
+		teams = TeamsPlugin(users, components)
+		assert teams.resolve_usernames(options) == ({"alice"}, ["alcie"])
+
+
+class TestHandlePlayerCommand:
+	@pytest.fixture
+	def player_context(self, mocker: MockerFixture):
+		ctx = mocker.MagicMock(spec=lightbulb.SlashContext)
+		ctx.options = lightbulb.OptionsProxy({"player-1": "alice", "player-2": "bob"})
+		ctx.respond = mocker.AsyncMock()
+		return ctx
+
+	@pytest.mark.asyncio
+	async def test_adds_known_players(
+		self,
+		components: ComponentRouter,
+		users: UserStore,
+		mocker: MockerFixture,
+		player_context: MockType,
+	):
+		mocker.patch("kdi.teams.cores_message.CoresMessage.update", mocker.AsyncMock())
+		mocker.patch(
+			"kdi.teams.players_message.PlayersMessage.update", mocker.AsyncMock()
+		)
+		users.store(1, "alice")
+		users.store(2, "bob")
+		teams = TeamsPlugin(users, components)
+		await teams.add_player(player_context)
+		assert teams.players == {frozenset({"alice", "bob"})}
+
+	@pytest.mark.asyncio
+	async def test_rejects_unknown_players(
+		self,
+		components: ComponentRouter,
+		users: UserStore,
+		player_context: MockType,
+	):
+		users.store(1, "alice")
+		teams = TeamsPlugin(users, components)
+		await teams.add_player(player_context)
+		assert not teams.players
+		embed = player_context.respond.call_args.kwargs["embed"]
+		assert embed.description == f"**bob** {UNKNOWN_PLAYER_MSG}"
 
 
 class TestCommandGroup:
@@ -21,6 +21,17 @@ class TestTeamMatchesBlock:
 		assert not state._team_matches_block(Team("ab"), Team("c"))
 
 
+class TestSetBlocks:
+	def test_replaces_blocks(self):
+		state = TeamsState()
+		state.set_blocks([("a", "c")])
+		state.set_blocks([("a", "d")])
+		assert state._team_matches_block(Team("ab"), Team("d"))
+		assert not state._team_matches_block(Team("ab"), Team("c"))
+		assert state._forces.calc_internal_magnetism({"a"}, {"c"}) == 0
+		assert state._forces.calc_internal_magnetism({"a"}, {"d"}) == STRONG_FORCE
+
+
 class TestCalcNMaxTeams:
 	@pytest.mark.parametrize(
 		("n", "k", "expected"),
@@ -1,5 +1,85 @@
+import os
+import subprocess
+import sys
+
+from kdi.app import create_app
+from kdi.bot import get_plugin, KDI
+from kdi.relay import RelayPlugin
+from kdi.teams import TeamsPlugin
+from pytest_mock import MockerFixture
+import hikari
+import lightbulb
+import pytest
+
+IMPORT_WITHOUT_SIDE_EFFECTS = """
+import hikari
+import kdi.util.config
+kdi.util.config.read_config_file = None
+hikari.GatewayBot.__init__ = None
+import kdi.__main__
+"""
+
+
 class TestBot:
-	def test_loads_token(self):
-		from kdi.bot.bot import kdi
+	def test_loads_token(self, bot: KDI):
+		assert bot._token == "DISCORD_API_TOKEN"
+
+	def test_base_capabilities(self, bot: KDI):
+		assert bot.intents == hikari.Intents.GUILDS | hikari.Intents.GUILD_MESSAGES
+		assert bot.cache.settings.components == hikari.api.CacheComponents.ME
+
+	@pytest.mark.asyncio
+	async def test_unsubscribes_config_on_stopping(self, mocker: MockerFixture):
+		subscribers = mocker.patch("kdi.util.config.config_subscribers", [])
+		bot = KDI()
+		assert subscribers == [bot.on_config_changed]
+		await bot.on_stopping(mocker.MagicMock())
+		assert subscribers == []
+
+
+class TestCreateApp:
+	def test_adds_plugins(self):
+		app = create_app()
+		assert set(app.plugins) == {"relay", "teams"}
+		assert isinstance(get_plugin(app, TeamsPlugin), TeamsPlugin)
+
+	def test_requests_minimal_intents(self):
+		app = create_app()
+		assert app.intents == (
+			hikari.Intents.GUILDS
+			| hikari.Intents.GUILD_MEMBERS
+			| hikari.Intents.GUILD_MESSAGES
+			| hikari.Intents.GUILD_VOICE_STATES
+			| hikari.Intents.DM_MESSAGES
+		)
+		assert not app.intents & hikari.Intents.MESSAGE_CONTENT
+		assert app.cache.settings.components == (
+			hikari.api.CacheComponents.GUILDS | hikari.api.CacheComponents.ME
+		)
+
+	@pytest.mark.asyncio
+	@pytest.mark.parametrize("worker, syncs", [(0, True), (1, False)])
+	async def test_only_first_worker_syncs_commands(
+		self, mocker: MockerFixture, worker: int, syncs: bool
+	):
+		sync = mocker.patch.object(
+			lightbulb.BotApp, "_manage_application_commands", mocker.AsyncMock()
+		)
+		bot = KDI(worker=worker)
+		dispatch = mocker.patch.object(bot, "dispatch", mocker.AsyncMock())
+		await bot._manage_application_commands(mocker.MagicMock())
+		assert sync.called == syncs
+		assert dispatch.called != syncs
+
+	def test_missing_plugin(self, bot: KDI):
+		with pytest.raises(LookupError):
+			get_plugin(bot, RelayPlugin)
 
-		assert kdi._token == "DISCORD_API_TOKEN"
+	def test_imports_without_side_effects(self):
+		result = subprocess.run(
+			[sys.executable, "-c", IMPORT_WITHOUT_SIDE_EFFECTS],
+			capture_output=True,
+			env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+			text=True,
+		)
+		assert result.returncode == 0, result.stderr
@@ -0,0 +1,84 @@
+from pytest_mock import MockerFixture
+import pytest
+
+from kdi.bench.fake_discord import FakeDiscord
+from kdi.launcher import (
+	fetch_gateway_bot_info,
+	get_shard_id,
+	launch,
+	main,
+	plan_shards,
+	ShardPlan,
+)
+
+
+class TestGetShardId:
+	def test_uses_snowflake_timestamp(self):
+		assert get_shard_id(0, 4) == 0
+		assert get_shard_id(5 << 22, 4) == 1
+		assert get_shard_id((5 << 22) | 12345, 4) == 1
+
+
+class TestPlanShards:
+	def test_splits_evenly(self):
+		assert plan_shards(4, 2) == ShardPlan(4, ((0, 1), (2, 3)))
+
+	def test_spreads_remainder(self):
+		assert plan_shards(5, 3).workers == ((0, 1), (2, 3), (4,))
+
+	def test_caps_workers_at_shards(self):
+		assert plan_shards(2, 8).workers == ((0,), (1,))
+
+	def test_rejects_empty(self):
+		with pytest.raises(ValueError):
+			plan_shards(0, 1)
+
+	def test_staggers_workers_by_identify_window(self):
+		plan = plan_shards(6, 3)
+		assert [plan.get_start_delay(w) for w in range(3)] == [0, 12.0, 24.0]
+
+	def test_shares_windows_across_buckets(self):
+		plan = plan_shards(8, 2, max_concurrency=4)
+		assert [plan.get_start_delay(w) for w in range(2)] == [0, 6.0]
+
+	def test_finds_owning_worker(self):
+		plan = plan_shards(4, 2)
+		assert plan.get_worker(1 << 22) == 0
+		assert plan.get_worker(3 << 22) == 1
+
+
+class TestLaunch:
+	def test_runs_single_worker_in_process(self, mocker: MockerFixture):
+		run_worker = mocker.patch("kdi.launcher.run_worker")
+		launch(plan_shards(2, 1))
+		run_worker.assert_called_once_with(0, (0, 1), 2)
+
+	def test_spawns_worker_processes(self, mocker: MockerFixture):
+		context = mocker.patch("kdi.launcher.get_context").return_value
+		context.Process.return_value.exitcode = 0
+		context.Process.return_value.is_alive.return_value = False
+		launch(plan_shards(4, 2))
+		assert [c.kwargs["args"] for c in context.Process.call_args_list] == [
+			(0, (0, 1), 4, 0),
+			(1, (2, 3), 4, 12.0),
+		]
+		assert context.Process.return_value.start.call_count == 2
+
+
+class TestMain:
+	def test_runs_one_process_by_default(self, mocker: MockerFixture):
+		run_worker = mocker.patch("kdi.launcher.run_worker")
+		launch = mocker.patch("kdi.launcher.launch")
+		main()
+		run_worker.assert_called_once_with()
+		launch.assert_not_called()
+
+
+class TestFetchGatewayBotInfo:
+	@pytest.mark.asyncio
+	async def test_reads_gateway_info(self):
+		async with FakeDiscord() as discord:
+			info = await fetch_gateway_bot_info("token", discord.rest_url)
+			assert info.shard_count == 1
+			assert info.session_start_limit.max_concurrency == 1
+			assert discord.requests["GET /api/v10/gateway/bot"] == 1
@@ -1,27 +1,50 @@
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
 from typing import Optional
+import asyncio
+import threading
 
 import hikari
 import lightbulb
+import ongaku
 
 from pytest_mock import MockType, MockerFixture
 import pytest
 
-from kdi.bot import kdi
+from kdi.bot import KDI
 from kdi.relay.relay import (
+	BROADCAST_FAILED_STATUS,
+	BROADCAST_PLAYING_STATUS,
+	BROADCAST_QUEUE_FULL_STATUS,
+	BROADCAST_RESPONSE,
 	CHANNEL_NOT_SET_RESPONSE,
 	is_trusted_user,
+	NOT_CONNECTED_RESPONSE,
+	RELAY_QUEUE_FULL_RESPONSE,
 	relay_group,
 	RelayPlugin,
 	set_channel_command,
 	SET_CHANNEL_SUCCESS_RESPONSE,
+	SPEECH_QUEUE_FULL_RESPONSE,
+	split_sentences,
+	SUCCESSFUL_CONNECT_RESPONSE,
+	SUCCESSFUL_DISCONNECT_RESPONSE,
+	SUCCESSFUL_SPEAK_RESPONSE,
+	TTS_CACHE_LOOKUPS,
+	TTS_RENDER_DURATION,
+	TTSClient,
 	UNTRUSTED_USER_RESPONSE,
 )
+from kdi.relay.tts_cache import TTSCache
+from kdi.store import MemorySessionStore
 
 
 SAMPLE_USER_ID = 123
 
 SAMPLE_CHANNEL_ID = 246
 
+SAMPLE_GUILD_ID = 369
+
 
 @pytest.fixture
 def sample_set_channel_context(mocker: MockerFixture):
@@ -40,6 +63,7 @@ def sample_dm_event(mocker: MockerFixture):
 	event.message = mocker.MagicMock()
 	event.message.respond = mocker.AsyncMock()
 	event.message.content = event.content = "Hi, kdi!"
+	event.message.attachments = []
 	return event
 
 
@@ -53,44 +77,361 @@ def mock_message_creator(mocker: MockerFixture):
 	return mocker.patch("hikari.impl.RESTClientImpl.create_message", mocker.AsyncMock())
 
 
+@pytest.fixture
+def audio_client(mocker: MockerFixture):
+	return mocker.MagicMock(spec=ongaku.Client)
+
+
+@pytest.fixture
+def relay(bot: KDI, audio_client: MockType):
+	plugin = RelayPlugin(audio_client, MemorySessionStore())
+	plugin.app = bot
+	return plugin
+
+
 class TestInit:
-	def test_subscribes_to_dms(self, mocker: MockerFixture):
-		subscriber = mocker.spy(hikari.GatewayBot, "subscribe")
-		relay = RelayPlugin()
-		subscriber.assert_called_once_with(
-			kdi, hikari.DMMessageCreateEvent, relay.on_dm
+	def test_listeners(self, audio_client: MockType):
+		relay = RelayPlugin(audio_client, MemorySessionStore())
+		assert dict(relay.listeners) == {
+			hikari.DMMessageCreateEvent: [relay.on_dm],
+			hikari.StartedEvent: [relay.on_started],
+			hikari.StoppingEvent: [relay.on_stopping],
+			ongaku.ReadyEvent: [relay._voices.on_ready],
+			ongaku.WebsocketClosedEvent: [relay._voices.on_websocket_closed],
+			ongaku.TrackEndEvent: [relay.on_track_end],
+			ongaku.QueueNextEvent: [relay.on_queue_advance],
+			ongaku.QueueEmptyEvent: [relay.on_queue_advance],
+		}
+
+	def test_commands(self, audio_client: MockType):
+		assert RelayPlugin(audio_client, MemorySessionStore())._raw_commands == [
+			relay_group
+		]
+
+
+class TestSplitSentences:
+	def test_splits_on_punctuation(self):
+		assert split_sentences("Hi there. Ready?  Go!", 100) == [
+			"Hi there.",
+			"Ready?",
+			"Go!",
+		]
+
+	def test_wraps_long_sentences(self):
+		assert split_sentences("aaa bbb ccc", 7) == ["aaa bbb", "ccc"]
+
+	def test_ignores_whitespace(self):
+		assert split_sentences("  ", 100) == []
+
+
+class TestTTSClient:
+	def test_starts_lazily(self, audio_client: MockType):
+		tts = TTSClient(audio_client)
+		assert tts._cache is None
+		assert tts._executor is None
+
+	def test_uses_worker_cache_dir(
+		self, audio_client: MockType, mocker: MockerFixture, tmp_path: Path
+	):
+		mocker.patch("kdi.relay.tts_cache.get_cache_dir", return_value=tmp_path)
+		tts = TTSClient(audio_client, 2)
+		cache = mocker.patch("kdi.relay.relay.TTSCache")
+		assert tts.cache is cache.return_value
+		assert cache.call_args.kwargs["directory"] == tmp_path / "tts-2"
+
+	@pytest.mark.asyncio
+	async def test_resolves_voice_once(
+		self, audio_client: MockType, mocker: MockerFixture
+	):
+		tts = TTSClient(audio_client)
+		resolver = mocker.patch.object(
+			tts, "_resolve_voice", mocker.AsyncMock(return_value="voice")
+		)
+		voices = await asyncio.gather(tts.get_voice_id(), tts.get_voice_id())
+		assert voices == ["voice", "voice"]
+		assert await tts.get_voice_id() == "voice"
+		resolver.assert_called_once()
+
+	@pytest.mark.asyncio
+	async def test_builds_cache_off_loop_once(
+		self, audio_client: MockType, mocker: MockerFixture, tmp_path: Path
+	):
+		threads: list[threading.Thread] = []
+
+		def build(**kwargs: object):
+			threads.append(threading.current_thread())
+			return TTSCache(directory=tmp_path)
+
+		cache = mocker.patch("kdi.relay.relay.TTSCache", side_effect=build)
+		tts = TTSClient(audio_client)
+		mocker.patch.object(tts, "get_voice_id", mocker.AsyncMock(return_value="v"))
+		mocker.patch.object(tts, "_run_in_pool", mocker.AsyncMock())
+		await asyncio.gather(tts.warm_up(), tts.cache_key("hello"))
+		cache.assert_called_once()
+		assert threads[0] is not threading.current_thread()
+		assert tts._cache is not None
+
+	@pytest.mark.asyncio
+	async def test_rebuilds_broken_pool(
+		self, audio_client: MockType, mocker: MockerFixture
+	):
+		tts = TTSClient(audio_client)
+		broken = mocker.MagicMock()
+		tts._executor = broken
+		mocker.patch.object(
+			asyncio.get_running_loop(),
+			"run_in_executor",
+			mocker.AsyncMock(side_effect=[BrokenProcessPool, ("voice", [])]),
+		)
+		pool = mocker.patch("kdi.relay.relay.ProcessPoolExecutor")
+		with pytest.raises(BrokenProcessPool):
+			await tts.get_voice_id()
+		broken.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+		assert await tts.get_voice_id() == "voice"
+		assert tts._executor is pool.return_value
+		assert pool.call_args.kwargs["mp_context"].get_start_method() == "spawn"
+
+	def test_shuts_down_pool(self, audio_client: MockType, mocker: MockerFixture):
+		tts = TTSClient(audio_client)
+		executor = tts._executor = mocker.MagicMock()
+		tts.shutdown()
+		executor.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+		assert tts._executor is None
+
+	@pytest.mark.asyncio
+	async def test_retries_failed_voice_resolution(
+		self, audio_client: MockType, mocker: MockerFixture
+	):
+		tts = TTSClient(audio_client)
+		resolver = mocker.patch.object(
+			tts, "_resolve_voice", mocker.AsyncMock(side_effect=[OSError, "voice"])
+		)
+		with pytest.raises(OSError):
+			await tts.get_voice_id()
+		assert await tts.get_voice_id() == "voice"
+		assert resolver.call_count == 2
+
+	@pytest.mark.parametrize("length, expected", [(1, True), (1024, False)])
+	def test_caches_short_messages(
+		self, audio_client: MockType, length: int, expected: bool
+	):
+		assert TTSClient(audio_client).is_cacheable("a" * length) == expected
+
+	def test_releases_ephemeral_files(
+		self, audio_client: MockType, mocker: MockerFixture, tmp_path: Path
+	):
+		tts = TTSClient(audio_client)
+		path = tmp_path / "tts.mp3"
+		path.touch()
+		tts._ephemeral_paths.add(path)
+		track = mocker.MagicMock(spec=ongaku.Track)
+		track.info.uri = path.as_posix()
+		tts.release(track)
+		assert not path.exists()
+		assert path not in tts._ephemeral_paths
+
+	@pytest.mark.asyncio
+	async def test_prefetches_each_sentence(
+		self, audio_client: MockType, mocker: MockerFixture
+	):
+		tts = TTSClient(audio_client)
+		mocker.patch.object(
+			tts, "create_track", mocker.AsyncMock(side_effect=lambda m, _: m)
+		)
+		tasks = tts.prefetch("First. Second. Third.")
+		assert await asyncio.gather(*tasks) == ["First.", "Second.", "Third."]
+
+	@pytest.mark.asyncio
+	async def test_prefetches_long_messages_as_ephemeral(
+		self, audio_client: MockType, mocker: MockerFixture
+	):
+		tts = TTSClient(audio_client)
+		create_track = mocker.patch.object(tts, "create_track", mocker.AsyncMock())
+		await asyncio.gather(*tts.prefetch("Sentence. " * 50))
+		assert create_track.call_count > 1
+		assert all(not call.args[1] for call in create_track.call_args_list)
+
+	@pytest.mark.asyncio
+	async def test_renders_ephemeral_files_outside_cache(
+		self, audio_client: MockType, mocker: MockerFixture, tmp_path: Path
+	):
+		tts = TTSClient(audio_client)
+		tts._cache = TTSCache(directory=tmp_path)
+		tts._executor = mocker.MagicMock()
+		mocker.patch.object(tts, "get_voice_id", mocker.AsyncMock(return_value="v"))
+		loop = asyncio.get_running_loop()
+		mocker.patch.object(
+			loop,
+			"run_in_executor",
+			mocker.AsyncMock(side_effect=lambda *args: Path(args[3]).touch()),
+		)
+		path = await tts.render("hello", False)
+		assert Path(path) in tts._ephemeral_paths
+		assert tts.cache.get(await tts.cache_key("hello")) is None
+
+	@pytest.mark.asyncio
+	async def test_discards_render_finished_after_cancel(
+		self, audio_client: MockType, mocker: MockerFixture, tmp_path: Path
+	):
+		tts = TTSClient(audio_client)
+		tts._cache = TTSCache(directory=tmp_path)
+		tts._executor = mocker.MagicMock()
+		mocker.patch.object(tts, "get_voice_id", mocker.AsyncMock(return_value="v"))
+		finished = asyncio.Event()
+		paths: list[Path] = []
+
+		async def synthesize(*args: str):
+			paths.append(Path(args[3]))
+			await finished.wait()
+			paths[0].touch()
+
+		mocker.patch.object(
+			asyncio.get_running_loop(), "run_in_executor", side_effect=synthesize
+		)
+		render = asyncio.create_task(tts.render("hello", False))
+		for _ in range(5):
+			await asyncio.sleep(0)
+		render.cancel()
+		await asyncio.sleep(0)
+		finished.set()
+		for _ in range(5):
+			await asyncio.sleep(0)
+		assert paths and not paths[0].exists()
+
+	@pytest.mark.asyncio
+	async def test_discards_unloadable_ephemeral_files(
+		self, audio_client: MockType, mocker: MockerFixture, tmp_path: Path
+	):
+		tts = TTSClient(audio_client)
+		path = tmp_path / "tts.mp3"
+		path.touch()
+		mocker.patch.object(tts, "cache_key", mocker.AsyncMock(return_value="k"))
+		mocker.patch.object(tts, "render", mocker.AsyncMock(return_value=str(path)))
+		tts._ephemeral_paths.add(path)
+		audio_client.rest.load_track = mocker.AsyncMock(return_value=None)
+		with pytest.raises(FileNotFoundError):
+			await tts.create_track("hello", False)
+		assert not path.exists()
+
+	@pytest.mark.asyncio
+	async def test_records_render_metrics(
+		self, audio_client: MockType, mocker: MockerFixture, tmp_path: Path
+	):
+		tts = TTSClient(audio_client)
+		tts._cache = TTSCache(directory=tmp_path)
+		tts._executor = mocker.MagicMock()
+		mocker.patch.object(tts, "get_voice_id", mocker.AsyncMock(return_value="v"))
+		loop = asyncio.get_running_loop()
+		mocker.patch.object(
+			loop,
+			"run_in_executor",
+			mocker.AsyncMock(side_effect=lambda *args: Path(args[3]).touch()),
 		)
+		misses = TTS_CACHE_LOOKUPS.value(cache="file", result="miss")
+		hits = TTS_CACHE_LOOKUPS.value(cache="file", result="hit")
+		renders = TTS_RENDER_DURATION.count()
+		await tts.render("hello")
+		await tts.render("hello")
+		assert TTS_CACHE_LOOKUPS.value(cache="file", result="miss") == misses + 1
+		assert TTS_CACHE_LOOKUPS.value(cache="file", result="hit") == hits + 1
+		assert TTS_RENDER_DURATION.count() == renders + 1
+
+	def test_keeps_cached_files(
+		self, audio_client: MockType, mocker: MockerFixture, tmp_path: Path
+	):
+		path = tmp_path / "tts.mp3"
+		path.touch()
+		track = mocker.MagicMock(spec=ongaku.Track)
+		track.info.uri = path.as_posix()
+		TTSClient(audio_client).release(track)
+		assert path.exists()
 
 
 class TestSendMessage:
+	@pytest.fixture(autouse=True)
+	def no_coalesce_window(self, mocker: MockerFixture):
+		mocker.patch("kdi.relay.relay_queue.RelayQueue._COALESCE_WINDOW_SECS", 0)
+
 	@pytest.mark.asyncio
 	async def test_sends_message(
-		self, mock_message_creator: MockType, sample_dm_event: MockType
+		self,
+		relay: RelayPlugin,
+		mock_message_creator: MockType,
+		sample_dm_event: MockType,
+	):
+		await relay.set_user_channels(sample_dm_event.author_id, {SAMPLE_CHANNEL_ID})
+		await relay.send_message(sample_dm_event)
+		await relay._relay_queues[SAMPLE_CHANNEL_ID].join()
+		mock_message_creator.assert_called_once_with(
+			SAMPLE_CHANNEL_ID, sample_dm_event.content, attachments=hikari.UNDEFINED
+		)
+
+	@pytest.mark.asyncio
+	async def test_relays_attachments(
+		self,
+		relay: RelayPlugin,
+		mocker: MockerFixture,
+		mock_message_creator: MockType,
+		sample_dm_event: MockType,
 	):
-		relay = RelayPlugin()
-		relay._user_channel[sample_dm_event.author_id] = SAMPLE_CHANNEL_ID
+		attachment = mocker.MagicMock(spec=hikari.Attachment)
+		sample_dm_event.content = None
+		sample_dm_event.message.attachments = [attachment]
+		await relay.set_user_channels(sample_dm_event.author_id, {SAMPLE_CHANNEL_ID})
 		await relay.send_message(sample_dm_event)
+		await relay._relay_queues[SAMPLE_CHANNEL_ID].join()
 		mock_message_creator.assert_called_once_with(
-			SAMPLE_CHANNEL_ID, sample_dm_event.content
+			SAMPLE_CHANNEL_ID, hikari.UNDEFINED, attachments=[attachment]
+		)
+		attachment.read.assert_not_called()
+
+	@pytest.mark.asyncio
+	async def test_fans_out(
+		self,
+		relay: RelayPlugin,
+		mock_message_creator: MockType,
+		sample_dm_event: MockType,
+	):
+		channel_ids = {SAMPLE_CHANNEL_ID, SAMPLE_CHANNEL_ID + 1}
+		await relay.set_user_channels(sample_dm_event.author_id, channel_ids)
+		await relay.send_message(sample_dm_event)
+		for c in channel_ids:
+			await relay._relay_queues[c].join()
+		assert {c.args[0] for c in mock_message_creator.call_args_list} == channel_ids
+
+	@pytest.mark.asyncio
+	async def test_rejects_when_saturated(
+		self,
+		relay: RelayPlugin,
+		mocker: MockerFixture,
+		mock_message_creator: MockType,
+		sample_dm_event: MockType,
+	):
+		mocker.patch("kdi.relay.relay_queue.RelayQueue.put", return_value=False)
+		await relay.set_user_channels(sample_dm_event.author_id, {SAMPLE_CHANNEL_ID})
+		await relay.send_message(sample_dm_event)
+		sample_dm_event.message.respond.assert_called_once_with(
+			RELAY_QUEUE_FULL_RESPONSE, flags=hikari.MessageFlag.EPHEMERAL
 		)
 
 	@pytest.mark.asyncio
 	@pytest.mark.parametrize("content", [None, "", "/test"])
 	async def test_rejects_irrelevant(
 		self,
+		relay: RelayPlugin,
 		mock_message_creator: MockType,
 		sample_dm_event: MockType,
 		content: Optional[str],
 	):
 		sample_dm_event.content = content
-		relay = RelayPlugin()
 		await relay.send_message(sample_dm_event)
 		mock_message_creator.assert_not_called()
 		sample_dm_event.message.respond.assert_not_called()
 
 	@pytest.mark.asyncio
-	async def test_rejects_unset_channel(self, sample_dm_event: MockType):
-		relay = RelayPlugin()
+	async def test_rejects_unset_channel(
+		self, relay: RelayPlugin, sample_dm_event: MockType
+	):
 		await relay.send_message(sample_dm_event)
 		sample_dm_event.message.respond.assert_called_once_with(
 			CHANNEL_NOT_SET_RESPONSE, flags=hikari.MessageFlag.EPHEMERAL
@@ -99,41 +440,76 @@ class TestSendMessage:
 
 class TestSetChannel:
 	@pytest.mark.asyncio
-	async def test_stores_user_channel(self, sample_set_channel_context: MockType):
-		relay = RelayPlugin()
+	async def test_stores_user_channel(
+		self, relay: RelayPlugin, sample_set_channel_context: MockType
+	):
 		await relay.set_channel(sample_set_channel_context)
-		assert (
-			relay._user_channel[sample_set_channel_context.user.id]
-			== sample_set_channel_context.options["channel"].id
-		)
+		assert await relay.get_user_channels(sample_set_channel_context.user.id) == {
+			sample_set_channel_context.options["channel"].id
+		}
 		sample_set_channel_context.respond.assert_called_once_with(
 			SET_CHANNEL_SUCCESS_RESPONSE, flags=hikari.MessageFlag.EPHEMERAL
 		)
 
+	@pytest.mark.asyncio
+	async def test_stores_multiple_channels(
+		self,
+		relay: RelayPlugin,
+		mocker: MockerFixture,
+		sample_set_channel_context: MockType,
+	):
+		second = mocker.MagicMock(spec=hikari.TextableGuildChannel)
+		second.id = SAMPLE_CHANNEL_ID + 1
+		sample_set_channel_context.options["channel-2"] = second
+		sample_set_channel_context.options["channel-3"] = None
+		await relay.set_channel(sample_set_channel_context)
+		assert await relay.get_user_channels(sample_set_channel_context.user.id) == {
+			SAMPLE_CHANNEL_ID,
+			SAMPLE_CHANNEL_ID + 1,
+		}
+
+	@pytest.mark.asyncio
+	async def test_shares_channels_through_sessions(
+		self, audio_client: MockType, sample_set_channel_context: MockType
+	):
+		sessions = MemorySessionStore()
+		await RelayPlugin(audio_client, sessions).set_channel(
+			sample_set_channel_context
+		)
+		other_worker = RelayPlugin(audio_client, sessions)
+		assert await other_worker.get_user_channels(
+			sample_set_channel_context.user.id
+		) == {SAMPLE_CHANNEL_ID}
+
 
 class TestOnDM:
 	@pytest.mark.asyncio
 	async def test_passes_message(
-		self, sample_dm_event: MockType, mock_message_sender: MockType
+		self,
+		relay: RelayPlugin,
+		sample_dm_event: MockType,
+		mock_message_sender: MockType,
 	):
-		relay = RelayPlugin()
 		await relay.on_dm(sample_dm_event)
 		mock_message_sender.assert_called_once_with(sample_dm_event)
 
 	@pytest.mark.asyncio
 	async def test_rejects_bot(
-		self, sample_dm_event: MockType, mock_message_sender: MockType
+		self,
+		relay: RelayPlugin,
+		sample_dm_event: MockType,
+		mock_message_sender: MockType,
 	):
 		sample_dm_event.is_human = False
-		relay = RelayPlugin()
 		await relay.on_dm(sample_dm_event)
 		mock_message_sender.assert_not_called()
 		sample_dm_event.message.respond.assert_not_called()
 
 	@pytest.mark.asyncio
-	async def test_rejects_untrusted(self, sample_dm_event: MockType):
+	async def test_rejects_untrusted(
+		self, relay: RelayPlugin, sample_dm_event: MockType
+	):
 		sample_dm_event.author_id = 111
-		relay = RelayPlugin()
 		await relay.on_dm(sample_dm_event)
 		sample_dm_event.message.respond.assert_called_once_with(
 			UNTRUSTED_USER_RESPONSE, flags=hikari.MessageFlag.EPHEMERAL
@@ -141,13 +517,12 @@ class TestOnDM:
 
 	@pytest.mark.asyncio
 	async def rejects_slash_message(
-		self, mocker: MockerFixture, sample_dm_event: MockType
+		self, relay: RelayPlugin, mocker: MockerFixture, sample_dm_event: MockType
 	):
 		sample_dm_event.content = "/test"
 		message_creator = mocker.patch(
 			"hikari.impl.RESTClientImpl.create_message", mocker.AsyncMock()
 		)
-		relay = RelayPlugin()
 		await relay.on_dm(sample_dm_event)
 		message_creator.assert_not_called()
 
@@ -163,3 +538,290 @@ class TestCommandGroup:
 class TestSetChannelCommand:
 	def test_inherits_checks(self):
 		assert set_channel_command.inherit_checks
+
+
+class TestJoin:
+	@pytest.fixture
+	def join_context(self, mocker: MockerFixture):
+		ctx = mocker.MagicMock(spec=lightbulb.SlashContext)
+		ctx.guild_id = SAMPLE_GUILD_ID
+		ctx.options = {
+			"channel": hikari.InteractionChannel(
+				app=mocker.MagicMock(),
+				id=hikari.Snowflake(SAMPLE_CHANNEL_ID),
+				name="voice",
+				type=hikari.ChannelType.GUILD_VOICE,
+				permissions=hikari.Permissions.NONE,
+			)
+		}
+		ctx.respond = mocker.AsyncMock()
+		return ctx
+
+	@pytest.mark.asyncio
+	async def test_connects_to_option_channel(
+		self,
+		relay: RelayPlugin,
+		mocker: MockerFixture,
+		audio_client: MockType,
+		join_context: MockType,
+	):
+		player = audio_client.create_player.return_value
+		player.connect = mocker.AsyncMock()
+		await relay.join(join_context)
+		audio_client.create_player.assert_called_once_with(SAMPLE_GUILD_ID)
+		player.connect.assert_called_once_with(SAMPLE_CHANNEL_ID, deaf=False)
+		join_context.respond.assert_called_once_with(
+			SUCCESSFUL_CONNECT_RESPONSE("voice"), flags=hikari.MessageFlag.EPHEMERAL
+		)
+
+
+class TestLeave:
+	@pytest.fixture
+	def leave_context(self, mocker: MockerFixture):
+		ctx = mocker.MagicMock(spec=lightbulb.SlashContext)
+		ctx.guild_id = SAMPLE_GUILD_ID
+		ctx.respond = mocker.AsyncMock()
+		return ctx
+
+	@pytest.fixture
+	def player(self, mocker: MockerFixture, relay: RelayPlugin, audio_client: MockType):
+		player = audio_client.create_player.return_value
+		player.connect = mocker.AsyncMock()
+		player.disconnect = mocker.AsyncMock()
+		player.guild_id = SAMPLE_GUILD_ID
+		player.queue = []
+		audio_client.delete_player = mocker.AsyncMock()
+		return player
+
+	@pytest.mark.asyncio
+	@pytest.mark.parametrize(
+		"connected, response",
+		[(True, SUCCESSFUL_DISCONNECT_RESPONSE), (False, NOT_CONNECTED_RESPONSE)],
+	)
+	async def test_unregisters_player(
+		self,
+		relay: RelayPlugin,
+		mocker: MockerFixture,
+		leave_context: MockType,
+		player: MockType,
+		connected: bool,
+		response: str,
+	):
+		await relay._voices.connect(SAMPLE_GUILD_ID, mocker.MagicMock())
+		queue = relay._get_speech_queue(player)
+		clear = mocker.patch.object(queue, "clear")
+		player.connected = connected
+		await relay.leave(leave_context)
+		assert SAMPLE_GUILD_ID not in relay._voices
+		assert SAMPLE_GUILD_ID not in relay._speech_queues
+		clear.assert_called_once()
+		leave_context.respond.assert_called_once_with(
+			response, flags=hikari.MessageFlag.EPHEMERAL
+		)
+
+	@pytest.mark.asyncio
+	async def test_rejects_unknown_guild(
+		self, relay: RelayPlugin, leave_context: MockType
+	):
+		await relay.leave(leave_context)
+		leave_context.respond.assert_called_once_with(
+			NOT_CONNECTED_RESPONSE, flags=hikari.MessageFlag.EPHEMERAL
+		)
+
+
+class TestSpeak:
+	@pytest.fixture
+	def speak_context(self, mocker: MockerFixture):
+		ctx = mocker.MagicMock(spec=lightbulb.SlashContext)
+		ctx.guild_id = SAMPLE_GUILD_ID
+		ctx.options = {"message": "One. Two."}
+		ctx.respond = mocker.AsyncMock()
+		return ctx
+
+	@pytest.fixture
+	def player(self, mocker: MockerFixture):
+		player = mocker.MagicMock(spec=ongaku.Player)
+		player.connected = True
+		player.guild_id = SAMPLE_GUILD_ID
+		mocker.patch(
+			"kdi.relay.voice_sessions.VoiceSessionManager.get", return_value=player
+		)
+		return player
+
+	@pytest.mark.asyncio
+	async def test_queues_message(
+		self,
+		relay: RelayPlugin,
+		mocker: MockerFixture,
+		speak_context: MockType,
+		player: MockType,
+	):
+		putter = mocker.patch(
+			"kdi.relay.speech_queue.SpeechQueue.put", return_value=True
+		)
+		await relay.speak(speak_context)
+		putter.assert_called_once_with(speak_context.options["message"])
+		speak_context.respond.assert_called_once_with(
+			SUCCESSFUL_SPEAK_RESPONSE, flags=hikari.MessageFlag.EPHEMERAL
+		)
+
+	@pytest.mark.asyncio
+	async def test_rejects_when_full(
+		self,
+		relay: RelayPlugin,
+		mocker: MockerFixture,
+		speak_context: MockType,
+		player: MockType,
+	):
+		mocker.patch("kdi.relay.speech_queue.SpeechQueue.put", return_value=False)
+		await relay.speak(speak_context)
+		speak_context.respond.assert_called_once_with(
+			SPEECH_QUEUE_FULL_RESPONSE, flags=hikari.MessageFlag.EPHEMERAL
+		)
+
+	@pytest.mark.asyncio
+	async def test_rejects_when_disconnected(
+		self, relay: RelayPlugin, mocker: MockerFixture, speak_context: MockType
+	):
+		mocker.patch(
+			"kdi.relay.voice_sessions.VoiceSessionManager.get", return_value=None
+		)
+		await relay.speak(speak_context)
+		speak_context.respond.assert_called_once_with(
+			NOT_CONNECTED_RESPONSE, flags=hikari.MessageFlag.EPHEMERAL
+		)
+
+	@pytest.mark.asyncio
+	async def test_reuses_guild_queue(
+		self,
+		relay: RelayPlugin,
+		mocker: MockerFixture,
+		speak_context: MockType,
+		player: MockType,
+	):
+		mocker.patch("kdi.relay.speech_queue.SpeechQueue.put", return_value=True)
+		await relay.speak(speak_context)
+		queue = relay._speech_queues[player.guild_id]
+		await relay.speak(speak_context)
+		assert relay._speech_queues[player.guild_id] is queue
+
+
+class TestBroadcast:
+	@pytest.fixture
+	def broadcast_context(self, mocker: MockerFixture):
+		ctx = mocker.MagicMock(spec=lightbulb.SlashContext)
+		ctx.options = {"message": "Hello."}
+		ctx.respond = mocker.AsyncMock()
+		return ctx
+
+	@pytest.fixture
+	def players(self, mocker: MockerFixture):
+		players: list[MockType] = []
+		for guild_id in [1, 2, 3]:
+			player = mocker.MagicMock(spec=ongaku.Player)
+			player.connected = True
+			player.guild_id = guild_id
+			player.queue = []
+			player.play = mocker.AsyncMock(side_effect=player.queue.append)
+			players.append(player)
+		mocker.patch(
+			"kdi.relay.voice_sessions.VoiceSessionManager.connected_players",
+			return_value=players,
+		)
+		mocker.patch("kdi.relay.relay.RelayPlugin._get_guild_name", side_effect=str)
+		return players
+
+	@pytest.mark.asyncio
+	async def test_renders_once(
+		self,
+		relay: RelayPlugin,
+		mocker: MockerFixture,
+		broadcast_context: MockType,
+		players: MockType,
+	):
+		creator = mocker.patch.object(
+			relay._tts, "create_track", mocker.AsyncMock(side_effect=lambda m, _: m)
+		)
+		await relay.broadcast(broadcast_context)
+		creator.assert_called_once_with("Hello.", True)
+		for p in players:
+			p.play.assert_called_once_with("Hello.")
+
+	@pytest.mark.asyncio
+	async def test_reports_each_guild(
+		self,
+		relay: RelayPlugin,
+		mocker: MockerFixture,
+		broadcast_context: MockType,
+		players: MockType,
+	):
+		error = ongaku.PlayerConnectError("")
+		players[1].play.side_effect = error
+		mocker.patch.object(
+			relay._tts, "create_track", mocker.AsyncMock(side_effect=lambda m, _: m)
+		)
+		mocker.patch.object(
+			relay._get_speech_queue(players[2]), "put", return_value=None
+		)
+		await relay.broadcast(broadcast_context)
+		broadcast_context.respond.assert_called_with(
+			BROADCAST_RESPONSE(
+				[
+					("1", BROADCAST_PLAYING_STATUS),
+					("2", BROADCAST_FAILED_STATUS(error)),
+					("3", BROADCAST_QUEUE_FULL_STATUS),
+				]
+			),
+			flags=hikari.MessageFlag.EPHEMERAL,
+		)
+
+	@pytest.mark.asyncio
+	async def test_keeps_long_audio_for_queued_guilds(
+		self,
+		relay: RelayPlugin,
+		mocker: MockerFixture,
+		audio_client: MockType,
+		broadcast_context: MockType,
+		players: MockType,
+		tmp_path: Path,
+	):
+		def load_track(path: str):
+			track = mocker.MagicMock(spec=ongaku.Track)
+			track.info.uri = path
+			return track
+
+		tts = relay._tts
+		tts._cache = TTSCache(directory=tmp_path)
+		tts._executor = mocker.MagicMock()
+		mocker.patch.object(tts, "get_voice_id", mocker.AsyncMock(return_value="v"))
+		mocker.patch.object(
+			asyncio.get_running_loop(),
+			"run_in_executor",
+			mocker.AsyncMock(side_effect=lambda *args: Path(args[3]).touch()),
+		)
+		audio_client.rest.load_track = mocker.AsyncMock(side_effect=load_track)
+		mocker.patch("kdi.relay.relay.BROADCAST_START_TIMEOUT_SECS", 0.01)
+		players[1].queue.extend(["earlier", "speech"])
+		broadcast_context.options["message"] = "Long sentence here. " * 20
+		await relay.broadcast(broadcast_context)
+		played = players[0].queue
+		assert played
+		for track in played:
+			event = mocker.MagicMock(spec=ongaku.TrackEndEvent)
+			event.guild_id = players[0].guild_id
+			event.track = track
+			await relay.on_track_end(event)
+		assert all(Path(t.info.uri).exists() for t in played)
+
+	@pytest.mark.asyncio
+	async def test_rejects_without_players(
+		self, relay: RelayPlugin, mocker: MockerFixture, broadcast_context: MockType
+	):
+		mocker.patch(
+			"kdi.relay.voice_sessions.VoiceSessionManager.connected_players",
+			return_value=[],
+		)
+		await relay.broadcast(broadcast_context)
+		broadcast_context.respond.assert_called_once_with(
+			NOT_CONNECTED_RESPONSE, flags=hikari.MessageFlag.EPHEMERAL
+		)
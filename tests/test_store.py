@@ -1,6 +1,9 @@
+from pytest_mock import MockType, MockerFixture
 import pytest
+import random
 
 from kdi.store import User, UserStore
+from kdi.store.user_data import UserStoreStats
 
 
 @pytest.fixture
@@ -48,22 +51,203 @@ class TestUsers:
 			assert user_store.get(uid) is None
 			assert user_store.get(name) is None
 
-	def test_store_ignores_duplicate_id(
-		self, user_store: UserStore, uid: int, name: str
-	):
+	def test_store_renames_user(self, user_store: UserStore, uid: int, name: str):
 		user_store.store(uid, name)
 		other_name = "enemy"
 		user_store.store(uid, other_name)
-		assert user_store.get(other_name) is None
+		assert user_store.get(other_name) == User(uid, other_name)
+		assert user_store.get(name) is None
+		assert len(user_store) == 1
 
-	def test_store_ignores_duplicate_name(
-		self, user_store: UserStore, uid: int, name: str
-	):
+	def test_store_reassigns_name(self, user_store: UserStore, uid: int, name: str):
 		user_store.store(uid, name)
 		other_id = 2
 		user_store.store(other_id, name)
-		assert user_store.get(other_id) is None
+		assert user_store.get(name) == User(other_id, name)
+		assert user_store.get(uid) is None
+		assert len(user_store) == 1
 
 	@pytest.mark.parametrize("key", [uid, name])
 	def test_get_nonexistent_user(self, user_store: UserStore, key: int | str):
 		assert user_store.get(key) is None
+
+
+class TestSearch:
+	@pytest.fixture
+	def populated_store(self, user_store: UserStore):
+		user_store.store(1, "alice", "Wonder")
+		user_store.store(2, "alfred", "Alfie")
+		user_store.store(3, "bob", "Alpha")
+		user_store.store(4, "carol")
+		return user_store
+
+	def test_matches_usernames_and_display_names(self, populated_store: UserStore):
+		assert [u.id for u in populated_store.search("al")] == [2, 1, 3]
+
+	def test_ignores_case(self, populated_store: UserStore):
+		assert [u.id for u in populated_store.search("WON")] == [1]
+
+	def test_deduplicates_aliases(self, populated_store: UserStore):
+		assert [u.id for u in populated_store.search("alf")] == [2]
+
+	def test_empty_prefix_lists_everyone(self, populated_store: UserStore):
+		assert len(populated_store.search("")) == 4
+
+	def test_respects_limit(self, populated_store: UserStore):
+		assert len(populated_store.search("", limit=2)) == 2
+
+	def test_no_matches(self, populated_store: UserStore):
+		assert populated_store.search("zed") == []
+
+	def test_clear_resets_index(self, populated_store: UserStore):
+		populated_store.clear()
+		assert populated_store.search("") == []
+
+
+class TestResolve:
+	@pytest.fixture
+	def populated_store(self, user_store: UserStore):
+		user_store.store(1, "alice", "Wonder")
+		user_store.store(2, "bob", "Alice")
+		return user_store
+
+	def test_prefers_username(self, populated_store: UserStore):
+		assert populated_store.resolve("alice") == User(1, "alice", "Wonder")
+
+	def test_matches_display_name(self, populated_store: UserStore):
+		assert populated_store.resolve("WONDER") == User(1, "alice", "Wonder")
+
+	def test_requires_whole_alias(self, populated_store: UserStore):
+		assert populated_store.resolve("won") is None
+
+
+class TestStoreMany:
+	def test_adds_records(self, user_store: UserStore):
+		n_added = user_store.store_many([(1, "alice", "Alice"), (2, "bob", None)])
+		assert n_added == 2
+		assert user_store.get("bob") == User(2, "bob")
+		assert [u.id for u in user_store.search("a")] == [1]
+
+	def test_counts_only_new_users(self, user_store: UserStore):
+		user_store.store(1, "alice")
+		assert user_store.store_many([(1, "alice", None), (2, "bob", None)]) == 1
+		assert len(user_store) == 2
+
+	def test_applies_renames(self, user_store: UserStore):
+		user_store.store(1, "alice")
+		user_store.store_many([(1, "alicia", None), (2, "alice", None)])
+		assert [(u.id, u.name) for u in user_store.search("ali")] == [
+			(2, "alice"),
+			(1, "alicia"),
+		]
+
+	def test_keeps_index_sorted(self, user_store: UserStore):
+		user_store.store(2, "bob")
+		user_store.store_many([(3, "carol", None), (1, "al", None)])
+		assert [u.name for u in user_store.search("")] == ["al", "bob", "carol"]
+
+	def test_merges_chunks_into_index(self, user_store: UserStore):
+		names = [f"user{i}" for i in random.sample(range(500), 500)]
+		for start in range(0, len(names), 100):
+			user_store.store_many(
+				(i, n, n.upper())
+				for i, n in enumerate(names[start : start + 100], start)
+			)
+		user_store.store_many([(0, "renamed", None)])
+		expected = sorted(names[1:] + ["renamed"])
+		assert [u.name for u in user_store.search("", limit=500)] == expected
+
+	def test_does_not_resort_index(self, user_store: UserStore, mocker: MockerFixture):
+		user_store.store_many((i, f"user{i:03}", None) for i in range(100))
+		alias_key = mocker.spy(user_store, "_alias_key")
+		user_store.store_many([(100, "user050a", None)])
+		assert alias_key.call_count < 20
+
+
+class TestCompactLayout:
+	def test_uses_fixed_width_rows(self, user_store: UserStore):
+		user_store.store_many((i, f"user{i}", None) for i in range(1000))
+		assert user_store.nbytes < 1000 * 96
+
+	def test_returns_equal_views(self, user_store: UserStore, uid: int, name: str):
+		user_store.store(uid, name, "Friend")
+		assert user_store.get(uid) == user_store.get(name) == User(uid, name, "Friend")
+
+
+class TestRenames:
+	def test_updates_search_index(self, user_store: UserStore):
+		user_store.store(1, "alice", "Wonder")
+		user_store.store(1, "alice", "Mallory")
+		assert user_store.search("won") == []
+		assert user_store.search("mal") == [User(1, "alice", "Mallory")]
+
+	def test_reuses_string_storage(self, user_store: UserStore):
+		user_store.store(1, "alice")
+		for i in range(10_000):
+			user_store.store(1, f"alice{i % 2}")
+		assert user_store.nbytes < 1024
+
+
+class TestBoundedStore:
+	@pytest.fixture
+	def clock(self, mocker: MockerFixture):
+		return mocker.patch("kdi.store.user_data.monotonic", return_value=0.0)
+
+	def test_evicts_least_recently_used(self):
+		user_store = UserStore(max_users=2)
+		user_store.store(1, "alice")
+		user_store.store(2, "bob")
+		user_store.get(1)
+		user_store.store(3, "carol")
+		assert user_store.get("bob") is None
+		assert user_store.get("alice") is not None
+		assert user_store.get("carol") is not None
+		assert len(user_store) == 2
+		assert [u.name for u in user_store.search("")] == ["alice", "carol"]
+
+	def test_expires_stale_users(self, clock: MockType):
+		user_store = UserStore(ttl_secs=10)
+		user_store.store(1, "alice")
+		clock.return_value = 5.0
+		user_store.store(2, "bob")
+		clock.return_value = 10.0
+		assert user_store.search("") == [User(2, "bob")]
+		assert user_store.get(1) is None
+		assert user_store.get(2) is not None
+
+	def test_refreshes_on_store(self, clock: MockType):
+		user_store = UserStore(ttl_secs=10)
+		user_store.store(1, "alice")
+		clock.return_value = 8.0
+		user_store.store(1, "alice")
+		clock.return_value = 12.0
+		assert user_store.get(1) is not None
+
+	def test_memory_stays_flat(self):
+		user_store = UserStore(max_users=100)
+		user_store.store_many((i, f"user{i}", None) for i in range(100))
+		nbytes = user_store.nbytes
+		for i in range(100, 5_000):
+			user_store.store(i, f"user{i}", f"Player {i}")
+		assert len(user_store) == 100
+		assert user_store.nbytes < nbytes * 4
+
+	def test_counts_hits_misses_and_evictions(self):
+		user_store = UserStore(max_users=1)
+		user_store.store(1, "alice")
+		user_store.get(1)
+		user_store.store(2, "bob")
+		user_store.get(1)
+		assert user_store.stats == UserStoreStats(hits=1, misses=1, evictions=1)
+
+	def test_matches_reference_model(self):
+		rng = random.Random(1)
+		user_store = UserStore(max_users=20)
+		for _ in range(2_000):
+			uid = rng.randrange(40)
+			user_store.store(uid, f"name{rng.randrange(40)}", f"Nick{uid}")
+		live = user_store.search("", limit=100)
+		assert len(live) == len(user_store) <= 20
+		for user in live:
+			assert user_store.get(user.id) == user_store.get(user.name) == user
+		assert len({u.name for u in live}) == len(live)
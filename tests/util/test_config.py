@@ -1,39 +1,183 @@
-from pytest_mock import MockerFixture
+from pathlib import Path
+from pytest_mock import MockType, MockerFixture
+import os
 import pytest
 
-from kdi.util import get_config_value
+from kdi.util import (
+	ConfigError,
+	ConfigWatcher,
+	get_config,
+	subscribe_config,
+	unsubscribe_config,
+)
+from kdi.util.config import parse_config, reload_config
 
 
-class TestConfig:
+SAMPLE_CONFIG = {
+	"bot": {"token": "abc"},
+	"relay": {"audio_password": "secret"},
+	"teams": {
+		"core_name_components": [["Core of"], ["Air", "Fire"]],
+		"team_name_components": [["Red"], ["Bears"]],
+		"player_emojis": [":zany_face:"],
+		"blocks": [["north", "south"]],
+	},
+}
+
+
+def with_table(table_key: str, **values: object):
+	return {**SAMPLE_CONFIG, table_key: {**SAMPLE_CONFIG.get(table_key, {}), **values}}
+
+
+class TestParseConfig:
+	def test_applies_defaults(self):
+		config = parse_config(SAMPLE_CONFIG)
+		assert config.bot.color == "#48F8AC"
+		assert config.user.trusted_ids == frozenset()
+		assert config.relay.speech_queue_depth == 8
+
+	def test_converts_collections(self):
+		config = parse_config(with_table("user", trusted_ids=[1, 2, 2]))
+		assert config.user.trusted_ids == frozenset({1, 2})
+		assert config.teams.blocks == (("north", "south"),)
+		assert config.teams.core_name_components == (("Core of",), ("Air", "Fire"))
+
+	def test_widens_ints_to_floats(self):
+		config = parse_config(with_table("relay", voice_idle_timeout_secs=60))
+		assert config.relay.voice_idle_timeout_secs == 60.0
+
+	def test_is_immutable(self):
+		config = parse_config(SAMPLE_CONFIG)
+		with pytest.raises(AttributeError):
+			setattr(config.bot, "token", "xyz")
+
+	@pytest.mark.parametrize(
+		"data",
+		[
+			{**SAMPLE_CONFIG, "bot": {}},
+			with_table("relay", speech_queue_depth="8"),
+			with_table("relay", speech_queue_depth=True),
+			with_table("user", trusted_ids=123),
+			with_table("teams", blocks=[["north", "south", "east"]]),
+			{**SAMPLE_CONFIG, "user": []},
+		],
+	)
+	def test_rejects_invalid_values(self, data: dict):
+		with pytest.raises(ConfigError):
+			parse_config(data)
+
+
+class TestConfigSnapshot:
 	@pytest.fixture(autouse=True)
-	def clear_config_file_data(self, mocker: MockerFixture):
+	def sample_config_file(self, mocker: MockerFixture):
+		mocker.patch("kdi.util.config.config_file_data", None)
+		mocker.patch("kdi.util.config.config_snapshot", None)
+		mocker.patch("kdi.util.config.config_subscribers", [])
+		return mocker.patch(
+			"kdi.util.config.read_config_file", return_value=SAMPLE_CONFIG
+		)
+
+	def test_caches_snapshot(self, sample_config_file: MockType):
+		assert get_config() is get_config()
+		sample_config_file.assert_called_once()
+
+	def test_reload_notifies_subscribers(
+		self, mocker: MockerFixture, sample_config_file: MockType
+	):
+		subscriber = mocker.MagicMock()
+		subscribe_config(subscriber)
+		get_config()
+		sample_config_file.return_value = with_table("user", trusted_ids=[1])
+		assert reload_config()
+		subscriber.assert_called_once_with(get_config())
+		assert get_config().user.trusted_ids == {1}
+
+	def test_reload_skips_unchanged_config(
+		self, mocker: MockerFixture, sample_config_file: MockType
+	):
+		subscriber = mocker.MagicMock()
+		subscribe_config(subscriber)
+		get_config()
+		assert not reload_config()
+		unsubscribe_config(subscriber)
+		sample_config_file.return_value = with_table("user", trusted_ids=[1])
+		reload_config()
+		subscriber.assert_not_called()
+
+	def test_subscribe_returns_unsubscriber(
+		self, mocker: MockerFixture, sample_config_file: MockType
+	):
+		subscriber = mocker.MagicMock()
+		unsubscribe = subscribe_config(subscriber)
+		unsubscribe()
+		unsubscribe()
+		get_config()
+		sample_config_file.return_value = with_table("user", trusted_ids=[1])
+		assert reload_config()
+		subscriber.assert_not_called()
+
+	def test_reload_keeps_snapshot_on_error(self, sample_config_file: MockType):
+		snapshot = get_config()
+		sample_config_file.return_value = {}
+		with pytest.raises(ConfigError):
+			reload_config()
+		assert get_config() is snapshot
+
+
+class TestConfigWatcher:
+	@pytest.fixture
+	def config_path(self, mocker: MockerFixture, tmp_path: Path):
+		path = tmp_path / "config.toml"
+		path.write_text('[bot]\ntoken = "abc"\n')
+		mocker.patch("kdi.util.config.get_config_path", return_value=path.as_posix())
 		mocker.patch("kdi.util.config.config_file_data", None)
+		mocker.patch("kdi.util.config.config_snapshot", None)
+		return path
 
 	@pytest.fixture
-	def mock_config_file(self, mocker: MockerFixture):
-		mocker.patch(
-			"kdi.util.config.read_config_file",
-			return_value={"section": {"a": "first", "b": "second"}},
-		)
+	def reloader(self, mocker: MockerFixture):
+		return mocker.patch("kdi.util.config.reload_config", return_value=True)
+
+	def test_reloads_when_file_changes(self, config_path: Path, reloader: MockType):
+		watcher = ConfigWatcher(0)
+		assert watcher.check()
+		assert not watcher.check()
+		os.utime(config_path, ns=(0, 0))
+		assert watcher.check()
+		assert reloader.call_count == 2
+
+	def test_ignores_invalid_files(self, config_path: Path, reloader: MockType):
+		reloader.side_effect = ConfigError("bad")
+		watcher = ConfigWatcher(0)
+		assert not watcher.check()
+
+	def test_ignores_missing_file(self, config_path: Path, reloader: MockType):
+		config_path.unlink()
+		assert not ConfigWatcher(0).check()
+		reloader.assert_not_called()
 
-	def test_loads_keys(self, mock_config_file: None):
-		assert get_config_value("section", "a") == "first"
-		assert get_config_value("section", "b") == "second"
 
-	def test_reads_file_once(self, mocker: MockerFixture, mock_config_file: None):
-		import kdi.util.config
+class TestLoggingConfig:
+	def test_rejects_unknown_levels(self):
+		with pytest.raises(ConfigError):
+			parse_config(with_table("logging", level="LOUD"))
 
-		config_loader = mocker.spy(kdi.util.config, "load_config")
-		config_loader.assert_not_called()
-		get_config_value("section", "a")
-		config_loader.assert_called_once()
-		get_config_value("section", "b")
-		config_loader.assert_called_once()
 
-	def test_missing_table_key(self):
-		with pytest.raises(SystemExit):
-			get_config_value("section_two", "a")
+class TestShardsConfig:
+	def test_defaults_to_one_process(self):
+		config = parse_config(with_table("shards")).shards
+		assert config.workers == 1
+		assert config.session_store == "memory"
 
-	def test_missing_key(self):
-		with pytest.raises(SystemExit):
-			get_config_value("section", "c")
+	@pytest.mark.parametrize(
+		"values",
+		[
+			{"workers": 0},
+			{"shard_count": -1},
+			{"session_store": "redis"},
+			{"workers": 2, "session_store": "memory"},
+		],
+	)
+	def test_rejects_invalid(self, values: dict[str, object]):
+		with pytest.raises(ConfigError):
+			parse_config(with_table("shards", **values))
@@ -0,0 +1,68 @@
+from logging.handlers import QueueHandler, RotatingFileHandler
+from pathlib import Path
+from pytest_mock import MockerFixture
+import logging
+import pytest
+
+from kdi.util import configure_logging, log
+from kdi.util.logger import console_handler, get_log_path, log_listener
+
+
+def flush_logs():
+	log_listener.stop()
+	log_listener.start()
+
+
+@pytest.fixture
+def log_path(mocker: MockerFixture, tmp_path: Path):
+	path = tmp_path / "logs" / "kdi.log"
+	mocker.patch("kdi.util.logger.get_log_path", return_value=path)
+	mocker.patch("kdi.util.logger.file_handler", None)
+	mocker.patch.object(log_listener, "handlers", (console_handler,))
+	level = log.level
+	yield path
+	log.setLevel(level)
+
+
+class TestLogger:
+	def test_routes_through_queue(self):
+		assert any(isinstance(h, QueueHandler) for h in log.handlers)
+		assert log_listener.handlers
+
+	def test_writes_rotating_file(self, log_path: Path):
+		configure_logging("INFO", 1024, 2)
+		log.debug("hidden")
+		log.info("written")
+		flush_logs()
+		contents = log_path.read_text()
+		assert "INFO: written" in contents
+		assert "hidden" not in contents
+
+	def test_adds_file_handler_once(self, log_path: Path):
+		configure_logging("INFO", 1024, 2)
+		configure_logging("WARNING", 1024, 2)
+		file_handlers = [
+			h for h in log_listener.handlers if isinstance(h, RotatingFileHandler)
+		]
+		assert len(file_handlers) == 1
+		assert log.level == logging.WARNING
+
+	def test_file_output_can_be_disabled(self, log_path: Path):
+		configure_logging("INFO", 0, 0)
+		assert not any(
+			isinstance(h, RotatingFileHandler) for h in log_listener.handlers
+		)
+
+	def test_starts_listener_when_configured(
+		self, log_path: Path, mocker: MockerFixture
+	):
+		mocker.patch("kdi.util.logger.listener_started", False)
+		starter = mocker.patch.object(log_listener, "start")
+		mocker.patch("atexit.register")
+		configure_logging("INFO", 0, 0)
+		configure_logging("INFO", 0, 0)
+		starter.assert_called_once()
+
+	def test_separates_worker_logs(self):
+		assert get_log_path().name == "kdi.log"
+		assert get_log_path(2).name == "kdi-2.log"
@@ -0,0 +1,57 @@
+from time import perf_counter, sleep
+import asyncio
+
+from pytest_mock import MockerFixture
+import pytest
+
+from kdi.util.loop_monitor import LOOP_LAG, LoopMonitor, SLOW_CALLBACKS
+
+
+async def block_loop():
+	sleep(0.2)
+
+
+class TestLoopMonitor:
+	@pytest.mark.asyncio
+	async def test_probe_records_lag(self, mocker: MockerFixture):
+		warning = mocker.patch("kdi.util.loop_monitor.log.warning")
+		monitor = LoopMonitor(interval=0.01, threshold=0.05)
+		samples = LOOP_LAG.count()
+		monitor.start()
+		try:
+			await asyncio.sleep(0.02)
+			sleep(0.1)
+			await asyncio.sleep(0.03)
+		finally:
+			monitor.stop()
+		assert LOOP_LAG.count() > samples
+		assert "lagged" in warning.call_args.args[0]
+
+	@pytest.mark.asyncio
+	async def test_reports_each_stall_once(self, mocker: MockerFixture):
+		warning = mocker.patch("kdi.util.loop_monitor.log.warning")
+		monitor = LoopMonitor(interval=10, threshold=0.05)
+		monitor.start()
+		try:
+			assert monitor.check_stalled() is None
+			monitor._due_at = perf_counter() - 1
+			name = "TestLoopMonitor.test_reports_each_stall_once"
+			assert monitor.check_stalled() == name
+			assert monitor.check_stalled() is None
+		finally:
+			monitor.stop()
+		assert warning.call_count == 1
+		assert "test_loop_monitor.py" in warning.call_args.args[0]
+
+	@pytest.mark.asyncio
+	async def test_watchdog_names_blocking_task(self, mocker: MockerFixture):
+		mocker.patch("kdi.util.loop_monitor.log.warning")
+		monitor = LoopMonitor(interval=0.01, threshold=0.05, watchdog=True)
+		stalls = SLOW_CALLBACKS.value(task="block_loop")
+		monitor.start()
+		try:
+			await asyncio.sleep(0.02)
+			await asyncio.create_task(block_loop())
+		finally:
+			monitor.stop()
+		assert SLOW_CALLBACKS.value(task="block_loop") == stalls + 1
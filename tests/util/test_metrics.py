@@ -0,0 +1,105 @@
+from aiohttp import ClientSession
+import pytest
+
+from kdi.util.metrics import (
+	CONTENT_TYPE,
+	Counter,
+	Gauge,
+	Histogram,
+	Metric,
+	MetricsRegistry,
+	MetricsServer,
+)
+
+
+@pytest.fixture
+def registry():
+	return MetricsRegistry()
+
+
+class TestMetric:
+	def test_requires_samples(self):
+		assert Metric.__abstractmethods__ == frozenset({"samples"})
+
+
+class TestCounter:
+	def test_renders_labelled_values(self):
+		counter = Counter("requests_total", "Requests.", ["route"])
+		counter.inc(route="/a")
+		counter.inc(2, route='"b"\n')
+		assert counter.render().splitlines() == [
+			"# HELP requests_total Requests.",
+			"# TYPE requests_total counter",
+			r'requests_total{route="\"b\"\n"} 2.0',
+			'requests_total{route="/a"} 1.0',
+		]
+
+	def test_rejects_decrements(self):
+		with pytest.raises(ValueError):
+			Counter("c", "C.").inc(-1)
+
+	def test_requires_declared_labels(self):
+		with pytest.raises(ValueError):
+			Counter("c", "C.", ["route"]).inc(method="GET")
+
+
+class TestGauge:
+	def test_moves_both_ways(self):
+		gauge = Gauge("depth", "Depth.")
+		gauge.inc(3)
+		gauge.dec()
+		assert gauge.value() == 2
+		gauge.set(7)
+		assert gauge.samples() == ["depth 7.0"]
+
+
+class TestHistogram:
+	def test_renders_cumulative_buckets(self):
+		histogram = Histogram("latency_seconds", "Latency.", buckets=[0.1, 1.0])
+		for value in [0.05, 0.1, 0.5, 3.0]:
+			histogram.observe(value)
+		assert histogram.samples() == [
+			'latency_seconds_bucket{le="0.1"} 2',
+			'latency_seconds_bucket{le="1.0"} 3',
+			'latency_seconds_bucket{le="+Inf"} 4',
+			"latency_seconds_sum 3.65",
+			"latency_seconds_count 4",
+		]
+
+	def test_times_blocks(self):
+		histogram = Histogram("work_seconds", "Work.", ["kind"])
+		with histogram.time(kind="a"):
+			pass
+		assert histogram.count(kind="a") == 1
+
+
+class TestMetricsRegistry:
+	def test_rejects_duplicate_names(self, registry: MetricsRegistry):
+		registry.counter("c", "C.")
+		with pytest.raises(ValueError):
+			registry.gauge("c", "C.")
+
+	def test_renders_all_metrics(self, registry: MetricsRegistry):
+		registry.counter("b_total", "B.").inc()
+		registry.gauge("a", "A.").set(1)
+		text = registry.render()
+		assert text.index("# TYPE a gauge") < text.index("# TYPE b_total counter")
+		assert text.endswith("b_total 1.0\n")
+
+
+class TestMetricsServer:
+	@pytest.mark.asyncio
+	async def test_serves_prometheus_text(self, registry: MetricsRegistry):
+		registry.counter("scrapes_total", "Scrapes.").inc()
+		server = MetricsServer(registry, "127.0.0.1", 0)
+		await server.start()
+		try:
+			async with ClientSession() as session:
+				url = f"http://127.0.0.1:{server.port}/metrics"
+				async with session.get(url) as response:
+					assert response.status == 200
+					assert response.headers["Content-Type"] == CONTENT_TYPE
+					assert "scrapes_total 1.0" in await response.text()
+		finally:
+			await server.stop()
+		assert server.port is None